@@ -0,0 +1,79 @@
+"""Time building a RulePatternIndex from many generated rules.
+
+Compares `RulePatternIndexBuilder` with folding per-rule indexes pairwise,
+which is quadratic and therefore only timed on the first `--fold-rules`.
+
+Usage: python -m benchmarks.build_index [--rules 10000] [--streams 300]
+       [--fold-rules 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import operator
+import random
+import time
+
+from feedly_regexp_marker.classifier import RulePatternIndex, RulePatternIndexBuilder
+from feedly_regexp_marker.models import Action
+from feedly_regexp_marker.pattern_texts import PatternTexts
+from feedly_regexp_marker.rules import EntryPatternTexts, Rule
+
+ACTION_SETS: list[frozenset[Action]] = [
+    frozenset({"markAsRead"}),
+    frozenset({"markAsSaved"}),
+    frozenset({"markAsRead", "markAsSaved"}),
+]
+
+
+def make_rules(count: int, streams: int, seed: int = 0) -> list[Rule]:
+    rng = random.Random(seed)
+    stream_ids = [f"feed/https://example.com/{i}/rss" for i in range(streams)]
+    return [
+        Rule(
+            name=f"rule{i}",
+            stream_ids=frozenset(rng.sample(stream_ids, rng.choice([1, 1, 2, 5]))),
+            actions=rng.choice(ACTION_SETS),
+            patterns=EntryPatternTexts(
+                title=PatternTexts([f"kw{i}", rf"w{i}\s+v\d+"]),
+                content=PatternTexts([f"kw{i} x"]),
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=10000)
+    parser.add_argument("--streams", type=int, default=300)
+    parser.add_argument("--fold-rules", type=int, default=1000)
+    args = parser.parse_args()
+
+    rules = make_rules(args.rules, args.streams)
+
+    start = time.perf_counter()
+    builder = RulePatternIndexBuilder()
+    builder.add_rules(rules)
+    index = builder.build()
+    built = time.perf_counter() - start
+    print(
+        f"builder: {built * 1000:9.1f} ms for {len(rules)} rules "
+        f"({len(index.root)} keys)"
+    )
+
+    folded_rules = rules[: args.fold_rules]
+    start = time.perf_counter()
+    folded = functools.reduce(
+        operator.__or__,
+        (RulePatternIndex.from_rule(rule) for rule in folded_rules),
+        RulePatternIndex(),
+    )
+    fold = time.perf_counter() - start
+    assert folded == RulePatternIndex.from_rules(folded_rules)
+    print(f"fold:    {fold * 1000:9.1f} ms for {len(folded_rules)} rules")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Time classifying a synthetic page against many keyword rules.
+
+Compares `Classifier.classify` with evaluating each action through `to_act`,
+which searches the full per-action alternation.
+
+Usage: python -m benchmarks.classify_entries [--keywords 2000] [--regexes 20]
+       [--regex-engine re|re2]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Callable
+
+from benchmarks.synthetic import WORDS, make_page
+from feedly_regexp_marker.classifier import Classifier, RulePatternIndex
+from feedly_regexp_marker.models import Action, Entry, StreamContents
+from feedly_regexp_marker.pattern_texts import PatternTexts
+from feedly_regexp_marker.regex_engine import RegexEngineName
+
+STREAM_ID = "feed/https://example.com/rss"
+
+
+def make_classifier(
+    keywords: int,
+    regexes: int,
+    seed: int = 0,
+    regex_engine: RegexEngineName = "re",
+) -> Classifier:
+    rng = random.Random(seed)
+    read = {f"{rng.choice(WORDS)}{i:05d}" for i in range(keywords)}
+    read |= {rf"{rng.choice(WORDS)}{i}\s+v\d+" for i in range(regexes)}
+    saved = {f"{rng.choice(WORDS)} {rng.choice(WORDS)}" for _ in range(keywords // 10)}
+    return Classifier.from_rule_pattern_index(
+        RulePatternIndex(
+            root={
+                ("markAsRead", STREAM_ID, "title"): PatternTexts(read),
+                ("markAsRead", STREAM_ID, "content"): PatternTexts(read),
+                ("markAsSaved", STREAM_ID, "content"): PatternTexts(saved),
+            }
+        ),
+        regex_engine=regex_engine,
+    )
+
+
+def time_per_page(classify: Callable[[Entry], object], entries: list[Entry]) -> float:
+    start = time.perf_counter()
+    for entry in entries:
+        classify(entry)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=200)
+    parser.add_argument("--keywords", type=int, default=2000)
+    parser.add_argument("--regexes", type=int, default=20)
+    parser.add_argument("--body-paragraphs", type=int, default=5)
+    parser.add_argument("--regex-engine", choices=["re", "re2"], default="re")
+    args = parser.parse_args()
+
+    entries = StreamContents.model_validate(
+        make_page(
+            size=args.entries,
+            stream_ids=(STREAM_ID,),
+            body_paragraphs=args.body_paragraphs,
+        )
+    ).items
+
+    start = time.perf_counter()
+    classifier = make_classifier(
+        args.keywords, args.regexes, regex_engine=args.regex_engine
+    )
+    print(f"build:    {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    actions: list[Action] = ["markAsRead", "markAsSaved"]
+    to_act = time_per_page(
+        lambda entry: {a for a in actions if classifier.to_act(entry, a)}, entries
+    )
+    classify = time_per_page(classifier.classify, entries)
+    print(f"to_act:   {to_act * 1000:8.1f} ms for {args.entries} entries")
+    print(f"classify: {classify * 1000:8.1f} ms ({to_act / classify:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Time compiling a classifier whose rules each cover a group of streams,
+as rules written for a category of feeds do.
+
+Compares compiling every index key on its own with `PatternPool`, which
+compiles each distinct pattern set once, and reports how much the compiled
+patterns and field matchers are shared.
+
+Usage: python -m benchmarks.compile_patterns [--rules 200] [--groups 10]
+       [--group-size 30]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from feedly_regexp_marker.classifier import Classifier, RulePatternIndexBuilder
+from feedly_regexp_marker.pattern_texts import PatternPool, PatternTexts
+from feedly_regexp_marker.rules import EntryPatternTexts, Rule
+
+
+def make_rules(count: int, groups: int, group_size: int, seed: int = 0) -> list[Rule]:
+    rng = random.Random(seed)
+    stream_groups = [
+        frozenset(f"feed/https://example.com/{g}/{i}/rss" for i in range(group_size))
+        for g in range(groups)
+    ]
+    return [
+        Rule(
+            name=f"rule{i}",
+            stream_ids=rng.choice(stream_groups),
+            actions=frozenset({"markAsRead"}),
+            patterns=EntryPatternTexts(
+                title=PatternTexts([f"kw{i}", rf"w{i}\s+v\d+"]),
+                content=PatternTexts([f"kw{i} x"]),
+            ),
+        )
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", type=int, default=200)
+    parser.add_argument("--groups", type=int, default=10)
+    parser.add_argument("--group-size", type=int, default=30)
+    args = parser.parse_args()
+
+    builder = RulePatternIndexBuilder()
+    builder.add_rules(make_rules(args.rules, args.groups, args.group_size))
+    index = builder.build()
+
+    start = time.perf_counter()
+    for pattern_texts in index.root.values():
+        pattern_texts.compile()
+    unpooled = time.perf_counter() - start
+    print(f"per key: {unpooled * 1000:9.1f} ms for {len(index.root)} keys")
+
+    pool = PatternPool()
+    start = time.perf_counter()
+    clf = Classifier.from_rule_pattern_index(index, pool=pool)
+    pooled = time.perf_counter() - start
+    pool_stats = pool.stats()
+    print(
+        f"pooled:  {pool_stats.seconds * 1000:9.1f} ms compiling "
+        f"{pool_stats.compiled} sets ({pool_stats.reused} reused), "
+        f"{pooled * 1000:.1f} ms for the whole classifier"
+    )
+    print(clf.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compare the ways a /v3/streams/contents page can be decoded.
+
+Usage: python -m benchmarks.decode_pages [--entries 1000] [--repeat 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Callable
+
+from benchmarks.synthetic import make_page
+from feedly_regexp_marker.models import StreamContents
+
+
+def decode_dict(body: bytes) -> StreamContents:
+    """The former path: json.loads into dicts, then validate the dicts."""
+    return StreamContents.model_validate(json.loads(body))
+
+
+def decode_json(body: bytes) -> StreamContents:
+    """The current path: pydantic-core parses and validates the bytes at once."""
+    return StreamContents.model_validate_json(body)
+
+
+DECODERS: dict[str, Callable[[bytes], Any]] = {
+    "json.loads + model_validate": decode_dict,
+    "model_validate_json": decode_json,
+}
+
+try:
+    import orjson
+except ImportError:
+    pass
+else:
+    DECODERS["orjson.loads + model_validate"] = lambda body: (
+        StreamContents.model_validate(orjson.loads(body))
+    )
+
+
+def time_decoder(decode: Callable[[bytes], Any], body: bytes, repeat: int) -> float:
+    """Return the median seconds per page."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(body)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    body = json.dumps(make_page(size=args.entries)).encode()
+    print(f"page: {args.entries} entries, {len(body) / 1e6:.1f} MB")
+
+    baseline = None
+    for name, decode in DECODERS.items():
+        seconds = time_decoder(decode, body, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:>30}: {seconds * 1000:8.1f} ms/page ({baseline / seconds:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Run mark-entries-by-rules against the local stand-in server and report
+throughput, peak RSS and request counts.
+
+Usage: python -m benchmarks.end_to_end [--entries 10000] [-- extra CLI options]
+"""
+
+from __future__ import annotations
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.fake_feedly import (
+    FakeFeedly,
+    add_config_arguments,
+    config_from_arguments,
+    serve_in_thread,
+)
+
+
+def write_rules(path: Path, stream_ids: list[str]) -> None:
+    """Write rules reading about half the entries and saving a few."""
+    lines = []
+    for stream_id in stream_ids:
+        lines += [
+            f"- stream_ids: ['{stream_id}']",
+            "  actions: [markAsRead]",
+            "  patterns:",
+            "    title: ['^(weekly|digest|launch)', 'review$']",
+            "    content: ['sponsored', 'kernel patch security']",
+            f"- stream_ids: ['{stream_id}']",
+            "  actions: [markAsSaved]",
+            "  patterns:",
+            "    title: ['feedly.*regexp']",
+        ]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_config_arguments(parser)
+    parser.add_argument(
+        "cli_args",
+        nargs=argparse.REMAINDER,
+        help="extra mark-entries-by-rules options, after --",
+    )
+    args = parser.parse_args()
+    cli_args = [a for a in args.cli_args if a != "--"]
+
+    fake = FakeFeedly(config_from_arguments(args))
+    with tempfile.TemporaryDirectory() as tmp, serve_in_thread(fake) as api_host:
+        token_dir = Path(tmp)
+        (token_dir / "access.token").write_text("bench-token")
+        rules_path = token_dir / "rules.yaml"
+        write_rules(rules_path, fake.stream_ids)
+
+        command = [
+            sys.executable,
+            "-m",
+            "feedly_regexp_marker",
+            "mark-entries-by-rules",
+            str(rules_path),
+            "--token-dir",
+            str(token_dir),
+            "--api-host",
+            api_host,
+            "--requests-per-second",
+            "1000",
+            *cli_args,
+        ]
+        start = time.perf_counter()
+        completed = subprocess.run(command, stderr=subprocess.DEVNULL)
+        seconds = time.perf_counter() - start
+
+    # ru_maxrss of the (only) child process, in KiB on Linux.
+    peak_rss_kib = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    print(f"exit code:      {completed.returncode}")
+    print(f"entries:        {args.entries} in {args.streams} streams")
+    print(f"wall time:      {seconds:.2f} s")
+    print(f"throughput:     {args.entries / seconds:,.0f} entries/s")
+    print(f"peak RSS:       {peak_rss_kib / 1024:.1f} MiB")
+    for path, count in sorted(fake.requests.items()):
+        errors = fake.errors[path]
+        print(f"requests:       {path} {count} ({errors} injected errors)")
+    for action, count in sorted(fake.marked.items()):
+        print(f"marked:         {action} {count}")
+
+
+if __name__ == "__main__":
+    main()
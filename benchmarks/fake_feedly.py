@@ -0,0 +1,199 @@
+"""A local stand-in for the parts of the Feedly API the marker uses.
+
+Serves /v3/profile, /v3/streams/contents and /v3/markers over a synthetic
+unread backlog, with optional latency and randomly injected 503 errors.
+
+Usage: python -m benchmarks.fake_feedly [--entries 10000] [--port 8080]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+from aiohttp import web
+from pydantic import BaseModel, ConfigDict
+
+from benchmarks.synthetic import CRAWLED_BASE, make_entry
+
+USER_ID = "bench-user"
+GLOBAL_ALL = f"user/{USER_ID}/category/global.all"
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+class FakeFeedlyConfig(BaseModel):
+    entries: int = 10_000
+    streams: int = 10
+    body_paragraphs: int = 20
+    latency: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+    model_config = ConfigDict(frozen=True)
+
+
+class FakeFeedly:
+    """In-memory backlog and request bookkeeping behind the aiohttp app."""
+
+    def __init__(self, config: FakeFeedlyConfig) -> None:
+        self.config = config
+        self.stream_ids = [
+            f"feed/https://example.com/{k}/rss" for k in range(config.streams)
+        ]
+        self.read: set[int] = set()
+        self.requests: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.marked: Counter[str] = Counter()
+        self.rng = random.Random(config.seed)
+
+    def entry(self, index: int) -> dict[str, Any]:
+        # Entries are rebuilt on demand so large backlogs cost no memory.
+        return make_entry(
+            random.Random(self.config.seed * 1_000_003 + index),
+            index,
+            self.stream_ids[index % len(self.stream_ids)],
+            self.config.body_paragraphs,
+        )
+
+    def _indices(self, stream_id: str, start: int, newer_than: Optional[int]):
+        if stream_id in self.stream_ids:
+            step = len(self.stream_ids)
+            first = self.stream_ids.index(stream_id)
+        elif stream_id == GLOBAL_ALL:
+            step, first = 1, 0
+        else:
+            raise web.HTTPNotFound(text=f"unknown stream {stream_id}")
+
+        if newer_than is not None:
+            start = max(start, (newer_than - CRAWLED_BASE) // 1000 + 1)
+        start = max(start, first)
+        start += (first - start) % step
+        return range(start, self.config.entries, step)
+
+    async def profile(self, request: web.Request) -> web.Response:
+        return web.json_response({"id": USER_ID})
+
+    async def stream_contents(self, request: web.Request) -> web.Response:
+        query = request.query
+        count = int(query.get("count", "20"))
+        unread_only = query.get("unreadOnly") == "true"
+        newer_than = int(query["newerThan"]) if "newerThan" in query else None
+        indices = self._indices(
+            query["streamId"], int(query.get("continuation", "0")), newer_than
+        )
+
+        items: list[dict[str, Any]] = []
+        continuation = None
+        for index in indices:
+            if unread_only and index in self.read:
+                continue
+            if len(items) == count:
+                continuation = str(index)
+                break
+            items.append(self.entry(index))
+
+        payload: dict[str, Any] = {"id": query["streamId"], "items": items}
+        if continuation:
+            payload["continuation"] = continuation
+        return web.Response(
+            body=json.dumps(payload).encode(), content_type="application/json"
+        )
+
+    async def markers(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        entry_ids = body["entryIds"]
+        if body["action"] == "markAsRead":
+            self.read.update(int(entry_id.rsplit("-", 1)[1]) for entry_id in entry_ids)
+        self.marked[body["action"]] += len(entry_ids)
+        return web.Response()
+
+    @web.middleware
+    async def faults(self, request: web.Request, handler: Handler):
+        self.requests[request.path] += 1
+        if self.config.latency:
+            await asyncio.sleep(self.config.latency)
+        if self.rng.random() < self.config.error_rate:
+            self.errors[request.path] += 1
+            raise web.HTTPServiceUnavailable()
+        return await handler(request)
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.faults])
+        app.router.add_get("/v3/profile", self.profile)
+        app.router.add_get("/v3/streams/contents", self.stream_contents)
+        app.router.add_post("/v3/markers", self.markers)
+        return app
+
+
+@contextmanager
+def serve_in_thread(fake: FakeFeedly, host: str = "127.0.0.1") -> Iterator[str]:
+    """Run the server on a free port in a background thread; yield its URL."""
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(fake.app(), access_log=None)
+
+    async def start() -> str:
+        await runner.setup()
+        site = web.TCPSite(runner, host, 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        return f"http://{host}:{port}"
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield asyncio.run_coroutine_threadsafe(start(), loop).result()
+    finally:
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = FakeFeedlyConfig()
+    parser.add_argument("--entries", type=int, default=defaults.entries)
+    parser.add_argument("--streams", type=int, default=defaults.streams)
+    parser.add_argument("--body-paragraphs", type=int, default=defaults.body_paragraphs)
+    parser.add_argument(
+        "--latency", type=float, default=defaults.latency, help="seconds"
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=defaults.error_rate,
+        help="share of requests answered with 503",
+    )
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_arguments(args: argparse.Namespace) -> FakeFeedlyConfig:
+    return FakeFeedlyConfig(
+        entries=args.entries,
+        streams=args.streams,
+        body_paragraphs=args.body_paragraphs,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_config_arguments(parser)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    fake = FakeFeedly(config_from_arguments(args))
+    print("streams:", *fake.stream_ids, sep="\n  ")
+    web.run_app(fake.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Time classifying a large backlog with a growing number of worker processes.
+
+Usage: python -m benchmarks.parallel_classify [--entries 5000]
+       [--workers 1 2 4 8] [--keywords 2000] [--regexes 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.classify_entries import STREAM_ID, make_classifier
+from benchmarks.synthetic import make_page
+from feedly_regexp_marker.models import StreamContents
+from feedly_regexp_marker.parallel import DEFAULT_CHUNK_SIZE, ParallelClassifier
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--keywords", type=int, default=2000)
+    parser.add_argument("--regexes", type=int, default=200)
+    parser.add_argument("--body-paragraphs", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    entries = StreamContents.model_validate(
+        make_page(
+            size=args.entries,
+            stream_ids=(STREAM_ID,),
+            body_paragraphs=args.body_paragraphs,
+        )
+    ).items
+    classifier = make_classifier(args.keywords, args.regexes)
+    expected = classifier.classify_many(entries)
+
+    baseline = None
+    for workers in args.workers:
+        with ParallelClassifier(
+            classifier, workers=workers, chunk_size=args.chunk_size
+        ) as parallel:
+            # Warm up, so spawning the workers is not timed.
+            parallel.classify_many(entries[: workers * 2])
+            start = time.perf_counter()
+            actual = parallel.classify_many(entries)
+            elapsed = time.perf_counter() - start
+        assert actual == expected
+        baseline = baseline or elapsed
+        print(
+            f"workers={workers:<3d} {elapsed * 1000:8.1f} ms "
+            f"({baseline / elapsed:.2f}x) for {args.entries} entries"
+        )
+
+
+if __name__ == "__main__":
+    main()
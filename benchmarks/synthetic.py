@@ -0,0 +1,73 @@
+"""Synthetic Feedly payloads shaped like real /v3/streams/contents pages."""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Optional
+
+CRAWLED_BASE = 1_700_000_000_000
+
+WORDS = (
+    "feedly regexp marker python release update security kernel patch "
+    "stream entry rule category news review launch weekly digest"
+).split()
+
+
+def _paragraphs(rng: random.Random, count: int) -> str:
+    return "".join(
+        "<p>" + " ".join(rng.choices(WORDS, k=60)) + " &amp; more</p>"
+        for _ in range(count)
+    )
+
+
+def crawled_at(index: int) -> int:
+    return CRAWLED_BASE + index * 1000
+
+
+def make_entry(
+    rng: random.Random, index: int, stream_id: str, body_paragraphs: int = 20
+) -> dict[str, Any]:
+    """Build one entry including the fields the marker never reads."""
+    crawled = crawled_at(index)
+    return {
+        "id": f"entry-{index}",
+        "fingerprint": f"{rng.getrandbits(32):08x}",
+        "originId": f"https://example.com/{index}",
+        "title": " ".join(rng.choices(WORDS, k=8)),
+        "crawled": crawled,
+        "published": crawled - 60_000,
+        "updated": crawled,
+        "author": "someone",
+        "unread": True,
+        "engagement": rng.randrange(100),
+        "alternate": [{"href": f"https://example.com/{index}", "type": "text/html"}],
+        "visual": {"url": f"https://example.com/{index}.png", "width": 640},
+        "keywords": rng.choices(WORDS, k=5),
+        "categories": [{"id": "user/u/category/tech", "label": "tech"}],
+        "summary": {"content": _paragraphs(rng, 1), "direction": "ltr"},
+        "content": {"content": _paragraphs(rng, body_paragraphs), "direction": "ltr"},
+        "origin": {
+            "streamId": stream_id,
+            "title": "Example feed",
+            "htmlUrl": "https://example.com",
+        },
+    }
+
+
+def make_page(
+    size: int = 1000,
+    start: int = 0,
+    stream_ids: tuple[str, ...] = ("feed/https://example.com/rss",),
+    continuation: Optional[str] = None,
+    seed: int = 0,
+    body_paragraphs: int = 20,
+) -> dict[str, Any]:
+    rng = random.Random(seed + start)
+    return {
+        "id": "user/u/category/global.all",
+        "updated": 1_700_000_000_000,
+        "items": [
+            make_entry(rng, i, stream_ids[i % len(stream_ids)], body_paragraphs)
+            for i in range(start, start + size)
+        ],
+    } | ({"continuation": continuation} if continuation else {})
@@ -1,15 +1,46 @@
+from importlib import import_module
+from typing import Any, Optional
+
 import typer
+from typer.core import TyperGroup
 
-from feedly_regexp_marker.commands.gen_json_schema_for_rules import (
-    app as gen_json_schema_for_rules_app,
-)
-from feedly_regexp_marker.commands.mark_entries_by_rules import (
-    app as mark_entries_by_rules_app,
-)
+# Modules of the subcommands, imported only when their command runs: marking
+# needs the Feedly and HTTP clients and the YAML parser, which would otherwise
+# slow down the start of every command.
+COMMAND_MODULES = {
+    "gen-json-schema-for-rules": "feedly_regexp_marker.commands.gen_json_schema_for_rules",
+    "mark-entries-by-rules": "feedly_regexp_marker.commands.mark_entries_by_rules",
+    "watch": "feedly_regexp_marker.commands.watch",
+}
 
-app = typer.Typer()
-app.add_typer(gen_json_schema_for_rules_app)
-app.add_typer(mark_entries_by_rules_app)
 
-if __name__ == "__main__":
+class LazyCommandGroup(TyperGroup):
+    def list_commands(self, ctx: Any) -> list[str]:
+        return list(COMMAND_MODULES)
+
+    def get_command(self, ctx: Any, cmd_name: str) -> Optional[Any]:
+        module_name = COMMAND_MODULES.get(cmd_name)
+        if module_name is None:
+            return None
+        (command_info,) = import_module(module_name).app.registered_commands
+        return typer.main.get_command_from_info(
+            command_info,
+            pretty_exceptions_short=app.pretty_exceptions_short,
+            rich_markup_mode=self.rich_markup_mode,
+        )
+
+
+app = typer.Typer(cls=LazyCommandGroup)
+
+
+@app.callback()
+def callback():
+    pass
+
+
+def main() -> None:
     app()
+
+
+if __name__ == "__main__":
+    main()
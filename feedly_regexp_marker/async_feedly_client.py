@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, AsyncGenerator, Iterable, Mapping, Optional, Union
+
+import aiohttp
+from feedly.api_client.session import Auth, FileAuthStore
+from logzero import logger
+
+from feedly_regexp_marker.feedly_client import (
+    DEFAULT_MARK_CHUNK_SIZE,
+    DEFAULT_MARK_CONCURRENCY,
+    DEFAULT_MARK_RETRIES,
+    chunked,
+    raise_for_failed_chunks,
+    retry_delay,
+)
+from feedly_regexp_marker.models import (
+    Action,
+    Entry,
+    EntryId,
+    StreamContents,
+    StreamId,
+    Subscriptions,
+)
+from feedly_regexp_marker.rate_limit import AsyncRequestScheduler
+
+DEFAULT_API_HOST = "https://feedly.com"
+DEFAULT_CLIENT_NAME = "feedly.python.client"
+
+# Failures to get any response, worth retrying; error responses are retried
+# by the scheduler when their status says so.
+CONNECTION_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+
+class AsyncFeedlyClient:
+    """asyncio counterpart of `FeedlyClient` backed by one pooled aiohttp session.
+
+    While the entries of a stream page are being consumed, the request for the
+    next page is already in flight.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        auth_token: str,
+        api_host: str = DEFAULT_API_HOST,
+        user_id: Optional[str] = None,
+        client_name: str = DEFAULT_CLIENT_NAME,
+        mark_chunk_size: int = DEFAULT_MARK_CHUNK_SIZE,
+        mark_concurrency: int = DEFAULT_MARK_CONCURRENCY,
+        mark_retries: int = DEFAULT_MARK_RETRIES,
+        scheduler: Optional[AsyncRequestScheduler] = None,
+        auth: Optional[Auth] = None,
+    ) -> None:
+        self.session = session
+        # Where a rejected `auth_token` is refreshed from and saved to.
+        self.auth = auth
+        self._auth_lock: Optional[asyncio.Lock] = None
+        self.scheduler = scheduler or AsyncRequestScheduler()
+        self.auth_token = auth_token
+        self.api_host = api_host
+        self.user_id = user_id
+        self.client_name = client_name
+        self.mark_chunk_size = mark_chunk_size
+        self.mark_concurrency = mark_concurrency
+        self.mark_retries = mark_retries
+
+    @classmethod
+    def from_auth_token(
+        cls,
+        auth_token: str,
+        api_host: str = DEFAULT_API_HOST,
+        max_connections: int = 4,
+        **kwargs: Any,
+    ) -> AsyncFeedlyClient:
+        return cls(
+            session=aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=max_connections)
+            ),
+            auth_token=auth_token,
+            api_host=api_host,
+            **kwargs,
+        )
+
+    async def close(self) -> None:
+        await self.session.close()
+
+    async def __aenter__(self) -> AsyncFeedlyClient:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def do_api_request_raw(
+        self,
+        relative_url: str,
+        params: Optional[dict[str, str]] = None,
+        data: Optional[dict[str, Any]] = None,
+    ) -> bytes:
+        """Send a request, retrying per the scheduler, and return the raw body.
+
+        Dropped connections and timeouts are retried within the same
+        `max_attempts` as retryable responses. A request rejected with 401 is
+        sent once more after refreshing the access token through `auth`.
+        """
+        attempt = 1
+        may_refresh = self.auth is not None and not relative_url.startswith("/v3/auth/")
+        while True:
+            await self.scheduler.acquire()
+            retry_headers: Mapping[str, str]
+            unauthorized: Optional[aiohttp.ClientResponseError] = None
+            auth_token = self.auth_token
+            try:
+                async with self.session.request(
+                    "get" if data is None else "post",
+                    f"{self.api_host}{relative_url}",
+                    params={"client": self.client_name} | (params or {}),
+                    json=data,
+                    headers={"Authorization": auth_token},
+                ) as resp:
+                    self.scheduler.observe(resp.headers)
+                    if self.scheduler.should_retry(resp.status, attempt):
+                        logger.warning(
+                            f"{relative_url} returned {resp.status}, retrying "
+                            f"({attempt}/{self.scheduler.max_attempts - 1})..."
+                        )
+                        retry_headers = resp.headers
+                    elif resp.status == 401 and may_refresh:
+                        unauthorized = aiohttp.ClientResponseError(
+                            resp.request_info,
+                            tuple(resp.history),
+                            status=resp.status,
+                            message=resp.reason or "",
+                            headers=resp.headers,
+                        )
+                    else:
+                        resp.raise_for_status()
+                        return await resp.read()
+            except CONNECTION_ERRORS as e:
+                if attempt >= self.scheduler.max_attempts:
+                    raise
+                logger.warning(
+                    f"{relative_url} failed ({e!r}), retrying "
+                    f"({attempt}/{self.scheduler.max_attempts - 1})..."
+                )
+                retry_headers = {}
+            if unauthorized is not None:
+                may_refresh = False
+                if not await self._refresh_auth_token(auth_token):
+                    raise unauthorized
+                continue
+            await self.scheduler.backoff(attempt, retry_headers)
+            attempt += 1
+
+    async def _refresh_auth_token(self, rejected_token: str) -> bool:
+        """Replace a rejected access token and return whether there is a new
+        one to retry with.
+
+        The token is refreshed with the refresh token of `auth`, which saves
+        it; failing that, a file store is read again in case another process
+        refreshed it. Concurrent requests rejected with the same token share
+        one refresh.
+        """
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        async with self._auth_lock:
+            if self.auth_token != rejected_token:
+                return True
+            if self.auth is None:
+                return False
+            if self.auth.refresh_token:
+                logger.info("Access token rejected, refreshing it...")
+                try:
+                    token_data = await self.do_api_request(
+                        relative_url="/v3/auth/token",
+                        data={
+                            "refresh_token": self.auth.refresh_token,
+                            "grant_type": "refresh_token",
+                            "client_id": self.auth.client_id,
+                            "client_secret": self.auth.client_secret,
+                        },
+                    )
+                    self.auth.auth_token = self.auth_token = token_data["access_token"]
+                    return True
+                except (aiohttp.ClientError, asyncio.TimeoutError, KeyError, TypeError):
+                    logger.exception("Failed to refresh the access token.")
+            if isinstance(self.auth, FileAuthStore):
+                stored = self.auth.auth_token_path.read_text().strip()
+                if stored and stored != rejected_token:
+                    logger.info("Using the access token saved since.")
+                    self.auth_token = stored
+                    return True
+            return False
+
+    async def do_api_request(
+        self,
+        relative_url: str,
+        params: Optional[dict[str, str]] = None,
+        data: Optional[dict[str, Any]] = None,
+    ) -> Any:
+        body = await self.do_api_request_raw(
+            relative_url=relative_url, params=params, data=data
+        )
+        return json.loads(body) if body.strip() else None
+
+    async def fetch_user_id(self) -> str:
+        if self.user_id is None:
+            profile = await self.do_api_request(relative_url="/v3/profile")
+            self.user_id = profile["id"]
+        return self.user_id
+
+    async def fetch_subscriptions(self) -> Subscriptions:
+        return Subscriptions.model_validate_json(
+            await self.do_api_request_raw(relative_url="/v3/subscriptions")
+        )
+
+    async def _fetch_page(
+        self,
+        stream_id: str,
+        continuation: Optional[str],
+        newer_than: Optional[int] = None,
+    ) -> StreamContents:
+        # The raw body goes straight to pydantic-core, which parses and
+        # validates in one pass and never builds the fields Entry ignores.
+        body = await self.do_api_request_raw(
+            relative_url="/v3/streams/contents",
+            params=(
+                {
+                    "streamId": stream_id,
+                    "count": "1000",
+                    "ranked": "oldest",
+                    "unreadOnly": "true",
+                }
+                | ({"continuation": continuation} if continuation else dict())
+                | ({"newerThan": str(newer_than)} if newer_than else dict())
+            ),
+        )
+        return StreamContents.model_validate_json(body)
+
+    async def fetch_unread_pages(
+        self, newer_than: Optional[int] = None, stream_id: Optional[StreamId] = None
+    ) -> AsyncGenerator[StreamContents, None]:
+        if stream_id is None:
+            stream_id = f"user/{await self.fetch_user_id()}/category/global.all"
+
+        next_page: Optional[asyncio.Task] = asyncio.ensure_future(
+            self._fetch_page(
+                stream_id=stream_id, continuation=None, newer_than=newer_than
+            )
+        )
+        try:
+            while next_page is not None:
+                page = await next_page
+                next_page = None
+
+                if page.continuation and page.items:
+                    next_page = asyncio.ensure_future(
+                        self._fetch_page(
+                            stream_id=stream_id,
+                            continuation=page.continuation,
+                            newer_than=newer_than,
+                        )
+                    )
+                    # Let the prefetch get its request on the wire before the
+                    # current page is handed to the consumer.
+                    await asyncio.sleep(0)
+
+                yield page
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def fetch_unread_pages_of_streams(
+        self,
+        stream_ids: Iterable[StreamId],
+        newer_than: Optional[int] = None,
+        max_concurrent_streams: int = 4,
+    ) -> AsyncGenerator[StreamContents, None]:
+        """Fetch the unread pages of several streams concurrently.
+
+        Each stream is paginated on its own; pages are yielded in the order
+        they arrive.
+        """
+        semaphore = asyncio.Semaphore(max_concurrent_streams)
+        pages: asyncio.Queue[Union[StreamContents, BaseException, None]] = (
+            asyncio.Queue(maxsize=max_concurrent_streams)
+        )
+
+        async def fetch_stream(stream_id: StreamId) -> None:
+            try:
+                async with semaphore:
+                    async for page in self.fetch_unread_pages(
+                        newer_than=newer_than, stream_id=stream_id
+                    ):
+                        await pages.put(page)
+            except Exception as e:
+                await pages.put(e)
+                return
+            await pages.put(None)
+
+        tasks = [
+            asyncio.ensure_future(fetch_stream(stream_id))
+            for stream_id in sorted(set(stream_ids))
+        ]
+        try:
+            running = len(tasks)
+            while running:
+                page = await pages.get()
+                if page is None:
+                    running -= 1
+                elif isinstance(page, BaseException):
+                    raise page
+                else:
+                    yield page
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_all_unread_entries(
+        self, newer_than: Optional[int] = None
+    ) -> AsyncGenerator[Entry, None]:
+        async for stream_contents in self.fetch_unread_pages(newer_than=newer_than):
+            for entry in stream_contents.items:
+                yield entry
+
+    async def _mark_chunk(self, entry_ids: list[EntryId], action: Action) -> None:
+        attempt = 0
+        while True:
+            try:
+                await self.do_api_request(
+                    relative_url="/v3/markers",
+                    data={
+                        "action": action,
+                        "type": "entries",
+                        "entryIds": entry_ids,
+                    },
+                )
+                return
+            except CONNECTION_ERRORS:
+                # Error responses are not resent: the scheduler has already
+                # retried those worth retrying.
+                attempt += 1
+                if attempt > self.mark_retries:
+                    raise
+                logger.warning(
+                    f"Failed to {action} {len(entry_ids)} entries, "
+                    f"retrying ({attempt}/{self.mark_retries})..."
+                )
+                await asyncio.sleep(retry_delay(attempt))
+
+    async def mark_entries(
+        self, entries: Iterable[Entry], action: Action, dry_run: bool
+    ) -> None:
+        if dry_run:
+            print([entry.title for entry in entries])
+            return
+
+        chunks = list(chunked((entry.id for entry in entries), self.mark_chunk_size))
+        if not chunks:
+            return
+
+        semaphore = asyncio.Semaphore(self.mark_concurrency)
+
+        async def try_mark_chunk(
+            entry_ids: list[EntryId],
+        ) -> Optional[BaseException]:
+            async with semaphore:
+                try:
+                    await self._mark_chunk(entry_ids, action)
+                    return None
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    return e
+
+        results = await asyncio.gather(*(try_mark_chunk(c) for c in chunks))
+        raise_for_failed_chunks(action=action, chunks=chunks, results=list(results))
+
+    async def save_entries(self, entries: Iterable[Entry], dry_run: bool) -> None:
+        await self.mark_entries(entries=entries, action="markAsSaved", dry_run=dry_run)
+
+    async def read_entries(self, entries: Iterable[Entry], dry_run: bool) -> None:
+        await self.mark_entries(entries=entries, action="markAsRead", dry_run=dry_run)
@@ -1,19 +1,64 @@
 from __future__ import annotations
 
-import functools
-import operator
+import hashlib
+import re
 from collections import defaultdict
 from pathlib import Path
 from re import Pattern
-from typing import Iterable, Literal, Mapping, Optional, cast
+from typing import (
+    Any,
+    Iterable,
+    Literal,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Union,
+    cast,
+    get_args,
+)
 
-from pydantic import BaseModel, ConfigDict, RootModel
+from logzero import logger
+from pydantic import BaseModel, ConfigDict, PrivateAttr, RootModel
 
-from feedly_regexp_marker.feedly_client import Action, Entry, StreamId
-from feedly_regexp_marker.pattern_texts import PatternTexts
+from feedly_regexp_marker.classifier_cache import ClassifierCache
+from feedly_regexp_marker.compact_entry import CompactEntry
+from feedly_regexp_marker.literal_matcher import (
+    LiteralMatcher,
+    LiteralSplit,
+    RequiredLiteralGate,
+)
+from feedly_regexp_marker.models import Action, Entry, StreamId, Subscriptions
+from feedly_regexp_marker.normalization import TextNormalization
+from feedly_regexp_marker.pattern_safety import (
+    MatchTimeout,
+    match_deadline,
+    warn_redos_risks,
+)
+from feedly_regexp_marker.pattern_texts import PatternPool, PatternTexts
+from feedly_regexp_marker.regex_engine import (
+    ActionPatterns,
+    RegexEngine,
+    RegexEngineName,
+    get_regex_engine,
+)
 from feedly_regexp_marker.rules import Rule, Rules
+from feedly_regexp_marker.subscriptions import StreamExpansion
 
 EntryAttr = Literal["title", "content"]
+ENTRY_ATTRS: tuple[EntryAttr, ...] = get_args(EntryAttr)
+IndexKey = tuple[Action, StreamId, EntryAttr]
+
+# Name reported for the patterns of rules without a `name`.
+UNNAMED_RULE = "<unnamed>"
+
+
+def rule_names_by_pattern(
+    rules: Iterable[Rule],
+) -> dict[IndexKey, dict[str, frozenset[str]]]:
+    """Names of the rules each pattern text comes from, per index key."""
+    builder = RulePatternIndexBuilder()
+    builder.add_rules(rules)
+    return builder.rule_names()
 
 
 class RulePatternIndex(
@@ -30,15 +75,10 @@ class RulePatternIndex(
         super().__init__(root=dict(root or {}))
 
     def __or__(self, other: RulePatternIndex) -> RulePatternIndex:
-        merged_root: defaultdict[tuple[Action, StreamId, EntryAttr], PatternTexts] = (
-            defaultdict(PatternTexts)
-        )
-
-        for root in [self.root, other.root]:
-            for key, pattern_texts in root.items():
-                merged_root[key] |= pattern_texts
-
-        return RulePatternIndex(merged_root)
+        builder = RulePatternIndexBuilder()
+        builder.add_index(self)
+        builder.add_index(other)
+        return builder.build()
 
     @classmethod
     def from_rule(cls, rule: Rule) -> RulePatternIndex:
@@ -52,68 +92,550 @@ class RulePatternIndex(
         )
 
     @classmethod
-    def from_rules(cls, rules: Rules) -> RulePatternIndex:
-        return functools.reduce(
-            operator.__or__,
-            (cls.from_rule(rule) for rule in rules),
-            cls(root={}),
+    def from_rules(cls, rules: Iterable[Rule]) -> RulePatternIndex:
+        builder = RulePatternIndexBuilder()
+        builder.add_rules(rules)
+        return builder.build()
+
+
+class RulePatternIndexBuilder:
+    """Accumulates rules into mutable sets and freezes them into a
+    `RulePatternIndex` once, so building takes time linear in the rules.
+
+    Merging frozen indexes pairwise copies and re-validates every key merged
+    so far, which grows quadratically with the number of rules. Rules are
+    indexed under the streams `expansion` turns their stream IDs into.
+    """
+
+    def __init__(self, expansion: Optional[StreamExpansion] = None) -> None:
+        self.expansion = expansion
+        self._texts: defaultdict[IndexKey, set[str]] = defaultdict(set)
+        self._rule_names: defaultdict[IndexKey, defaultdict[str, set[str]]] = (
+            defaultdict(lambda: defaultdict(set))
+        )
+
+    def add_rule(self, rule: Rule) -> None:
+        name = rule.name or UNNAMED_RULE
+        stream_ids = (
+            self.expansion.expand(rule.stream_ids)
+            if self.expansion is not None
+            else rule.stream_ids
         )
+        for entry_attr in ENTRY_ATTRS:
+            texts = getattr(rule.patterns, entry_attr).root
+            for action in rule.actions:
+                for stream_id in stream_ids:
+                    key = (action, stream_id, entry_attr)
+                    # Keys without patterns are kept, as in `from_rule`.
+                    self._texts[key] |= texts
+                    if texts:
+                        names = self._rule_names[key]
+                        for text in texts:
+                            names[text].add(name)
+
+    def add_rules(self, rules: Iterable[Rule]) -> None:
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_index(self, index: RulePatternIndex) -> None:
+        for key, pattern_texts in index.root.items():
+            self._texts[key] |= pattern_texts.root
+
+    def build(self) -> RulePatternIndex:
+        # Keys and texts come from validated rules and indexes already.
+        return RulePatternIndex.model_construct(
+            {
+                key: PatternTexts.model_construct(frozenset(texts))
+                for key, texts in self._texts.items()
+            }
+        )
+
+    def rule_names(self) -> dict[IndexKey, dict[str, frozenset[str]]]:
+        """Names of the rules each pattern text was added by, per index key."""
+        return {
+            key: {text: frozenset(names) for text, names in by_text.items()}
+            for key, by_text in self._rule_names.items()
+        }
+
+
+class FieldPatterns(NamedTuple):
+    """Patterns of every action for one (stream, entry attribute) pair.
+
+    Plain keyword branches of the patterns are pulled out into `literals` and
+    found in a single pass; `regexes` matches the remaining regex branches of
+    all actions with the classifier's regex engine, but only for actions
+    whose required literals (`required`) occur in the text.
+    """
+
+    literals: Optional[LiteralMatcher]
+    required: Optional[RequiredLiteralGate]
+    regexes: ActionPatterns
+    regex_actions: frozenset[Action]
+    actions: frozenset[Action]
+
+    @classmethod
+    def from_patterns(
+        cls, by_action: dict[Action, Pattern], engine: RegexEngine
+    ) -> FieldPatterns:
+        splits = {
+            action: LiteralSplit.from_pattern(pattern)
+            for action, pattern in by_action.items()
+        }
+        remainders = {
+            action: split.remainder
+            for action, split in splits.items()
+            if split.remainder is not None
+        }
+        return cls(
+            literals=LiteralMatcher.from_literals(
+                {action: split.literals for action, split in splits.items()}
+            ),
+            required=RequiredLiteralGate.from_patterns(remainders),
+            regexes=engine.compile_action_patterns(remainders),
+            regex_actions=frozenset(remainders),
+            actions=frozenset(by_action),
+        )
+
+    def matched_actions(self, text: str, found: set[Action]) -> set[Action]:
+        matched: set[Action] = set()
+        if self.literals:
+            wanted = self.actions - found
+            if wanted:
+                matched = self.literals.matched_actions(text, wanted)
+
+        remaining = [
+            a for a in sorted(self.regex_actions) if a not in found and a not in matched
+        ]
+        if remaining and self.required:
+            possible = self.required.possible_actions(text, frozenset(remaining))
+            remaining = [a for a in remaining if a in possible]
+        if not remaining:
+            return matched
+        return matched | self.regexes.matched_actions(text, remaining)
+
+
+class ClassifierStats(NamedTuple):
+    keys: int
+    patterns: int
+    fields: int
+    field_patterns: int
+
+
+class EntryView:
+    """An entry whose field texts are normalized on first use and then shared
+    by every action and pattern looking at them."""
+
+    __slots__ = ("entry", "normalization", "_texts")
+
+    def __init__(
+        self,
+        entry: CompactEntry,
+        normalization: Mapping[EntryAttr, TextNormalization],
+    ) -> None:
+        self.entry = entry
+        self.normalization = normalization
+        self._texts: dict[EntryAttr, list[str]] = {}
+
+    def texts(self, entry_attr: EntryAttr) -> list[str]:
+        texts = self._texts.get(entry_attr)
+        if texts is None:
+            if entry_attr == "title":
+                texts = [self.entry.title] if self.entry.title else []
+            else:
+                texts = [
+                    c for c in (self.entry.content, self.entry.summary) if c is not None
+                ]
+            normalization = self.normalization.get(entry_attr)
+            if normalization is not None and normalization.root:
+                texts = [normalization.apply(text) for text in texts]
+            self._texts[entry_attr] = texts
+        return texts
+
+
+EntryLike = Union[Entry, CompactEntry, EntryView]
+
+
+class ClassifierRuntime:
+    """Plain-attribute view of a classifier's matching state for the hot path.
+
+    Pydantic resolves private attributes through `__getattr__`, which takes
+    longer than matching a short title, so `Classifier` looks this object up
+    once per call or page instead of reading its private attributes per
+    field. The dicts are shared with the classifier, so quarantined patterns
+    drop out of both.
+    """
+
+    __slots__ = (
+        "field_index",
+        "search_index",
+        "normalization",
+        "max_content_chars",
+    )
+
+    def __init__(
+        self,
+        field_index: dict[tuple[StreamId, EntryAttr], FieldPatterns],
+        search_index: dict[IndexKey, Optional[Pattern]],
+        normalization: Mapping[EntryAttr, TextNormalization],
+        max_content_chars: Optional[int],
+    ) -> None:
+        self.field_index = field_index
+        self.search_index = search_index
+        self.normalization = normalization
+        self.max_content_chars = max_content_chars
+
+    def view(self, entry: EntryLike) -> EntryView:
+        if isinstance(entry, EntryView):
+            return entry
+        if isinstance(entry, Entry):
+            entry = CompactEntry.from_entry(entry, self.max_content_chars)
+        return EntryView(entry, self.normalization)
+
+    def to_act(self, entry: EntryLike, action: Action) -> bool:
+        view = self.view(entry)
+        stream_id = view.entry.stream_id
+        if stream_id is None:
+            return False
+
+        for entry_attr in ENTRY_ATTRS:
+            pattern = self.search_index.get((action, stream_id, entry_attr))
+            if pattern and any(pattern.search(text) for text in view.texts(entry_attr)):
+                return True
+
+        return False
+
+    def classify(self, entry: EntryLike) -> set[Action]:
+        actions: set[Action] = set()
+        view = self.view(entry)
+        stream_id = view.entry.stream_id
+        if stream_id is None:
+            return actions
+
+        for entry_attr in ENTRY_ATTRS:
+            field_patterns = self.field_index.get((stream_id, entry_attr))
+            if field_patterns:
+                for text in view.texts(entry_attr):
+                    actions |= field_patterns.matched_actions(text, actions)
+
+        return actions
 
 
 class Classifier(BaseModel):
     model_config = ConfigDict(frozen=True)
 
     compiled_rule_index: dict[tuple[Action, StreamId, EntryAttr], Optional[Pattern]]
+    regex_engine: RegexEngineName = "re"
+    # Which rules each pattern text of `compiled_rule_index` comes from; empty
+    # when the classifier was not built from rules.
+    rule_names: dict[IndexKey, dict[str, frozenset[str]]] = {}
+    # Seconds classifying one entry may take before its patterns are run one
+    # by one and those over the budget are dropped; None for no limit.
+    match_budget: Optional[float] = None
+    # Normalization of the texts of each entry field before matching.
+    normalization: dict[EntryAttr, TextNormalization] = {}
+    # Characters of contents and summaries matched; None for all of them.
+    max_content_chars: Optional[int] = None
+
+    _field_index: dict[tuple[StreamId, EntryAttr], FieldPatterns] = PrivateAttr(
+        default_factory=dict
+    )
+    # `compiled_rule_index` without quarantined pattern texts.
+    _search_index: dict[IndexKey, Optional[Pattern]] = PrivateAttr(default_factory=dict)
+    # Pattern texts over the match budget, by text and flags, skipped in
+    # every stream and field using them.
+    _quarantined: set[tuple[str, int]] = PrivateAttr(default_factory=set)
+    # Single pattern texts compiled on their own to classify entries over the
+    # match budget, by text and flags.
+    _text_patterns: dict[tuple[str, int], Pattern] = PrivateAttr(default_factory=dict)
+    _runtime: ClassifierRuntime = PrivateAttr()
+
+    def model_post_init(self, context: Any) -> None:
+        self._index_fields()
+
+    def _index_fields(self) -> None:
+        self._search_index = self.compiled_rule_index
+        by_field: defaultdict[tuple[StreamId, EntryAttr], dict[Action, Pattern]] = (
+            defaultdict(dict)
+        )
+        for (action, stream_id, entry_attr), pattern in sorted(
+            self._search_index.items(), key=lambda item: item[0]
+        ):
+            if pattern is not None:
+                by_field[(stream_id, entry_attr)][action] = pattern
+
+        # Fields with the same patterns, e.g. of one rule covering many
+        # streams, share one FieldPatterns.
+        engine = get_regex_engine(self.regex_engine)
+        shared: dict[tuple[tuple[Action, str, int], ...], FieldPatterns] = {}
+        self._field_index = {}
+        for key, by_action in by_field.items():
+            patterns_key = tuple(
+                (action, pattern.pattern, pattern.flags)
+                for action, pattern in by_action.items()
+            )
+            if patterns_key not in shared:
+                shared[patterns_key] = FieldPatterns.from_patterns(by_action, engine)
+            self._field_index[key] = shared[patterns_key]
+        self._use_runtime()
+
+    def _use_runtime(self) -> None:
+        self._runtime = ClassifierRuntime(
+            field_index=self._field_index,
+            search_index=self._search_index,
+            normalization=self.normalization,
+            max_content_chars=self.max_content_chars,
+        )
 
     @classmethod
     def from_rule_pattern_index(
-        cls, rule_pattern_index: RulePatternIndex
+        cls,
+        rule_pattern_index: RulePatternIndex,
+        regex_engine: RegexEngineName = "re",
+        rule_names: Optional[dict[IndexKey, dict[str, frozenset[str]]]] = None,
+        pool: Optional[PatternPool] = None,
     ) -> Classifier:
+        """Compile the index; keys with equal pattern texts share one compiled
+        pattern from `pool`, which is passed in to inspect its stats."""
+        pool = pool if pool is not None else PatternPool()
+        pattern_rules: defaultdict[str, set[str]] = defaultdict(set)
+        for key, pattern_texts in rule_pattern_index.root.items():
+            names = (rule_names or {}).get(key, {})
+            for text in pattern_texts.root:
+                pattern_rules[text] |= names.get(text, {UNNAMED_RULE})
+        warn_redos_risks(pattern_rules)
+
         return cls(
             compiled_rule_index={
-                key: pattern_texts.compile()
+                key: pool.compile(pattern_texts)
                 for key, pattern_texts in rule_pattern_index.root.items()
-            }
+            },
+            regex_engine=regex_engine,
+            rule_names=rule_names or {},
         )
 
     @classmethod
-    def from_yaml_paths(cls, yaml_paths: Iterable[Path]) -> Classifier:
-        return cls.from_rule_pattern_index(
-            functools.reduce(
-                operator.__or__,
-                (RulePatternIndex.from_rules(Rules.from_yaml(p)) for p in yaml_paths),
-                RulePatternIndex(),
-            )
+    def from_yaml_paths(
+        cls,
+        yaml_paths: Iterable[Path],
+        regex_engine: RegexEngineName = "re",
+        cache: Optional[ClassifierCache] = None,
+        match_budget: Optional[float] = None,
+        normalization: Optional[Mapping[EntryAttr, TextNormalization]] = None,
+        subscriptions: Optional[Subscriptions] = None,
+        max_content_chars: Optional[int] = None,
+    ) -> Classifier:
+        """Build a classifier from rules files, expanding the categories they
+        target into their feeds if `subscriptions` are given."""
+        yaml_paths = list(yaml_paths)
+        if cache is not None:
+            key = cache.key(yaml_paths, regex_engine, subscriptions)
+            cached = cache.load(key)
+            if isinstance(cached, cls):
+                return cached.with_settings(
+                    match_budget, normalization, max_content_chars
+                )
+
+        builder = RulePatternIndexBuilder(StreamExpansion(subscriptions))
+        for yaml_path in yaml_paths:
+            builder.add_rules(Rules.from_yaml(yaml_path))
+        clf = cls.from_rule_pattern_index(
+            builder.build(),
+            regex_engine=regex_engine,
+            rule_names=builder.rule_names(),
         )
+        if cache is not None:
+            cache.store(key, clf)
+        return clf.with_settings(match_budget, normalization, max_content_chars)
 
-    def to_act(self, entry: Entry, action: Action) -> bool:
-        if not entry.origin:
-            return False
+    def with_settings(
+        self,
+        match_budget: Optional[float] = None,
+        normalization: Optional[Mapping[EntryAttr, TextNormalization]] = None,
+        max_content_chars: Optional[int] = None,
+    ) -> Classifier:
+        """Copy with other matching settings, sharing the compiled patterns."""
+        update: dict[str, Any] = {
+            "max_content_chars": max_content_chars,
+            "match_budget": match_budget,
+            "normalization": {
+                attr: steps
+                for attr, steps in (normalization or {}).items()
+                if steps.root
+            },
+        }
+        if all(getattr(self, name) == value for name, value in update.items()):
+            return self
+        clf = self.model_copy(update=update)
+        clf._use_runtime()
+        return clf
+
+    def compact(self, entry: Entry) -> CompactEntry:
+        """The entry as this classifier reads it, e.g. to pickle to workers."""
+        return CompactEntry.from_entry(entry, self.max_content_chars)
+
+    def view(self, entry: EntryLike) -> EntryView:
+        """View of an entry to pass to several `to_act` calls, so its texts
+        are only normalized once."""
+        return self._runtime.view(entry)
+
+    def to_act(self, entry: EntryLike, action: Action) -> bool:
+        if self.match_budget is None:
+            return self._to_act(entry, action)
+        try:
+            with match_deadline(self.match_budget):
+                return self._to_act(entry, action)
+        except MatchTimeout:
+            return action in self._classify_isolated(entry)
+
+    def _to_act(self, entry: EntryLike, action: Action) -> bool:
+        return self._runtime.to_act(entry, action)
+
+    def stream_ids(self) -> set[StreamId]:
+        """Streams that have at least one pattern for any action."""
+        return {
+            stream_id
+            for (_, stream_id, _), pattern in self.compiled_rule_index.items()
+            if pattern is not None
+        }
 
-        title_pattern = self.compiled_rule_index.get(
-            (action, entry.origin.streamId, "title")
+    def stats(self) -> ClassifierStats:
+        """Counts of index keys and fields with patterns, along with the
+        distinct compiled patterns and FieldPatterns they share."""
+        patterns = [p for p in self.compiled_rule_index.values() if p is not None]
+        return ClassifierStats(
+            keys=len(patterns),
+            patterns=len({id(pattern) for pattern in patterns}),
+            fields=len(self._field_index),
+            field_patterns=len({id(fp) for fp in self._field_index.values()}),
         )
-        if entry.title and title_pattern and title_pattern.search(entry.title):
-            return True
 
-        content_pattern = self.compiled_rule_index.get(
-            (action, entry.origin.streamId, "content")
+    def fingerprint(self) -> str:
+        """Digest identifying the compiled rule set, stable across processes."""
+        digest = hashlib.sha256()
+        for key, pattern in sorted(self.compiled_rule_index.items()):
+            if pattern is not None:
+                digest.update(repr((key, pattern.pattern, pattern.flags)).encode())
+        for entry_attr, steps in sorted(self.normalization.items()):
+            digest.update(
+                repr((entry_attr, sorted(step.value for step in steps.root))).encode()
+            )
+        if self.max_content_chars is not None:
+            digest.update(repr(("max_content_chars", self.max_content_chars)).encode())
+        return digest.hexdigest()
+
+    def classify(self, entry: EntryLike) -> set[Action]:
+        """Return every action whose rules match the entry, in one pass per text.
+
+        With a `match_budget`, an entry taking longer is classified again
+        pattern by pattern, and the patterns exceeding the budget on their own
+        are skipped for the rest of the classifier's life.
+        """
+        if self.match_budget is None:
+            return self._classify(entry)
+        try:
+            with match_deadline(self.match_budget):
+                return self._classify(entry)
+        except MatchTimeout:
+            return self._classify_isolated(entry)
+
+    def _classify(self, entry: EntryLike) -> set[Action]:
+        return self._runtime.classify(entry)
+
+    def _classify_isolated(self, entry: EntryLike) -> set[Action]:
+        actions: set[Action] = set()
+        view = self.view(entry)
+        if view.entry.stream_id is None:
+            return actions
+
+        for key, pattern in sorted(
+            self.compiled_rule_index.items(), key=lambda item: item[0]
+        ):
+            action, stream_id, entry_attr = key
+            if pattern is None or stream_id != view.entry.stream_id:
+                continue
+            for text in self._pattern_texts(key):
+                compiled = self._text_patterns.get((text, pattern.flags))
+                if compiled is None:
+                    compiled = re.compile(text, pattern.flags)
+                    self._text_patterns[(text, pattern.flags)] = compiled
+                try:
+                    with match_deadline(self.match_budget):
+                        matched = any(
+                            compiled.search(t) for t in view.texts(entry_attr)
+                        )
+                except MatchTimeout:
+                    rules = self.rule_names.get(key, {}).get(text, {UNNAMED_RULE})
+                    logger.warning(
+                        f"Pattern {text!r} of rule(s) {', '.join(sorted(rules))} "
+                        f"took longer than {self.match_budget}s on entry "
+                        f"{view.entry.id}; skipping it from now on."
+                    )
+                    self._quarantine(text, pattern.flags)
+                    continue
+                if matched:
+                    actions.add(action)
+        return actions
+
+    def _pattern_texts(self, key: IndexKey) -> list[str]:
+        """Texts merged into the pattern of `key`, except quarantined ones."""
+        pattern = self.compiled_rule_index.get(key)
+        if pattern is None:
+            return []
+        return [
+            text
+            for text in sorted(self.rule_names.get(key) or [pattern.pattern])
+            if (text, pattern.flags) not in self._quarantined
+        ]
+
+    def _quarantine(self, text: str, flags: int) -> None:
+        """Stop matching a pattern text, rebuilding the patterns of every
+        field using it."""
+        self._quarantined.add((text, flags))
+        fields: set[tuple[StreamId, EntryAttr]] = set()
+        for key, pattern in self.compiled_rule_index.items():
+            if pattern is None or pattern.flags != flags:
+                continue
+            if text in (self.rule_names.get(key) or [pattern.pattern]):
+                _, stream_id, entry_attr = key
+                fields.add((stream_id, entry_attr))
+        # A copy, as the search index may be the shared compiled index.
+        search_index = dict(self._search_index)
+        by_field: defaultdict[tuple[StreamId, EntryAttr], dict[Action, Pattern]] = (
+            defaultdict(dict)
         )
-        if (
-            entry.content
-            and content_pattern
-            and content_pattern.search(entry.content.content)
-        ) or (
-            entry.summary
-            and content_pattern
-            and content_pattern.search(entry.summary.content)
+        for key, pattern in sorted(
+            self.compiled_rule_index.items(), key=lambda item: item[0]
         ):
-            return True
+            action, stream_id, entry_attr = key
+            if pattern is None or (stream_id, entry_attr) not in fields:
+                continue
+            texts = self._pattern_texts(key)
+            if texts:
+                by_field[(stream_id, entry_attr)][action] = search_index[key] = (
+                    re.compile("|".join(texts), pattern.flags)
+                )
+            else:
+                search_index.pop(key, None)
 
-        return False
+        self._search_index = search_index
+        engine = get_regex_engine(self.regex_engine)
+        for field in fields:
+            if field in by_field:
+                self._field_index[field] = FieldPatterns.from_patterns(
+                    by_field[field], engine
+                )
+            else:
+                self._field_index.pop(field, None)
+        self._use_runtime()
+
+    def classify_many(self, entries: Iterable[EntryLike]) -> list[set[Action]]:
+        if self.match_budget is None:
+            runtime = self._runtime
+            return [runtime.classify(entry) for entry in entries]
+        return [self.classify(entry) for entry in entries]
 
-    def to_save(self, entry: Entry) -> bool:
+    def to_save(self, entry: EntryLike) -> bool:
         return self.to_act(entry=entry, action="markAsSaved")
 
-    def to_read(self, entry: Entry) -> bool:
+    def to_read(self, entry: EntryLike) -> bool:
         return self.to_act(entry=entry, action="markAsRead")
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import os
+import pickle
+import sys
+from importlib import metadata
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional
+
+import pydantic
+from logzero import logger
+
+from feedly_regexp_marker.models import Subscriptions
+from feedly_regexp_marker.regex_engine import RegexEngineName, get_regex_engine
+
+if TYPE_CHECKING:
+    from feedly_regexp_marker.classifier import Classifier
+
+# Bump when the pickled classifier layout changes incompatibly.
+CACHE_FORMAT_VERSION = 3
+CACHE_SUFFIX = ".classifier.pickle"
+DEFAULT_MAX_FILES = 8
+
+
+def _package_version() -> str:
+    try:
+        return metadata.version("feedly_regexp_marker")
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+class ClassifierCache:
+    """Compiled classifiers pickled on disk, so unchanged rules load without
+    parsing and validating the YAML again.
+
+    A classifier is stored under a key derived from the content of the rules
+    files, the subscriptions categories are expanded with, and the versions
+    of everything that affects the compiled result: Python, pydantic, the
+    regex engine and this package. Any change yields a
+    new key, and the least recently written files beyond `max_files` are
+    removed.
+    """
+
+    def __init__(self, cache_dir: Path, max_files: int = DEFAULT_MAX_FILES) -> None:
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+
+    @staticmethod
+    def key(
+        yaml_paths: Iterable[Path],
+        regex_engine: RegexEngineName,
+        subscriptions: Optional[Subscriptions] = None,
+    ) -> str:
+        digest = hashlib.sha256()
+        for part in (
+            str(CACHE_FORMAT_VERSION),
+            sys.version,
+            pydantic.VERSION,
+            _package_version(),
+            regex_engine,
+            get_regex_engine(regex_engine).version(),
+        ):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        for path in yaml_paths:
+            digest.update(hashlib.sha256(path.read_bytes()).digest())
+        if subscriptions is not None:
+            # Categories in the rules expand into the feeds subscribed now.
+            digest.update(subscriptions.model_dump_json().encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{CACHE_SUFFIX}"
+
+    def load(self, key: str) -> object:
+        """Return the object stored under the key, or None if there is none."""
+        path = self._path(key)
+        try:
+            with path.open("rb") as f:
+                clf = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning(f"Ignoring unreadable classifier cache file: {path}")
+            return None
+        return clf
+
+    def store(self, key: str, clf: Classifier) -> None:
+        path = self._path(key)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("wb") as f:
+                pickle.dump(clf, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._prune()
+        except (OSError, pickle.PicklingError):
+            logger.exception(f"Failed to write classifier cache file: {path}")
+
+    def _prune(self) -> None:
+        files = sorted(
+            self.cache_dir.glob(f"*{CACHE_SUFFIX}"),
+            key=lambda p: p.stat().st_mtime_ns,
+            reverse=True,
+        )
+        for stale in itertools.islice(files, self.max_files, None):
+            stale.unlink(missing_ok=True)
@@ -0,0 +1,309 @@
+import asyncio
+import sqlite3
+from datetime import timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Annotated, Optional
+
+import typer
+from feedly.api_client.session import FileAuthStore
+from logzero import logger
+from pydantic import ValidationError
+from ruamel.yaml.parser import ParserError
+
+from feedly_regexp_marker.async_feedly_client import AsyncFeedlyClient
+from feedly_regexp_marker.classifier import Classifier, EntryAttr
+from feedly_regexp_marker.classifier_cache import ClassifierCache
+from feedly_regexp_marker.evaluation_cache import EvaluationCache
+from feedly_regexp_marker.models import Subscriptions
+from feedly_regexp_marker.normalization import NormalizationStep, TextNormalization
+from feedly_regexp_marker.pattern_safety import DEADLINE_SUPPORTED
+from feedly_regexp_marker.rate_limit import AsyncRequestScheduler, RateLimiter
+from feedly_regexp_marker.regex_engine import RegexEngineName
+from feedly_regexp_marker.subscriptions import DEFAULT_TTL as DEFAULT_SUBSCRIPTIONS_TTL
+from feedly_regexp_marker.subscriptions import SubscriptionStore
+
+RulesYamlPaths = Annotated[
+    list[Path],
+    typer.Argument(
+        file_okay=True,
+        dir_okay=False,
+        exists=True,
+        readable=True,
+        help="Path(s) to the rules YAML file(s)",
+    ),
+]
+TokenDir = Annotated[Path, typer.Option(exists=True, file_okay=False)]
+DEFAULT_TOKEN_DIR = Path.home() / ".config" / "feedly"
+ApiHost = Annotated[
+    str,
+    typer.Option(
+        envvar="FEEDLY_API_HOST",
+        help="Base URL of the Feedly API, e.g. a local stand-in server",
+    ),
+]
+
+MarkBatchSize = Annotated[
+    int, typer.Option(min=1, help="Number of entries queued before marking")
+]
+MarkChunkSize = Annotated[
+    int, typer.Option(min=1, help="Maximum number of entries per mark request")
+]
+MarkConcurrency = Annotated[
+    int, typer.Option(min=1, help="Maximum number of concurrent mark requests")
+]
+MarkRetries = Annotated[
+    int, typer.Option(min=0, help="Retries per failed mark request")
+]
+Incremental = Annotated[
+    bool,
+    typer.Option(
+        help="Only fetch entries crawled since the last successful run "
+        "with the same rules (state is kept in the token directory)"
+    ),
+]
+RequestsPerSecond = Annotated[
+    float,
+    typer.Option(
+        min=0.01,
+        help="Local request rate limit, on top of the quota reported by Feedly",
+    ),
+]
+MaxAttempts = Annotated[
+    int,
+    typer.Option(min=1, help="Attempts per request on 429 and 5xx responses"),
+]
+OnlyRuleStreams = Annotated[
+    bool,
+    typer.Option(
+        help="Fetch only the streams referenced by the rules instead of "
+        "every subscription"
+    ),
+]
+StreamConcurrency = Annotated[
+    int, typer.Option(min=1, help="Streams fetched concurrently")
+]
+EvaluationCachePath = Annotated[
+    Optional[Path],
+    typer.Option(
+        "--evaluation-cache",
+        dir_okay=False,
+        help="SQLite file remembering entries that matched no rule, "
+        "so they are not classified again until the rules change",
+    ),
+]
+EvaluationCacheMaxEntries = Annotated[int, typer.Option(min=1)]
+
+
+class RegexEngineChoice(str, Enum):
+    re = "re"
+    re2 = "re2"
+
+
+RegexEngineOption = Annotated[
+    RegexEngineChoice,
+    typer.Option(
+        help="Regex engine for classifying; re2 (google-re2) runs in linear time "
+        "and falls back to re per pattern it cannot run",
+    ),
+]
+EvaluationCacheMaxAgeDays = Annotated[float, typer.Option(min=0)]
+MatchBudget = Annotated[
+    Optional[float],
+    typer.Option(
+        min=0.001,
+        help="Seconds classifying one entry may take; slower patterns are "
+        "logged with their rule names and skipped from then on (Python 3.11+)",
+    ),
+]
+TitleNormalization = Annotated[
+    Optional[list[NormalizationStep]],
+    typer.Option(
+        "--normalize-title",
+        help="Normalization step applied to titles before matching (repeatable)",
+    ),
+]
+ContentNormalization = Annotated[
+    Optional[list[NormalizationStep]],
+    typer.Option(
+        "--normalize-content",
+        help="Normalization step applied to contents and summaries before "
+        "matching (repeatable), e.g. strip-html to match text without markup",
+    ),
+]
+Workers = Annotated[
+    int,
+    typer.Option(
+        min=1,
+        help="Processes classifying entries; more than one spreads heavy "
+        "patterns over several cores",
+    ),
+]
+ClassifierCacheDir = Annotated[
+    Optional[Path],
+    typer.Option(
+        "--classifier-cache",
+        file_okay=False,
+        help="Directory keeping compiled classifiers, so unchanged rules "
+        "load without parsing the YAML again",
+    ),
+]
+ExpandCategories = Annotated[
+    bool,
+    typer.Option(
+        help="Expand category stream IDs in the rules, e.g. "
+        "user/-/category/Tech, into the feeds subscribed in them",
+    ),
+]
+SubscriptionsTtlHours = Annotated[
+    float,
+    typer.Option(
+        min=0,
+        help="Hours the subscriptions fetched for expanding categories are "
+        "reused from the token directory",
+    ),
+]
+MaxContentChars = Annotated[
+    Optional[int],
+    typer.Option(
+        min=1,
+        help="Characters of contents and summaries kept for matching; longer "
+        "ones are truncated, so patterns only see their beginning",
+    ),
+]
+ProfileRulesOption = Annotated[
+    bool,
+    typer.Option(
+        help="Time every pattern on its own and log the rules and patterns "
+        "by match time at the end (much slower classification)",
+    ),
+]
+DEFAULT_SUBSCRIPTIONS_TTL_HOURS = DEFAULT_SUBSCRIPTIONS_TTL.total_seconds() / 3600
+
+
+def load_classifier(
+    rules_yaml_paths: list[Path],
+    regex_engine: RegexEngineName = "re",
+    classifier_cache: Optional[Path] = None,
+    match_budget: Optional[float] = None,
+    normalization: Optional[dict[EntryAttr, TextNormalization]] = None,
+    subscriptions: Optional[Subscriptions] = None,
+    max_content_chars: Optional[int] = None,
+) -> Classifier:
+    logger.info(f"Loading rules from: {', '.join(map(str, rules_yaml_paths))}")
+    if match_budget is not None and not DEADLINE_SUPPORTED:
+        logger.warning("The match budget needs Python 3.11 or later; ignoring it.")
+    try:
+        clf = Classifier.from_yaml_paths(
+            rules_yaml_paths,
+            regex_engine=regex_engine,
+            cache=ClassifierCache(classifier_cache) if classifier_cache else None,
+            match_budget=match_budget,
+            normalization=normalization,
+            subscriptions=subscriptions,
+            max_content_chars=max_content_chars,
+        )
+        logger.info("Rules loaded and classifier created successfully.")
+        stats = clf.stats()
+        logger.debug(
+            f"{stats.keys} pattern keys share {stats.patterns} compiled patterns; "
+            f"{stats.fields} fields share {stats.field_patterns} field matchers."
+        )
+        return clf
+    except (FileNotFoundError, ValidationError, ParserError):
+        logger.exception("Failed to load or parse rules.")
+        raise typer.Exit(code=1)
+    except Exception:
+        logger.exception("An unexpected error occurred during classifier creation.")
+        raise typer.Exit(code=1)
+
+
+def load_subscriptions(
+    token_dir: Path, api_host: str, ttl_hours: float
+) -> Subscriptions:
+    store = SubscriptionStore.in_dir(token_dir, ttl=timedelta(hours=ttl_hours))
+    subscriptions = store.load()
+    if subscriptions is not None:
+        return subscriptions
+
+    async def fetch() -> Subscriptions:
+        auth = FileAuthStore(token_dir=token_dir)
+        async with AsyncFeedlyClient.from_auth_token(
+            auth.auth_token, api_host=api_host
+        ) as feedly_client:
+            return await store.get(feedly_client)
+
+    try:
+        subscriptions = asyncio.run(fetch())
+    except Exception:
+        logger.exception("Failed to fetch subscriptions.")
+        raise typer.Exit(code=1)
+    logger.info(f"Fetched {len(subscriptions.root)} subscriptions.")
+    return subscriptions
+
+
+def field_normalization(
+    title_steps: Optional[list[NormalizationStep]],
+    content_steps: Optional[list[NormalizationStep]],
+) -> dict[EntryAttr, TextNormalization]:
+    return {
+        "title": TextNormalization(title_steps or []),
+        "content": TextNormalization(content_steps or []),
+    }
+
+
+def create_feedly_client(
+    token_dir: Path,
+    api_host: str,
+    mark_chunk_size: int,
+    mark_concurrency: int,
+    mark_retries: int,
+    requests_per_second: float,
+    max_attempts: int,
+    stream_concurrency: int,
+) -> AsyncFeedlyClient:
+    logger.info(f"Initializing Feedly client with token directory: {token_dir}")
+    try:
+        auth = FileAuthStore(token_dir=token_dir)
+        feedly_client = AsyncFeedlyClient.from_auth_token(
+            auth.auth_token,
+            auth=auth,
+            api_host=api_host,
+            max_connections=max(mark_concurrency, stream_concurrency) + 1,
+            mark_chunk_size=mark_chunk_size,
+            mark_concurrency=mark_concurrency,
+            mark_retries=mark_retries,
+            scheduler=AsyncRequestScheduler(
+                limiter=RateLimiter(
+                    rate=requests_per_second,
+                    burst=max(mark_concurrency, stream_concurrency),
+                ),
+                max_attempts=max_attempts,
+            ),
+        )
+        logger.info("Feedly client initialized successfully.")
+        return feedly_client
+    except Exception:
+        logger.exception("Failed to initialize Feedly client.")
+        raise typer.Exit(code=1)
+
+
+def open_evaluation_cache(
+    path: Optional[Path],
+    rules_fingerprint: str,
+    max_entries: int,
+    max_age_days: float,
+) -> Optional[EvaluationCache]:
+    if not path:
+        return None
+    logger.info(f"Using evaluation cache: {path}")
+    try:
+        return EvaluationCache(
+            path,
+            rules_fingerprint=rules_fingerprint,
+            max_entries=max_entries,
+            max_age=timedelta(days=max_age_days),
+        )
+    except sqlite3.Error:
+        logger.exception("Failed to open the evaluation cache.")
+        raise typer.Exit(code=1)
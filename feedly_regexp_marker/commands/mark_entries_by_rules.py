@@ -1,114 +1,177 @@
-from pathlib import Path
-from typing import Annotated
+import asyncio
+from typing import cast
 
 import typer
-from feedly.api_client.session import FeedlySession, FileAuthStore
+from aiohttp import ClientError
 from logzero import logger
-from pydantic import ValidationError
-from requests import RequestException
-from ruamel.yaml.parser import ParserError
 
-from feedly_regexp_marker.classifier import Classifier
-from feedly_regexp_marker.feedly_client import FeedlyClient
+from feedly_regexp_marker.async_feedly_client import DEFAULT_API_HOST
+from feedly_regexp_marker.commands.common import (
+    DEFAULT_SUBSCRIPTIONS_TTL_HOURS,
+    DEFAULT_TOKEN_DIR,
+    ApiHost,
+    ClassifierCacheDir,
+    ContentNormalization,
+    EvaluationCacheMaxAgeDays,
+    EvaluationCacheMaxEntries,
+    EvaluationCachePath,
+    ExpandCategories,
+    Incremental,
+    MarkBatchSize,
+    MarkChunkSize,
+    MarkConcurrency,
+    MarkRetries,
+    MatchBudget,
+    MaxAttempts,
+    MaxContentChars,
+    OnlyRuleStreams,
+    ProfileRulesOption,
+    RegexEngineChoice,
+    RegexEngineOption,
+    RequestsPerSecond,
+    RulesYamlPaths,
+    StreamConcurrency,
+    SubscriptionsTtlHours,
+    TitleNormalization,
+    TokenDir,
+    Workers,
+    create_feedly_client,
+    field_normalization,
+    load_classifier,
+    load_subscriptions,
+    open_evaluation_cache,
+)
+from feedly_regexp_marker.evaluation_cache import DEFAULT_MAX_AGE, DEFAULT_MAX_ENTRIES
+from feedly_regexp_marker.feedly_client import (
+    DEFAULT_MARK_CHUNK_SIZE,
+    DEFAULT_MARK_CONCURRENCY,
+    DEFAULT_MARK_RETRIES,
+)
+from feedly_regexp_marker.parallel import ParallelClassifier
+from feedly_regexp_marker.pipeline import (
+    CycleOptions,
+    CycleResult,
+    log_cycle_result,
+    run_marking_cycle,
+)
+from feedly_regexp_marker.rate_limit import DEFAULT_MAX_ATTEMPTS, DEFAULT_RATE
+from feedly_regexp_marker.regex_engine import RegexEngineName
+from feedly_regexp_marker.rule_profile import RuleProfiler
+from feedly_regexp_marker.watermark import WatermarkStore
 
 app = typer.Typer()
 
 
 @app.command()
 def mark_entries_by_rules(
-    rules_yaml_paths: Annotated[
-        list[Path],
-        typer.Argument(
-            file_okay=True,
-            dir_okay=False,
-            exists=True,
-            readable=True,
-            help="Path(s) to the rules YAML file(s)",
-        ),
-    ],
-    token_dir: Annotated[Path, typer.Option(exists=True, file_okay=False)] = Path.home()
-    / ".config"
-    / "feedly",
+    rules_yaml_paths: RulesYamlPaths,
+    token_dir: TokenDir = DEFAULT_TOKEN_DIR,
+    api_host: ApiHost = DEFAULT_API_HOST,
     dry_run: bool = False,
+    mark_batch_size: MarkBatchSize = 4000,
+    mark_chunk_size: MarkChunkSize = DEFAULT_MARK_CHUNK_SIZE,
+    mark_concurrency: MarkConcurrency = DEFAULT_MARK_CONCURRENCY,
+    mark_retries: MarkRetries = DEFAULT_MARK_RETRIES,
+    incremental: Incremental = False,
+    requests_per_second: RequestsPerSecond = DEFAULT_RATE,
+    max_attempts: MaxAttempts = DEFAULT_MAX_ATTEMPTS,
+    only_rule_streams: OnlyRuleStreams = False,
+    stream_concurrency: StreamConcurrency = 4,
+    evaluation_cache: EvaluationCachePath = None,
+    evaluation_cache_max_entries: EvaluationCacheMaxEntries = DEFAULT_MAX_ENTRIES,
+    evaluation_cache_max_age_days: EvaluationCacheMaxAgeDays = DEFAULT_MAX_AGE.days,
+    regex_engine: RegexEngineOption = RegexEngineChoice.re,
+    classifier_cache: ClassifierCacheDir = None,
+    match_budget: MatchBudget = None,
+    normalize_title: TitleNormalization = None,
+    normalize_content: ContentNormalization = None,
+    workers: Workers = 1,
+    expand_categories: ExpandCategories = False,
+    subscriptions_ttl_hours: SubscriptionsTtlHours = DEFAULT_SUBSCRIPTIONS_TTL_HOURS,
+    max_content_chars: MaxContentChars = None,
+    profile_rules: ProfileRulesOption = False,
 ):
     logger.info("Starting feedly-regexp-marker process...")
     if dry_run:
         logger.warning("Dry run mode enabled. No entries will be marked.")
 
     try:
-        logger.info(f"Loading rules from: {', '.join(map(str, rules_yaml_paths))}")
-        try:
-            clf = Classifier.from_yaml_paths(rules_yaml_paths)
-            logger.info("Rules loaded and classifier created successfully.")
-        except (FileNotFoundError, ValidationError, ParserError):
-            logger.exception("Failed to load or parse rules.")
-            raise typer.Exit(code=1)
-        except Exception:
-            logger.exception("An unexpected error occurred during classifier creation.")
-            raise typer.Exit(code=1)
-
-        logger.info(f"Initializing Feedly client with token directory: {token_dir}")
-        try:
-            auth = FileAuthStore(token_dir=token_dir)
-            session = FeedlySession(auth=auth)
-            feedly_client = FeedlyClient(session=session)
-            logger.info("Feedly client initialized successfully.")
-        except Exception:
-            logger.exception("Failed to initialize Feedly client.")
-            raise typer.Exit(code=1)
-
-        logger.info("Fetching unread entries...")
-        try:
-            entries = list(feedly_client.fetch_all_unread_entries())
-            logger.info(f"Fetched {len(entries)} unread entries.")
-        except RequestException:
-            logger.exception("Failed to fetch entries from Feedly API.")
-            raise typer.Exit(code=1)
-        except Exception:
-            logger.exception("An unexpected error occurred during entry fetching.")
-            raise typer.Exit(code=1)
+        subscriptions = (
+            load_subscriptions(token_dir, api_host, subscriptions_ttl_hours)
+            if expand_categories
+            else None
+        )
+        clf = load_classifier(
+            rules_yaml_paths,
+            regex_engine=cast(RegexEngineName, regex_engine.value),
+            classifier_cache=classifier_cache,
+            match_budget=match_budget,
+            normalization=field_normalization(normalize_title, normalize_content),
+            subscriptions=subscriptions,
+            max_content_chars=max_content_chars,
+        )
+        cache = open_evaluation_cache(
+            path=evaluation_cache,
+            rules_fingerprint=clf.fingerprint(),
+            max_entries=evaluation_cache_max_entries,
+            max_age_days=evaluation_cache_max_age_days,
+        )
+        profiler = RuleProfiler(clf) if profile_rules else None
+        if profiler is not None and workers > 1:
+            logger.warning("Rule profiling runs in this process; ignoring --workers.")
+            workers = 1
+        options = CycleOptions(
+            dry_run=dry_run,
+            mark_batch_size=mark_batch_size,
+            incremental=incremental,
+            only_rule_streams=only_rule_streams,
+            stream_concurrency=stream_concurrency,
+        )
 
-        logger.info("Classifying entries to save...")
-        try:
-            entries_to_save = [entry for entry in entries if clf.to_save(entry)]
-            logger.info(f"Found {len(entries_to_save)} entries to save.")
-            if entries_to_save:
-                feedly_client.save_entries(
-                    entries=entries_to_save,
-                    dry_run=dry_run,
-                )
-                action_verb = "Would save" if dry_run else "Saved"
-                logger.info(f"{action_verb} {len(entries_to_save)} entries.")
-            else:
-                logger.info("No entries to save.")
-        except RequestException:
-            logger.exception("Failed to save entries via Feedly API.")
-            raise typer.Exit(code=1)
-        except Exception:
-            logger.exception("An unexpected error occurred during saving entries.")
-            raise typer.Exit(code=1)
+        async def run() -> CycleResult:
+            feedly_client = create_feedly_client(
+                token_dir=token_dir,
+                api_host=api_host,
+                mark_chunk_size=mark_chunk_size,
+                mark_concurrency=mark_concurrency,
+                mark_retries=mark_retries,
+                requests_per_second=requests_per_second,
+                max_attempts=max_attempts,
+                stream_concurrency=stream_concurrency,
+            )
+            with ParallelClassifier(clf, workers) as parallel:
+                async with feedly_client:
+                    logger.info("Fetching, classifying and marking unread entries...")
+                    return await run_marking_cycle(
+                        clf=clf,
+                        feedly_client=feedly_client,
+                        options=options,
+                        watermark_store=WatermarkStore.in_dir(token_dir),
+                        evaluation_cache=cache,
+                        entry_classifier=profiler if profiler is not None else parallel,
+                    )
 
-        logger.info("Classifying entries to mark as read...")
         try:
-            entries_to_read = [entry for entry in entries if clf.to_read(entry)]
-            logger.info(f"Found {len(entries_to_read)} entries to mark as read.")
-            if entries_to_read:
-                feedly_client.read_entries(
-                    entries=entries_to_read,
-                    dry_run=dry_run,
-                )
-                action_verb = "Would mark as read" if dry_run else "Marked as read"
-                logger.info(f"{action_verb} {len(entries_to_read)} entries.")
-            else:
-                logger.info("No entries to mark as read.")
-        except RequestException:
-            logger.exception("Failed to mark entries as read via Feedly API.")
+            result = asyncio.run(run())
+        except typer.Exit:
+            raise
+        except ClientError:
+            logger.exception("Failed to fetch or mark entries via Feedly API.")
             raise typer.Exit(code=1)
         except Exception:
             logger.exception(
-                "An unexpected error occurred during marking entries as read."
+                "An unexpected error occurred during classifying and marking entries."
             )
             raise typer.Exit(code=1)
+        finally:
+            if cache is not None:
+                cache.close()
+
+        log_cycle_result(result, dry_run=dry_run)
+        if profiler is not None:
+            profiler.log_report()
+        if result.failed:
+            raise typer.Exit(code=1)
 
         logger.info("feedly-regexp-marker process finished successfully.")
     except typer.Exit:
@@ -0,0 +1,284 @@
+import asyncio
+from datetime import timedelta
+from pathlib import Path
+from typing import Annotated, Any, Optional, cast
+
+import typer
+from aiohttp import ClientError
+from logzero import logger
+
+from feedly_regexp_marker.async_feedly_client import DEFAULT_API_HOST
+from feedly_regexp_marker.classifier import Classifier
+from feedly_regexp_marker.classifier_cache import ClassifierCache
+from feedly_regexp_marker.commands.common import (
+    DEFAULT_SUBSCRIPTIONS_TTL_HOURS,
+    DEFAULT_TOKEN_DIR,
+    ApiHost,
+    ClassifierCacheDir,
+    ContentNormalization,
+    EvaluationCacheMaxAgeDays,
+    EvaluationCacheMaxEntries,
+    EvaluationCachePath,
+    ExpandCategories,
+    Incremental,
+    MarkBatchSize,
+    MarkChunkSize,
+    MarkConcurrency,
+    MarkRetries,
+    MatchBudget,
+    MaxAttempts,
+    MaxContentChars,
+    OnlyRuleStreams,
+    RegexEngineChoice,
+    RegexEngineOption,
+    RequestsPerSecond,
+    RulesYamlPaths,
+    StreamConcurrency,
+    SubscriptionsTtlHours,
+    TitleNormalization,
+    TokenDir,
+    Workers,
+    create_feedly_client,
+    field_normalization,
+    load_classifier,
+    load_subscriptions,
+    open_evaluation_cache,
+)
+from feedly_regexp_marker.evaluation_cache import (
+    DEFAULT_MAX_AGE,
+    DEFAULT_MAX_ENTRIES,
+    EvaluationCache,
+)
+from feedly_regexp_marker.feedly_client import (
+    DEFAULT_MARK_CHUNK_SIZE,
+    DEFAULT_MARK_CONCURRENCY,
+    DEFAULT_MARK_RETRIES,
+)
+from feedly_regexp_marker.models import Subscriptions
+from feedly_regexp_marker.parallel import ParallelClassifier
+from feedly_regexp_marker.pipeline import (
+    CycleOptions,
+    log_cycle_result,
+    run_marking_cycle,
+)
+from feedly_regexp_marker.rate_limit import DEFAULT_MAX_ATTEMPTS, DEFAULT_RATE
+from feedly_regexp_marker.regex_engine import RegexEngineName
+from feedly_regexp_marker.rules_watcher import RulesWatcher
+from feedly_regexp_marker.subscriptions import SubscriptionStore
+from feedly_regexp_marker.watermark import WatermarkStore
+
+app = typer.Typer()
+
+
+def reload_classifier(
+    rules_yaml_paths: list[Path],
+    previous: Classifier,
+    classifier_cache: Optional[Path] = None,
+    subscriptions: Optional[Subscriptions] = None,
+) -> Optional[Classifier]:
+    """Build a classifier from the changed rules or subscriptions with the
+    settings of the previous one, or return None to keep the previous one."""
+    logger.info("Reloading rules...")
+    try:
+        clf = Classifier.from_yaml_paths(
+            rules_yaml_paths,
+            regex_engine=previous.regex_engine,
+            cache=ClassifierCache(classifier_cache) if classifier_cache else None,
+            match_budget=previous.match_budget,
+            normalization=previous.normalization,
+            subscriptions=subscriptions,
+            max_content_chars=previous.max_content_chars,
+        )
+    except Exception:
+        logger.exception("Failed to reload rules, keeping the previous ones.")
+        return None
+    logger.info("Rules reloaded successfully.")
+    return clf
+
+
+async def watch_loop(
+    rules_yaml_paths: list[Path],
+    clf: Classifier,
+    watcher: RulesWatcher,
+    token_dir: Path,
+    options: CycleOptions,
+    interval: float,
+    max_cycles: int,
+    evaluation_cache: Optional[EvaluationCache],
+    client_kwargs: dict[str, Any],
+    classifier_cache: Optional[Path] = None,
+    workers: int = 1,
+    subscription_store: Optional[SubscriptionStore] = None,
+    subscriptions: Optional[Subscriptions] = None,
+) -> None:
+    """Run marking cycles, reloading the classifier when the rules change or,
+    with a `subscription_store`, when refreshed subscriptions differ from the
+    ones its categories were expanded with.
+
+    `watcher` must have taken its stamps before `clf` was built, so rules
+    saved while it was being built are reloaded in the first cycle.
+    """
+    watermark_store = WatermarkStore.in_dir(token_dir)
+    feedly_client = create_feedly_client(token_dir=token_dir, **client_kwargs)
+    parallel = ParallelClassifier(clf, workers)
+
+    try:
+        async with feedly_client:
+            cycles = 0
+            while True:
+                changed = watcher.changed()
+                if subscription_store is not None:
+                    try:
+                        refreshed: Optional[Subscriptions] = (
+                            await subscription_store.get(feedly_client)
+                        )
+                    except (ClientError, OSError):
+                        logger.exception(
+                            "Failed to refresh subscriptions, keeping the previous ones."
+                        )
+                        refreshed = subscriptions
+                    if refreshed != subscriptions:
+                        logger.info("Subscriptions changed.")
+                        subscriptions = refreshed
+                        changed = True
+                if changed:
+                    # Swap in the new classifier only once it is fully built.
+                    reloaded = reload_classifier(
+                        rules_yaml_paths, clf, classifier_cache, subscriptions
+                    )
+                    if reloaded is not None:
+                        clf = reloaded
+                        parallel.close()
+                        parallel = ParallelClassifier(clf, workers)
+
+                logger.info("Fetching, classifying and marking unread entries...")
+                try:
+                    result = await run_marking_cycle(
+                        clf=clf,
+                        feedly_client=feedly_client,
+                        options=options,
+                        watermark_store=watermark_store,
+                        evaluation_cache=evaluation_cache,
+                        entry_classifier=parallel,
+                    )
+                    log_cycle_result(result, dry_run=options.dry_run)
+                except ClientError:
+                    logger.exception("Failed to fetch or mark entries via Feedly API.")
+                except Exception:
+                    logger.exception("An unexpected error occurred during the cycle.")
+
+                cycles += 1
+                if max_cycles and cycles >= max_cycles:
+                    return
+                await asyncio.sleep(interval)
+    finally:
+        parallel.close()
+
+
+@app.command()
+def watch(
+    rules_yaml_paths: RulesYamlPaths,
+    token_dir: TokenDir = DEFAULT_TOKEN_DIR,
+    api_host: ApiHost = DEFAULT_API_HOST,
+    interval: Annotated[
+        float, typer.Option(min=1, help="Seconds to wait between cycles")
+    ] = 900,
+    max_cycles: Annotated[
+        int, typer.Option(min=0, help="Stop after this many cycles (0: never)")
+    ] = 0,
+    dry_run: bool = False,
+    mark_batch_size: MarkBatchSize = 4000,
+    mark_chunk_size: MarkChunkSize = DEFAULT_MARK_CHUNK_SIZE,
+    mark_concurrency: MarkConcurrency = DEFAULT_MARK_CONCURRENCY,
+    mark_retries: MarkRetries = DEFAULT_MARK_RETRIES,
+    incremental: Incremental = True,
+    requests_per_second: RequestsPerSecond = DEFAULT_RATE,
+    max_attempts: MaxAttempts = DEFAULT_MAX_ATTEMPTS,
+    only_rule_streams: OnlyRuleStreams = False,
+    stream_concurrency: StreamConcurrency = 4,
+    evaluation_cache: EvaluationCachePath = None,
+    evaluation_cache_max_entries: EvaluationCacheMaxEntries = DEFAULT_MAX_ENTRIES,
+    evaluation_cache_max_age_days: EvaluationCacheMaxAgeDays = DEFAULT_MAX_AGE.days,
+    regex_engine: RegexEngineOption = RegexEngineChoice.re,
+    classifier_cache: ClassifierCacheDir = None,
+    match_budget: MatchBudget = None,
+    normalize_title: TitleNormalization = None,
+    normalize_content: ContentNormalization = None,
+    workers: Workers = 1,
+    expand_categories: ExpandCategories = False,
+    subscriptions_ttl_hours: SubscriptionsTtlHours = DEFAULT_SUBSCRIPTIONS_TTL_HOURS,
+    max_content_chars: MaxContentChars = None,
+):
+    """Keep the rules and the Feedly session loaded and mark entries periodically.
+
+    The rules files are checked before every cycle and reloaded when changed.
+    """
+    logger.info("Starting feedly-regexp-marker watch...")
+    if dry_run:
+        logger.warning("Dry run mode enabled. No entries will be marked.")
+
+    subscription_store = (
+        SubscriptionStore.in_dir(
+            token_dir, ttl=timedelta(hours=subscriptions_ttl_hours)
+        )
+        if expand_categories
+        else None
+    )
+    subscriptions = (
+        load_subscriptions(token_dir, api_host, subscriptions_ttl_hours)
+        if expand_categories
+        else None
+    )
+    watcher = RulesWatcher(rules_yaml_paths)
+    clf = load_classifier(
+        rules_yaml_paths,
+        regex_engine=cast(RegexEngineName, regex_engine.value),
+        classifier_cache=classifier_cache,
+        match_budget=match_budget,
+        normalization=field_normalization(normalize_title, normalize_content),
+        subscriptions=subscriptions,
+        max_content_chars=max_content_chars,
+    )
+    cache = open_evaluation_cache(
+        path=evaluation_cache,
+        rules_fingerprint=clf.fingerprint(),
+        max_entries=evaluation_cache_max_entries,
+        max_age_days=evaluation_cache_max_age_days,
+    )
+    try:
+        asyncio.run(
+            watch_loop(
+                rules_yaml_paths=rules_yaml_paths,
+                clf=clf,
+                watcher=watcher,
+                token_dir=token_dir,
+                options=CycleOptions(
+                    dry_run=dry_run,
+                    mark_batch_size=mark_batch_size,
+                    incremental=incremental,
+                    only_rule_streams=only_rule_streams,
+                    stream_concurrency=stream_concurrency,
+                ),
+                interval=interval,
+                max_cycles=max_cycles,
+                evaluation_cache=cache,
+                client_kwargs=dict(
+                    api_host=api_host,
+                    mark_chunk_size=mark_chunk_size,
+                    mark_concurrency=mark_concurrency,
+                    mark_retries=mark_retries,
+                    requests_per_second=requests_per_second,
+                    max_attempts=max_attempts,
+                    stream_concurrency=stream_concurrency,
+                ),
+                classifier_cache=classifier_cache,
+                workers=workers,
+                subscription_store=subscription_store,
+                subscriptions=subscriptions,
+            )
+        )
+    except KeyboardInterrupt:
+        logger.info("Interrupted, stopping.")
+    finally:
+        if cache is not None:
+            cache.close()
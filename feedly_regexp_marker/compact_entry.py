@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import sys
+from typing import NamedTuple, Optional
+
+from feedly_regexp_marker.models import Entry, EntryId, StreamId
+
+
+class CompactEntry(NamedTuple):
+    """The fields of an `Entry` classification reads, as a plain tuple.
+
+    Entries are validated by pydantic once, when a page is parsed; matching,
+    and pickling entries to worker processes, then goes through these tuples,
+    which are smaller and cheaper to read than the nested models. Stream IDs
+    are interned, so the entries of a feed share one string.
+    """
+
+    id: EntryId
+    stream_id: Optional[StreamId]
+    title: Optional[str]
+    content: Optional[str]
+    summary: Optional[str]
+
+    @classmethod
+    def from_entry(
+        cls, entry: Entry, max_content_chars: Optional[int] = None
+    ) -> CompactEntry:
+        """Compact an entry, keeping at most `max_content_chars` characters of
+        its content and summary."""
+        content = entry.content.content if entry.content else None
+        summary = entry.summary.content if entry.summary else None
+        if max_content_chars is not None:
+            content = content[:max_content_chars] if content is not None else None
+            summary = summary[:max_content_chars] if summary is not None else None
+        return cls(
+            id=entry.id,
+            stream_id=sys.intern(entry.origin.streamId) if entry.origin else None,
+            title=entry.title,
+            content=content,
+            summary=summary,
+        )
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+from feedly_regexp_marker.feedly_client import chunked
+from feedly_regexp_marker.models import Entry, EntryId
+
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_MAX_AGE = timedelta(days=30)
+
+# Stays below SQLITE_MAX_VARIABLE_NUMBER of older SQLite builds.
+_QUERY_CHUNK_SIZE = 500
+
+
+class EvaluationCache:
+    """SQLite record of entries already evaluated against a rule set.
+
+    The rules fingerprint is stored alongside the entries; opening the cache
+    with a different fingerprint forgets every recorded entry, so all entries
+    are evaluated again after the rules change.
+    """
+
+    def __init__(
+        self,
+        path: Union[Path, str],
+        rules_fingerprint: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_age: timedelta = DEFAULT_MAX_AGE,
+    ) -> None:
+        self.rules_fingerprint = rules_fingerprint
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS evaluated ("
+                "entry_id TEXT PRIMARY KEY, evaluated_at REAL NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS evaluated_at_idx "
+                "ON evaluated (evaluated_at)"
+            )
+        self.use_rules(rules_fingerprint)
+
+    def use_rules(self, rules_fingerprint: str) -> None:
+        """Switch to a rule set, forgetting every entry if it has changed."""
+        self.rules_fingerprint = rules_fingerprint
+        with self.connection:
+            if self._stored_fingerprint() != rules_fingerprint:
+                self.connection.execute("DELETE FROM evaluated")
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('rules_fingerprint', ?)",
+                    (rules_fingerprint,),
+                )
+
+    def _stored_fingerprint(self) -> Optional[str]:
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'rules_fingerprint'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> EvaluationCache:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def evaluated_ids(self, entry_ids: Iterable[EntryId]) -> set[EntryId]:
+        found: set[EntryId] = set()
+        for chunk in chunked(entry_ids, _QUERY_CHUNK_SIZE):
+            found.update(
+                row[0]
+                for row in self.connection.execute(
+                    "SELECT entry_id FROM evaluated WHERE entry_id IN "
+                    f"({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+            )
+        return found
+
+    def unevaluated(self, entries: list[Entry]) -> list[Entry]:
+        evaluated = self.evaluated_ids(entry.id for entry in entries)
+        return [entry for entry in entries if entry.id not in evaluated]
+
+    def record(self, entry_ids: Iterable[EntryId]) -> None:
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO evaluated VALUES (?, ?)",
+                ((entry_id, now) for entry_id in entry_ids),
+            )
+
+    def evict(self) -> int:
+        """Drop entries older than `max_age` and beyond the newest `max_entries`."""
+        with self.connection:
+            deleted = self.connection.execute(
+                "DELETE FROM evaluated WHERE evaluated_at < ?",
+                (time.time() - self.max_age.total_seconds(),),
+            ).rowcount
+            deleted += self.connection.execute(
+                "DELETE FROM evaluated WHERE entry_id NOT IN ("
+                "SELECT entry_id FROM evaluated "
+                "ORDER BY evaluated_at DESC LIMIT ?)",
+                (self.max_entries,),
+            ).rowcount
+        return deleted
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM evaluated").fetchone()[0]
@@ -1,50 +1,81 @@
 from __future__ import annotations
 
-from typing import Any, Generator, Iterable, Literal, Optional
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Generator, Iterable, Iterator, Optional, TypeVar
 
+import requests
+from feedly.api_client.protocol import ServerAPIError
 from feedly.api_client.session import FeedlySession
-from pydantic import BaseModel, ConfigDict
+from logzero import logger
+from requests import RequestException
 
-StreamId = str
-EntryId = str
-Action = Literal["markAsSaved", "markAsRead"]
+from feedly_regexp_marker.models import Action, Entry, EntryId, StreamContents
 
+T = TypeVar("T")
 
-class EntryContent(BaseModel):
-    content: str
-    model_config = ConfigDict(frozen=True)
+DEFAULT_MARK_CHUNK_SIZE = 1000
+DEFAULT_MARK_CONCURRENCY = 4
+DEFAULT_MARK_RETRIES = 2
 
+# Failures of a mark request worth sending it again for; other error
+# responses, e.g. 400, 401 or 429, would only fail again.
+RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout, ServerAPIError)
 
-class EntryOrigin(BaseModel):
-    streamId: StreamId
-    title: Optional[str] = None
-    model_config = ConfigDict(frozen=True)
 
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    if size < 1:
+        raise ValueError("size must be positive")
+    iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
 
-class Entry(BaseModel):
-    """https://developer.feedly.com/v3/entries/#get-the-content-of-an-entry"""
 
-    id: EntryId
-    title: Optional[str] = None
-    content: Optional[EntryContent] = None
-    summary: Optional[EntryContent] = None
-    origin: Optional[EntryOrigin] = None
-    model_config = ConfigDict(frozen=True)
+def retry_delay(attempt: int) -> float:
+    """Seconds to wait before retrying a chunk for the `attempt`-th time."""
+    return float(2 ** (attempt - 1))
 
 
-class StreamContents(BaseModel):
-    """https://developers.feedly.com/v3/streams/#get-the-content-of-a-stream"""
+class MarkEntriesError(Exception):
+    """Raised when some chunks of a mark request failed after all retries.
 
-    items: list[Entry]
-    continuation: Optional[str] = None
-    model_config = ConfigDict(frozen=True)
+    The other chunks were submitted successfully.
+    """
+
+    def __init__(
+        self,
+        action: Action,
+        failed_entry_ids: list[EntryId],
+        marked_count: int,
+        errors: list[BaseException],
+    ) -> None:
+        super().__init__(
+            f"Failed to {action} {len(failed_entry_ids)} entries "
+            f"({marked_count} succeeded): {errors[0]!r}"
+        )
+        self.action = action
+        self.failed_entry_ids = failed_entry_ids
+        self.marked_count = marked_count
+        self.errors = errors
 
 
 class FeedlyClient:
-    def __init__(self, session: FeedlySession) -> None:
+    def __init__(
+        self,
+        session: FeedlySession,
+        mark_chunk_size: int = DEFAULT_MARK_CHUNK_SIZE,
+        mark_concurrency: int = DEFAULT_MARK_CONCURRENCY,
+        mark_retries: int = DEFAULT_MARK_RETRIES,
+    ) -> None:
         self.session = session
+        self.mark_chunk_size = mark_chunk_size
+        self.mark_concurrency = mark_concurrency
+        self.mark_retries = mark_retries
 
-    def fetch_all_unread_entries(self) -> Generator[Entry, Any, None]:
+    def fetch_all_unread_entries(
+        self, newer_than: Optional[int] = None
+    ) -> Generator[Entry, Any, None]:
         continuation = None
 
         while True:
@@ -59,6 +90,7 @@ class FeedlyClient:
                             "unreadOnly": "true",
                         }
                         | ({"continuation": continuation} if continuation else dict())
+                        | ({"newerThan": str(newer_than)} if newer_than else dict())
                     ),
                 )
             )
@@ -70,6 +102,38 @@ class FeedlyClient:
 
             continuation = stream_contents.continuation
 
+    def _mark_chunk(self, entry_ids: list[EntryId], action: Action) -> None:
+        attempt = 0
+        while True:
+            try:
+                self.session.do_api_request(
+                    relative_url="/v3/markers",
+                    data={
+                        "action": action,
+                        "type": "entries",
+                        "entryIds": entry_ids,
+                    },
+                )
+                return
+            except RETRYABLE_ERRORS:
+                attempt += 1
+                if attempt > self.mark_retries:
+                    raise
+                logger.warning(
+                    f"Failed to {action} {len(entry_ids)} entries, "
+                    f"retrying ({attempt}/{self.mark_retries})..."
+                )
+                time.sleep(retry_delay(attempt))
+
+    def _try_mark_chunk(
+        self, entry_ids: list[EntryId], action: Action
+    ) -> Optional[BaseException]:
+        try:
+            self._mark_chunk(entry_ids, action)
+            return None
+        except RequestException as e:
+            return e
+
     def mark_entries(
         self, entries: Iterable[Entry], action: Action, dry_run: bool
     ) -> None:
@@ -77,20 +141,47 @@ class FeedlyClient:
             print([entry.title for entry in entries])
             return
 
-        if not entries:
+        chunks = list(chunked((entry.id for entry in entries), self.mark_chunk_size))
+        if not chunks:
             return
 
-        self.session.do_api_request(
-            relative_url="/v3/markers",
-            data={
-                "action": action,
-                "type": "entries",
-                "entryIds": [entry.id for entry in entries],
-            },
-        )
+        if len(chunks) == 1:
+            results: list[Optional[BaseException]] = [
+                self._try_mark_chunk(chunks[0], action)
+            ]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.mark_concurrency, len(chunks))
+            ) as executor:
+                results = list(
+                    executor.map(lambda c: self._try_mark_chunk(c, action), chunks)
+                )
+
+        raise_for_failed_chunks(action=action, chunks=chunks, results=results)
 
     def save_entries(self, entries: Iterable[Entry], dry_run: bool) -> None:
         self.mark_entries(entries=entries, action="markAsSaved", dry_run=dry_run)
 
     def read_entries(self, entries: Iterable[Entry], dry_run: bool) -> None:
         self.mark_entries(entries=entries, action="markAsRead", dry_run=dry_run)
+
+
+def raise_for_failed_chunks(
+    action: Action,
+    chunks: list[list[EntryId]],
+    results: list[Optional[BaseException]],
+) -> None:
+    errors = [error for error in results if error is not None]
+    if not errors:
+        return
+    raise MarkEntriesError(
+        action=action,
+        failed_entry_ids=[
+            entry_id
+            for chunk, error in zip(chunks, results)
+            if error is not None
+            for entry_id in chunk
+        ],
+        marked_count=sum(len(c) for c, error in zip(chunks, results) if error is None),
+        errors=errors,
+    )
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from re import Pattern
+from typing import Any, Callable, Iterable, Mapping, NamedTuple, Optional
+
+from feedly_regexp_marker.models import Action
+
+try:
+    import re._parser as sre_parse  # type: ignore[import-not-found]
+except ImportError:  # Python < 3.11
+    import sre_parse  # type: ignore[no-redef]
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Shorter required literals occur in too many texts to be worth checking.
+MIN_REQUIRED_LITERAL_LENGTH = 3
+
+# Case-insensitive literals are compared after str.lower(), which is only
+# faithful for ASCII without the letters `re` also matches with ı, ſ and K.
+_UNSAFE_FOLDED = re.compile(r"[^\x00-\x7f]|[iksIKS]")
+
+_REPEATS = tuple(
+    op
+    for op in (
+        sre_parse.MAX_REPEAT,
+        sre_parse.MIN_REPEAT,
+        getattr(sre_parse, "POSSESSIVE_REPEAT", None),
+    )
+    if op is not None
+)
+
+# Below this many literals, one substring search per literal beats walking
+# a pure-Python automaton character by character.
+SUBSTRING_SCAN_MAX_LITERALS = 128
+
+# Flags every str pattern carries; anything else changes how literals match.
+_DEFAULT_FLAGS = re.compile("").flags
+
+# Group references are renumbered when a pattern is split or wrapped in a
+# named group, so patterns using them are left untouched.
+GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+
+def split_alternation(source: str) -> list[str]:
+    """Split a pattern source at its top-level `|` operators."""
+    branches = []
+    start = depth = class_start = 0
+    in_class = escaped = False
+    for i, char in enumerate(source):
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]" or i == class_start
+        elif char == "[":
+            in_class = True
+            # A `]` right after `[` or `[^` is a literal member of the class.
+            class_start = i + 2 if source.startswith("^", i + 1) else i + 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            branches.append(source[start:i])
+            start = i + 1
+    branches.append(source[start:])
+    return branches
+
+
+def literal_text(branch: str) -> Optional[str]:
+    """Return the text a branch matches if it is a plain literal, else None."""
+    if not branch:
+        return None
+    try:
+        parsed = sre_parse.parse(branch)
+    except re.error:
+        return None
+    if parsed.state.flags & ~_DEFAULT_FLAGS:
+        return None
+    if any(op is not sre_parse.LITERAL for op, _ in parsed.data):
+        return None
+    return "".join(chr(code) for _, code in parsed.data)
+
+
+def _mandatory_runs(items: Iterable[tuple[Any, Any]], runs: list[str]) -> None:
+    """Collect runs of literal characters every match of `items` contains."""
+    run: list[str] = []
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        runs.append("".join(run))
+        run = []
+        if op is sre_parse.SUBPATTERN:
+            _, add_flags, del_flags, sub = av
+            if not add_flags and not del_flags:
+                _mandatory_runs(sub, runs)
+        elif op in _REPEATS:
+            low, _, sub = av
+            if low >= 1:
+                _mandatory_runs(sub, runs)
+        elif op is getattr(sre_parse, "ATOMIC_GROUP", None):
+            _mandatory_runs(av, runs)
+    runs.append("".join(run))
+
+
+class RequiredLiteral(NamedTuple):
+    """A substring of every text a pattern matches, lowercased if `ignore_case`."""
+
+    text: str
+    ignore_case: bool
+
+    @classmethod
+    def from_branch(cls, branch: str, flags: int) -> Optional[RequiredLiteral]:
+        try:
+            parsed = sre_parse.parse(branch, flags)
+        except re.error:
+            return None
+        flags = parsed.state.flags
+        if flags & re.LOCALE:
+            return None
+
+        runs: list[str] = []
+        _mandatory_runs(parsed, runs)
+        ignore_case = bool(flags & re.IGNORECASE)
+        if ignore_case:
+            # Only ASCII text without the letters that also fold to non-ASCII
+            # characters compares safely after str.lower().
+            runs = [
+                part.lower()
+                for run in runs
+                for part in re.split("[^\x00-\x7f]|[iksIKS]", run)
+            ]
+        runs = [run for run in runs if len(run) >= MIN_REQUIRED_LITERAL_LENGTH]
+        if not runs:
+            return None
+        return cls(text=max(runs, key=len), ignore_case=ignore_case)
+
+
+def pattern_branches(pattern: Pattern) -> list[str]:
+    """Top-level branches of a str pattern, or the whole pattern if unsafe to split."""
+    if not isinstance(pattern.pattern, str):
+        return []
+    if GROUP_REFERENCE.search(pattern.pattern):
+        return [pattern.pattern]
+    return split_alternation(pattern.pattern)
+
+
+class LiteralSplit(NamedTuple):
+    """A pattern separated into its literal branches and the regex remainder.
+
+    `pattern.search(text)` is truthy exactly when one of `literals` occurs in
+    the text or `remainder` (if any) matches it.
+    """
+
+    literals: list[str]
+    remainder: Optional[Pattern]
+
+    @classmethod
+    def from_pattern(cls, pattern: Pattern) -> LiteralSplit:
+        if (
+            not isinstance(pattern.pattern, str)
+            or pattern.flags & ~_DEFAULT_FLAGS
+            or GROUP_REFERENCE.search(pattern.pattern)
+        ):
+            return cls(literals=[], remainder=pattern)
+
+        literals: list[str] = []
+        others: list[str] = []
+        for branch in split_alternation(pattern.pattern):
+            literal = literal_text(branch)
+            if literal is None:
+                others.append(branch)
+            else:
+                literals.append(literal)
+
+        if not literals:
+            return cls(literals=[], remainder=pattern)
+        if not others:
+            return cls(literals=literals, remainder=None)
+        try:
+            remainder = re.compile("|".join(others), pattern.flags)
+        except re.error:
+            return cls(literals=[], remainder=pattern)
+        return cls(literals=literals, remainder=remainder)
+
+
+class AhoCorasick:
+    """Pure-Python Aho-Corasick automaton reporting the labels of found words."""
+
+    def __init__(self, words: Mapping[str, frozenset[Action]]) -> None:
+        self.goto: list[dict[str, int]] = [{}]
+        self.output: list[frozenset[Action]] = [frozenset()]
+        for word, labels in words.items():
+            node = 0
+            for char in word:
+                next_node = self.goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self.goto)
+                    self.goto.append({})
+                    self.output.append(frozenset())
+                    self.goto[node][char] = next_node
+                node = next_node
+            self.output[node] |= labels
+
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, next_node in self.goto[node].items():
+                queue.append(next_node)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_node] = self.goto[fallback].get(char, 0)
+                self.output[next_node] |= self.output[self.fail[next_node]]
+
+    def search(self, text: str, wanted: frozenset[Action]) -> set[Action]:
+        """Return the wanted labels of every word occurring in the text."""
+        goto, fail, output = self.goto, self.fail, self.output
+        found: set[Action] = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found |= output[node] & wanted
+                if found == wanted:
+                    break
+        return found
+
+
+class LiteralMatcher:
+    """Finds which actions have one of their literals in a text in one pass.
+
+    Few literals are searched one by one with `str.__contains__`. Larger sets
+    go through an Aho-Corasick automaton: the `pyahocorasick` C extension
+    when it is installed, or `AhoCorasick` otherwise.
+    """
+
+    def __init__(self, literals: Mapping[str, frozenset[Action]]) -> None:
+        self.literals = dict(literals)
+        self._search: Callable[[str, frozenset[Action]], set[Action]]
+        if len(self.literals) <= SUBSTRING_SCAN_MAX_LITERALS:
+            self._search = self._scan
+        elif ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for word, labels in self.literals.items():
+                self._automaton.add_word(word, labels)
+            self._automaton.make_automaton()
+            self._search = self._search_extension
+        else:
+            self._search = AhoCorasick(self.literals).search
+
+    @classmethod
+    def from_literals(
+        cls, literals_by_action: Mapping[Action, Iterable[str]]
+    ) -> Optional[LiteralMatcher]:
+        labels: dict[str, frozenset[Action]] = {}
+        for action, literals in literals_by_action.items():
+            for literal in literals:
+                labels[literal] = labels.get(literal, frozenset()) | {action}
+        return cls(labels) if labels else None
+
+    def matched_actions(self, text: str, wanted: frozenset[Action]) -> set[Action]:
+        """Return the wanted actions having at least one literal in the text."""
+        return self._search(text, wanted)
+
+    def _scan(self, text: str, wanted: frozenset[Action]) -> set[Action]:
+        found: set[Action] = set()
+        for literal, labels in self.literals.items():
+            new = (labels & wanted) - found
+            if new and literal in text:
+                found |= new
+                if found == wanted:
+                    break
+        return found
+
+    def _search_extension(self, text: str, wanted: frozenset[Action]) -> set[Action]:
+        found: set[Action] = set()
+        for _, labels in self._automaton.iter(text):
+            found |= labels & wanted
+            if found == wanted:
+                break
+        return found
+
+
+class RequiredLiteralGate:
+    """Tells which actions' regexes can possibly match a text.
+
+    An action is gated when every branch of its pattern has a required
+    literal; if none of those literals occurs in the text, its regex cannot
+    match and need not run.
+    """
+
+    def __init__(
+        self,
+        exact: Optional[LiteralMatcher],
+        folded: Optional[LiteralMatcher],
+        ungated: frozenset[Action],
+    ) -> None:
+        self.exact = exact
+        self.folded = folded
+        self.ungated = ungated
+
+    @classmethod
+    def from_patterns(
+        cls, by_action: Mapping[Action, Pattern]
+    ) -> Optional[RequiredLiteralGate]:
+        exact: dict[Action, list[str]] = {}
+        folded: dict[Action, list[str]] = {}
+        ungated: set[Action] = set()
+        for action, pattern in by_action.items():
+            branches = pattern_branches(pattern)
+            literals = [
+                literal
+                for branch in branches
+                if (literal := RequiredLiteral.from_branch(branch, pattern.flags))
+            ]
+            if not branches or len(literals) < len(branches):
+                ungated.add(action)
+                continue
+            for literal in literals:
+                by_case = folded if literal.ignore_case else exact
+                by_case.setdefault(action, []).append(literal.text)
+
+        if not exact and not folded:
+            return None
+        return cls(
+            exact=LiteralMatcher.from_literals(exact),
+            folded=LiteralMatcher.from_literals(folded),
+            ungated=frozenset(ungated),
+        )
+
+    def possible_actions(self, text: str, wanted: frozenset[Action]) -> set[Action]:
+        possible = set(wanted & self.ungated)
+        rest = wanted - possible
+        if rest and self.exact:
+            possible |= self.exact.matched_actions(text, rest)
+            rest = wanted - possible
+        if rest and self.folded:
+            possible |= self.folded.matched_actions(text.lower(), rest)
+        return possible
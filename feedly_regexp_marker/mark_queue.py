@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Protocol
+
+from logzero import logger
+
+from feedly_regexp_marker.feedly_client import MarkEntriesError
+from feedly_regexp_marker.models import Action, Entry
+
+
+class EntryMarker(Protocol):
+    async def mark_entries(
+        self, entries: list[Entry], action: Action, dry_run: bool
+    ) -> None: ...
+
+
+class MarkQueue:
+    """Buffers entries per action and submits them in bounded batches.
+
+    Only the id and title of a queued entry are kept, so the memory held by the
+    queue depends on `batch_size` and not on how many entries pass through it.
+    A partially failed batch is logged and counted in `failed` instead of
+    stopping the queue.
+    """
+
+    def __init__(self, marker: EntryMarker, batch_size: int, dry_run: bool) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.marker = marker
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.pending: dict[Action, list[Entry]] = {}
+        self.marked: Counter[Action] = Counter()
+        self.failed: Counter[Action] = Counter()
+
+    async def put(self, entry: Entry, action: Action) -> None:
+        batch = self.pending.setdefault(action, [])
+        batch.append(Entry(id=entry.id, title=entry.title))
+        if len(batch) >= self.batch_size:
+            await self._flush_action(action)
+
+    async def flush(self) -> None:
+        for action in list(self.pending):
+            await self._flush_action(action)
+
+    async def _flush_action(self, action: Action) -> None:
+        batch = self.pending.pop(action, [])
+        if not batch:
+            return
+        try:
+            await self.marker.mark_entries(
+                entries=batch, action=action, dry_run=self.dry_run
+            )
+        except MarkEntriesError as e:
+            logger.error(str(e))
+            self.marked[action] += e.marked_count
+            self.failed[action] += len(e.failed_entry_ids)
+            return
+        self.marked[action] += len(batch)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, RootModel
+
+StreamId = str
+EntryId = str
+Action = Literal["markAsSaved", "markAsRead"]
+
+
+class EntryContent(BaseModel):
+    content: str
+    model_config = ConfigDict(frozen=True)
+
+
+class EntryOrigin(BaseModel):
+    streamId: StreamId
+    title: Optional[str] = None
+    model_config = ConfigDict(frozen=True)
+
+
+class Entry(BaseModel):
+    """https://developer.feedly.com/v3/entries/#get-the-content-of-an-entry"""
+
+    id: EntryId
+    title: Optional[str] = None
+    content: Optional[EntryContent] = None
+    summary: Optional[EntryContent] = None
+    origin: Optional[EntryOrigin] = None
+    crawled: Optional[int] = None
+    model_config = ConfigDict(frozen=True)
+
+
+class StreamContents(BaseModel):
+    """https://developers.feedly.com/v3/streams/#get-the-content-of-a-stream"""
+
+    items: list[Entry]
+    continuation: Optional[str] = None
+    model_config = ConfigDict(frozen=True)
+
+
+class SubscriptionCategory(BaseModel):
+    id: StreamId
+    label: Optional[str] = None
+    model_config = ConfigDict(frozen=True)
+
+
+class Subscription(BaseModel):
+    """https://developers.feedly.com/v3/subscriptions/#get-the-users-subscriptions"""
+
+    id: StreamId
+    categories: list[SubscriptionCategory] = []
+    model_config = ConfigDict(frozen=True)
+
+
+class Subscriptions(RootModel[list[Subscription]]):
+    model_config = ConfigDict(frozen=True)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import html
+import re
+import unicodedata
+from enum import Enum
+from typing import Iterable
+
+from pydantic import ConfigDict, RootModel
+
+_HTML_SKIPPED = re.compile(
+    r"<!--.*?-->|<(script|style)\b.*?</\1\s*>", re.DOTALL | re.IGNORECASE
+)
+_HTML_TAG = re.compile(r"<[^>]*>")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class NormalizationStep(str, Enum):
+    strip_html = "strip-html"
+    decode_entities = "decode-entities"
+    nfkc = "nfkc"
+    case_fold = "casefold"
+    collapse_whitespace = "collapse-whitespace"
+
+
+def strip_html(text: str) -> str:
+    """Drop tags, comments, scripts and styles, leaving a space per tag so
+    words in adjacent elements do not run together."""
+    return _HTML_TAG.sub(" ", _HTML_SKIPPED.sub(" ", text))
+
+
+def collapse_whitespace(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+_APPLY = {
+    NormalizationStep.strip_html: strip_html,
+    NormalizationStep.decode_entities: html.unescape,
+    NormalizationStep.nfkc: lambda text: unicodedata.normalize("NFKC", text),
+    NormalizationStep.case_fold: str.casefold,
+    NormalizationStep.collapse_whitespace: collapse_whitespace,
+}
+
+
+class TextNormalization(RootModel[frozenset[NormalizationStep]]):
+    """Steps applied to a field's text before matching.
+
+    Steps always run in the order `NormalizationStep` lists them, so entities
+    are decoded after tags are stripped and `&lt;b&gt;` stays text.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    def __init__(self, root: Iterable[NormalizationStep] = frozenset()) -> None:
+        super().__init__(root=frozenset(root))
+
+    def apply(self, text: str) -> str:
+        for step in NormalizationStep:
+            if step in self.root:
+                text = _APPLY[step](text)
+        return text
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from types import TracebackType
+from typing import Iterable, Optional, Union
+
+from feedly_regexp_marker.classifier import Classifier
+from feedly_regexp_marker.compact_entry import CompactEntry
+from feedly_regexp_marker.models import Action, Entry, EntryId
+
+# Entries per task; smaller chunks balance better, larger ones pickle less.
+DEFAULT_CHUNK_SIZE = 64
+
+_worker_classifier: Optional[Classifier] = None
+
+
+def _init_worker(clf: Classifier) -> None:
+    global _worker_classifier
+    _worker_classifier = clf
+
+
+def _classify_chunk(
+    entries: list[CompactEntry],
+) -> list[tuple[EntryId, set[Action]]]:
+    assert _worker_classifier is not None, "worker was not initialized"
+    return [(entry.id, _worker_classifier.classify(entry)) for entry in entries]
+
+
+class ParallelClassifier:
+    """Classifies entries in a pool of worker processes.
+
+    `re` holds the GIL while it matches, so only processes spread the work
+    over several cores. The classifier is pickled once per worker by the
+    pool initializer; afterwards only chunks of compact entries go out and
+    `(entry_id, actions)` pairs come back. Workers are spawned rather than
+    forked, as forking a process running an event loop and threads is
+    unsafe. With one worker, entries are classified in this process.
+    """
+
+    def __init__(
+        self,
+        clf: Classifier,
+        workers: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be positive")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.clf = clf
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        if workers > 1:
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(clf,),
+            )
+
+    def __enter__(self) -> ParallelClassifier:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def classify_many(
+        self, entries: Iterable[Union[Entry, CompactEntry]]
+    ) -> list[set[Action]]:
+        entries = list(entries)
+        if self._executor is None or len(entries) <= 1:
+            return self.clf.classify_many(entries)
+
+        compact = [
+            self.clf.compact(entry) if isinstance(entry, Entry) else entry
+            for entry in entries
+        ]
+        # Every worker gets at least one chunk of a page smaller than
+        # `workers * chunk_size`.
+        size = min(self.chunk_size, math.ceil(len(compact) / self.workers))
+        chunks = [
+            compact[start:stop]
+            for start, stop in zip(
+                range(0, len(compact), size), range(size, len(compact) + size, size)
+            )
+        ]
+        actions_by_id = {
+            entry_id: actions
+            for chunk_result in self._executor.map(_classify_chunk, chunks)
+            for entry_id, actions in chunk_result
+        }
+        return [actions_by_id[entry.id] for entry in entries]
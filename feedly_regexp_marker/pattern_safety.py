@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import itertools
+import re
+import signal
+import string
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterable, Iterator, Mapping, Optional
+
+from logzero import logger
+
+try:
+    import re._parser as sre_parse  # type: ignore[import-not-found]
+except ImportError:  # Python < 3.11
+    import sre_parse  # type: ignore[no-redef]
+
+NESTED_QUANTIFIER = "nested quantifier"
+OVERLAPPING_ALTERNATION = "overlapping alternation under a quantifier"
+
+# First characters are compared over ASCII; classes and `.` stand for their
+# ASCII members, which is enough to tell e.g. `\d` from `\s` apart.
+_ASCII = frozenset(range(128))
+_CATEGORIES = {
+    sre_parse.CATEGORY_DIGIT: frozenset(map(ord, string.digits)),
+    sre_parse.CATEGORY_WORD: frozenset(map(ord, string.ascii_letters + "_0123456789")),
+    sre_parse.CATEGORY_SPACE: frozenset(
+        map(ord, string.whitespace + "\x1c\x1d\x1e\x1f")
+    ),
+}
+_CATEGORIES.update(
+    {
+        sre_parse.CATEGORY_NOT_DIGIT: _ASCII - _CATEGORIES[sre_parse.CATEGORY_DIGIT],
+        sre_parse.CATEGORY_NOT_WORD: _ASCII - _CATEGORIES[sre_parse.CATEGORY_WORD],
+        sre_parse.CATEGORY_NOT_SPACE: _ASCII - _CATEGORIES[sre_parse.CATEGORY_SPACE],
+    }
+)
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+_ANCHORS = (sre_parse.AT,)
+
+# `re` is only known to check for signals while it backtracks from Python
+# 3.11 on; before, a timer may not fire until a runaway search has ended.
+DEADLINE_SUPPORTED = sys.version_info >= (3, 11)
+
+
+class MatchTimeout(Exception):
+    """Raised inside `match_deadline` when its time is up."""
+
+
+@contextmanager
+def match_deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Raise `MatchTimeout` in the block once `seconds` have passed.
+
+    `re` checks for signals while it backtracks, so an interval timer stops
+    even a runaway search. Signals only reach the main thread, so elsewhere,
+    where `setitimer` is missing (Windows) and before Python 3.11 (see
+    `DEADLINE_SUPPORTED`), the block runs unbounded. Deadlines do not nest.
+    """
+    if (
+        not seconds
+        or not DEADLINE_SUPPORTED
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def expire(signum: int, frame: Any) -> None:
+        raise MatchTimeout(f"Matching took longer than {seconds}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _first_chars(items: Iterable[tuple[Any, Any]], ignore_case: bool) -> frozenset[int]:
+    """Approximate set of characters a match of `items` can start with."""
+    for op, av in items:
+        if op in _ANCHORS:
+            continue
+        if op is sre_parse.LITERAL:
+            if ignore_case:
+                return frozenset({ord(chr(av).lower()), ord(chr(av).upper())})
+            return frozenset({av})
+        if op is sre_parse.IN:
+            chars: set[int] = set()
+            negate = False
+            for member_op, member_av in av:
+                if member_op is sre_parse.NEGATE:
+                    negate = True
+                elif member_op is sre_parse.LITERAL:
+                    chars.add(member_av)
+                elif member_op is sre_parse.RANGE:
+                    low, high = member_av
+                    chars.update(range(low, min(high, 127) + 1))
+                elif member_op is sre_parse.CATEGORY:
+                    chars |= _CATEGORIES.get(member_av, _ASCII)
+            if ignore_case:
+                chars |= {ord(chr(c).swapcase()) for c in chars if chr(c).isascii()}
+            return frozenset(_ASCII - chars if negate else chars)
+        if op is sre_parse.SUBPATTERN:
+            return _first_chars(av[-1], ignore_case)
+        if op is sre_parse.BRANCH:
+            return frozenset().union(*(_first_chars(b, ignore_case) for b in av[1]))
+        if op in _REPEATS and av[0] >= 1:
+            return _first_chars(av[2], ignore_case)
+        # Anything else, including optional repeats, may start anywhere.
+        return _ASCII
+    return frozenset()
+
+
+def _scan(
+    items: Iterable[tuple[Any, Any]],
+    repeat_max: int,
+    ignore_case: bool,
+    risks: set[str],
+) -> None:
+    """Collect risks in `items`, which repeat up to `repeat_max` times."""
+    for op, av in items:
+        if op in _REPEATS:
+            _, high, sub = av
+            if (
+                high > 1
+                and repeat_max > 1
+                and sre_parse.MAXREPEAT in (high, repeat_max)
+            ):
+                risks.add(NESTED_QUANTIFIER)
+            _scan(sub, max(high, repeat_max), ignore_case, risks)
+        elif op is sre_parse.BRANCH:
+            branches = av[1]
+            if repeat_max > 1:
+                firsts = [_first_chars(b, ignore_case) for b in branches]
+                if any(a & b for a, b in itertools.combinations(firsts, 2)):
+                    risks.add(OVERLAPPING_ALTERNATION)
+            for branch in branches:
+                _scan(branch, repeat_max, ignore_case, risks)
+        elif op is sre_parse.SUBPATTERN:
+            _scan(av[-1], repeat_max, ignore_case, risks)
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            _scan(av[1], repeat_max, ignore_case, risks)
+        # Atomic groups and possessive repeats never backtrack into themselves.
+
+
+def redos_risks(source: str, flags: int = 0) -> list[str]:
+    """Constructs in a pattern that can make `re` backtrack exponentially.
+
+    This is a heuristic: `(a+)+` and `(ab|\\wc)*` are flagged, but a flagged
+    pattern may still be harmless on real texts.
+    """
+    try:
+        parsed = sre_parse.parse(source, flags)
+    except re.error:
+        return []
+    risks: set[str] = set()
+    _scan(parsed, 1, bool(parsed.state.flags & re.IGNORECASE), risks)
+    return sorted(risks)
+
+
+def warn_redos_risks(
+    pattern_rules: Mapping[str, Iterable[str]],
+) -> dict[str, list[str]]:
+    """Log every pattern with ReDoS risks along with the rules using it."""
+    risky: dict[str, list[str]] = {}
+    for text, rules in sorted(pattern_rules.items()):
+        risks = redos_risks(text)
+        if not risks:
+            continue
+        risky[text] = risks
+        logger.warning(
+            f"Pattern {text!r} of rule(s) {', '.join(sorted(rules))} may "
+            f"backtrack exponentially ({', '.join(risks)})."
+        )
+    return risky
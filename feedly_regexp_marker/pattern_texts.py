@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import re
+import time
 from re import Pattern
-from typing import Annotated, Iterable, Optional
+from typing import Annotated, Iterable, NamedTuple, Optional
 
 from pydantic import ConfigDict, RootModel, StringConstraints
 
@@ -21,4 +22,45 @@ class PatternTexts(RootModel[frozenset[PatternText]]):
     def compile(self) -> Optional[Pattern]:
         if not self.root:
             return None
-        return re.compile("|".join(self.root))
+        # Sorted so the compiled pattern does not depend on set iteration order.
+        return re.compile("|".join(sorted(self.root)))
+
+
+class PatternPoolStats(NamedTuple):
+    requested: int
+    compiled: int
+    seconds: float
+
+    @property
+    def reused(self) -> int:
+        return self.requested - self.compiled
+
+
+class PatternPool:
+    """Compiles each distinct set of pattern texts once.
+
+    Sets are keyed by their sorted texts, so equal sets share one compiled
+    pattern object, however they were built.
+    """
+
+    def __init__(self) -> None:
+        self._patterns: dict[tuple[str, ...], Optional[Pattern]] = {}
+        self.requested = 0
+        self.seconds = 0.0
+
+    def compile(self, pattern_texts: PatternTexts) -> Optional[Pattern]:
+        self.requested += 1
+        key = tuple(sorted(pattern_texts.root))
+        if key in self._patterns:
+            return self._patterns[key]
+        start = time.perf_counter()
+        pattern = self._patterns[key] = pattern_texts.compile()
+        self.seconds += time.perf_counter() - start
+        return pattern
+
+    def stats(self) -> PatternPoolStats:
+        return PatternPoolStats(
+            requested=self.requested,
+            compiled=len(self._patterns),
+            seconds=self.seconds,
+        )
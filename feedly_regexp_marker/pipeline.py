@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from typing import AsyncIterator, Iterable, Optional, Protocol
+
+from logzero import logger
+from pydantic import BaseModel, ConfigDict
+
+from feedly_regexp_marker.async_feedly_client import AsyncFeedlyClient
+from feedly_regexp_marker.classifier import Classifier
+from feedly_regexp_marker.evaluation_cache import EvaluationCache
+from feedly_regexp_marker.mark_queue import MarkQueue
+from feedly_regexp_marker.models import Action, Entry, StreamContents
+from feedly_regexp_marker.watermark import Watermark, WatermarkStore
+
+
+class CycleOptions(BaseModel):
+    dry_run: bool = False
+    mark_batch_size: int = 4000
+    incremental: bool = False
+    only_rule_streams: bool = False
+    stream_concurrency: int = 4
+    model_config = ConfigDict(frozen=True)
+
+
+class CycleResult(BaseModel):
+    fetched: int
+    marked: dict[Action, int]
+    failed: dict[Action, int]
+    model_config = ConfigDict(frozen=True)
+
+
+class EntryClassifier(Protocol):
+    def classify_many(self, entries: Iterable[Entry]) -> list[set[Action]]: ...
+
+
+def classify_page(
+    clf: EntryClassifier,
+    entries: list[Entry],
+    evaluation_cache: Optional[EvaluationCache],
+) -> list[tuple[Entry, set[Action]]]:
+    if evaluation_cache is not None:
+        entries = evaluation_cache.unevaluated(entries)
+
+    classified = list(zip(entries, clf.classify_many(entries)))
+
+    if evaluation_cache is not None:
+        evaluation_cache.record(
+            entry.id for entry, actions in classified if not actions
+        )
+
+    return classified
+
+
+async def run_marking_cycle(
+    clf: Classifier,
+    feedly_client: AsyncFeedlyClient,
+    options: CycleOptions,
+    watermark_store: WatermarkStore,
+    evaluation_cache: Optional[EvaluationCache] = None,
+    entry_classifier: Optional[EntryClassifier] = None,
+) -> CycleResult:
+    """Fetch unread entries page by page, classify them and mark the matches.
+
+    The watermark is only advanced when every mark request succeeded. Entries
+    are classified by `entry_classifier` if given, e.g. a `RuleProfiler` or a
+    `ParallelClassifier` wrapping `clf`.
+    """
+    rules_fingerprint = clf.fingerprint()
+    if evaluation_cache is not None:
+        evaluation_cache.use_rules(rules_fingerprint)
+
+    watermark = Watermark(newer_than=0, rules_fingerprint=rules_fingerprint)
+    newer_than = None
+    if options.incremental:
+        user_id = await feedly_client.fetch_user_id()
+        previous = watermark_store.load(user_id)
+        if previous:
+            newer_than = previous.newer_than_for(rules_fingerprint)
+            if newer_than is None:
+                logger.info("Rules changed since the last run.")
+            else:
+                watermark = previous
+        if newer_than is None:
+            logger.info("Running a full scan of unread entries.")
+        else:
+            logger.info(f"Fetching entries crawled after {newer_than}.")
+
+    pages: AsyncIterator[StreamContents]
+    if options.only_rule_streams:
+        stream_ids = clf.stream_ids()
+        logger.info(f"Fetching {len(stream_ids)} streams referenced by rules.")
+        pages = feedly_client.fetch_unread_pages_of_streams(
+            stream_ids,
+            newer_than=newer_than,
+            max_concurrent_streams=options.stream_concurrency,
+        )
+    else:
+        pages = feedly_client.fetch_unread_pages(newer_than=newer_than)
+
+    mark_queue = MarkQueue(
+        marker=feedly_client,
+        batch_size=options.mark_batch_size,
+        dry_run=options.dry_run,
+    )
+    classifier: EntryClassifier = (
+        entry_classifier if entry_classifier is not None else clf
+    )
+    fetched = 0
+    try:
+        async for stream_contents in pages:
+            watermark = watermark.advanced(stream_contents.items)
+            for entry, actions in classify_page(
+                classifier, stream_contents.items, evaluation_cache
+            ):
+                for action in sorted(actions):
+                    await mark_queue.put(entry, action)
+            fetched += len(stream_contents.items)
+            logger.info(f"Processed {fetched} unread entries so far.")
+        await mark_queue.flush()
+    finally:
+        if evaluation_cache is not None:
+            evicted = evaluation_cache.evict()
+            logger.info(
+                f"Evaluation cache holds {len(evaluation_cache)} entries "
+                f"({evicted} evicted)."
+            )
+
+    if options.incremental and not options.dry_run and not mark_queue.failed:
+        watermark_store.save(user_id, watermark)
+        logger.info(f"Saved watermark {watermark.newer_than}.")
+
+    return CycleResult(
+        fetched=fetched,
+        marked=dict(mark_queue.marked),
+        failed=dict(mark_queue.failed),
+    )
+
+
+def log_cycle_result(result: CycleResult, dry_run: bool) -> None:
+    logger.info(f"Fetched {result.fetched} unread entries.")
+    save_verb = "Would save" if dry_run else "Saved"
+    logger.info(f"{save_verb} {result.marked.get('markAsSaved', 0)} entries.")
+    read_verb = "Would mark as read" if dry_run else "Marked as read"
+    logger.info(f"{read_verb} {result.marked.get('markAsRead', 0)} entries.")
+    if result.failed:
+        logger.error(
+            "Failed to mark some entries: "
+            + ", ".join(f"{a}={n}" for a, n in result.failed.items())
+        )
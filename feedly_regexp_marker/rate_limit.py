@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Mapping, Optional
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+DEFAULT_RATE = 10.0
+DEFAULT_BURST = 10
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_CAP = 60.0
+
+
+def parse_retry_after(value: Optional[str], now: float) -> Optional[float]:
+    """Seconds to wait according to a Retry-After header (delta or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - now, 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Token bucket that also tracks the quota reported by Feedly.
+
+    Requests are spaced by a local token bucket (`rate` per second, bursts of
+    `burst`). When the `X-RateLimit-*` headers report the remaining quota, up
+    to that many requests are let through at the bucket rate, after which
+    requests wait for the reported reset. `block_for` holds every request back,
+    e.g. after a `Retry-After`.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate and burst must be positive")
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated_at = clock()
+        self.blocked_until = 0.0
+        self.quota_remaining: Optional[int] = None
+        self.quota_reset_at = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self) -> float:
+        """Take a slot for one request and return the seconds to wait for it."""
+        now = self.clock()
+        self._refill(now)
+
+        if self.quota_remaining is not None:
+            if self.quota_remaining > 0:
+                self.quota_remaining -= 1
+            else:
+                if now < self.quota_reset_at:
+                    self.blocked_until = max(self.blocked_until, self.quota_reset_at)
+                # The quota after the reset is unknown until the next response.
+                self.quota_remaining = None
+        start = max(now, self.blocked_until)
+
+        # Tokens may go negative: every reservation queues behind the previous.
+        self.tokens -= 1
+        if self.tokens < 0:
+            start = max(start, now - self.tokens / self.rate)
+        return start - now
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        limit = _int_header(headers, "X-RateLimit-Limit")
+        count = _int_header(headers, "X-RateLimit-Count")
+        reset = _int_header(headers, "X-RateLimit-Reset")
+        if limit is None or count is None or reset is None:
+            return
+        self.quota_remaining = max(limit - count, 0)
+        self.quota_reset_at = self.clock() + reset
+
+    def block_for(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = DEFAULT_BACKOFF_BASE,
+    cap: float = DEFAULT_BACKOFF_CAP,
+    rng: Optional[Callable[[float, float], float]] = None,
+) -> float:
+    """Full-jitter exponential backoff for the `attempt`-th retry."""
+    return (rng or random.uniform)(0.0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class AsyncRequestScheduler:
+    """Paces and retries the requests of one or more async Feedly clients."""
+
+    def __init__(
+        self,
+        limiter: Optional[RateLimiter] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_cap: float = DEFAULT_BACKOFF_CAP,
+    ) -> None:
+        self.limiter = limiter or RateLimiter()
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+    async def acquire(self) -> None:
+        delay = self.limiter.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        self.limiter.update(headers)
+
+    def should_retry(self, status: int, attempt: int) -> bool:
+        return status in RETRYABLE_STATUSES and attempt < self.max_attempts
+
+    async def backoff(self, attempt: int, headers: Mapping[str, str]) -> None:
+        retry_after = parse_retry_after(headers.get("Retry-After"), time.time())
+        if retry_after is not None:
+            # Hold back every request sharing this scheduler, not just this one.
+            self.limiter.block_for(retry_after)
+            delay = retry_after + backoff_delay(1, self.backoff_base, self.backoff_base)
+        else:
+            delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+        await asyncio.sleep(delay)
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import re
+import sys
+from importlib import metadata
+from re import Pattern
+from typing import Literal, NamedTuple, Optional, Protocol
+
+from logzero import logger
+
+from feedly_regexp_marker.literal_matcher import GROUP_REFERENCE, pattern_branches
+from feedly_regexp_marker.models import Action
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+RegexEngineName = Literal["re", "re2"]
+
+# Python's \d, \w and \s are Unicode-aware on str patterns; RE2's are ASCII.
+_RE2_CLASS_BODIES = {
+    "d": r"\p{Nd}",
+    "w": r"\p{L}\p{N}_",
+    "s": r"\t\n\x0b\f\r\x1c-\x1f\x85\p{Z}",
+}
+_RE2_FLAGS = {re.IGNORECASE: "i", re.MULTILINE: "m", re.DOTALL: "s"}
+_UNICODE_ESCAPE = re.compile(r"\\(?:u([0-9a-fA-F]{4})|U([0-9a-fA-F]{8}))")
+_OPEN_LOWER_BOUND = re.compile(r"\{,\d*\}")
+
+# RE2's default 8 MiB is too little for sets of patterns using the Unicode
+# classes \d, \w and \s are rewritten to.
+RE2_MAX_MEM = 64 << 20
+
+
+class ActionPatterns(Protocol):
+    def matched_actions(self, text: str, remaining: list[Action]) -> set[Action]: ...
+
+
+class RegexEngine(Protocol):
+    name: RegexEngineName
+
+    def version(self) -> str: ...
+
+    def compile_action_patterns(
+        self, by_action: dict[Action, Pattern]
+    ) -> ActionPatterns: ...
+
+
+class StdlibActionPatterns(NamedTuple):
+    """Per-action `re` patterns, merged into one named-group pattern if possible,
+    so a text is scanned once for all actions."""
+
+    by_action: dict[Action, Pattern]
+    combined: Optional[Pattern]
+
+    @classmethod
+    def from_patterns(cls, by_action: dict[Action, Pattern]) -> StdlibActionPatterns:
+        return cls(by_action=by_action, combined=cls._combine(by_action))
+
+    @staticmethod
+    def _combine(by_action: dict[Action, Pattern]) -> Optional[Pattern]:
+        if len(by_action) < 2:
+            return None
+        patterns = list(by_action.values())
+        if any(
+            p.flags != patterns[0].flags
+            or not isinstance(p.pattern, str)
+            or GROUP_REFERENCE.search(p.pattern)
+            for p in patterns
+        ):
+            return None
+        try:
+            return re.compile(
+                "|".join(
+                    f"(?P<{action}>{pattern.pattern})"
+                    for action, pattern in by_action.items()
+                ),
+                patterns[0].flags,
+            )
+        except re.error:
+            return None
+
+    def matched_actions(self, text: str, remaining: list[Action]) -> set[Action]:
+        if self.combined is None or len(remaining) == 1:
+            return {a for a in remaining if self.by_action[a].search(text)}
+
+        match = self.combined.search(text)
+        if not match:
+            return set()
+        # No action can match before the leftmost match of the combined
+        # pattern, so the remaining actions are searched from there on.
+        matched = {a for a in remaining if match.group(a) is not None}
+        matched |= {
+            a
+            for a in remaining
+            if a not in matched and self.by_action[a].search(text, match.start())
+        }
+        return matched
+
+
+class StdlibEngine:
+    name: RegexEngineName = "re"
+
+    def version(self) -> str:
+        return sys.version
+
+    def compile_action_patterns(
+        self, by_action: dict[Action, Pattern]
+    ) -> StdlibActionPatterns:
+        return StdlibActionPatterns.from_patterns(by_action)
+
+
+def translate_for_re2(source: str, flags: int) -> Optional[str]:
+    """Rewrite a Python pattern into RE2 syntax with the same meaning.
+
+    Returns None when no faithful rewrite exists, e.g. for Unicode word
+    boundaries or unsupported flags; RE2 rejects lookarounds and group
+    references by itself.
+    """
+    prefix = ""
+    for flag, letter in _RE2_FLAGS.items():
+        if flags & flag:
+            prefix += letter
+            flags &= ~flag
+    if flags & ~re.UNICODE:
+        return None
+
+    out = [f"(?{prefix})" if prefix else ""]
+    in_class = False
+    class_start = i = 0
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            escaped = source[i + 1] if i + 1 < len(source) else ""
+            unicode_escape = _UNICODE_ESCAPE.match(source, i)
+            if escaped.lower() in _RE2_CLASS_BODIES:
+                body = _RE2_CLASS_BODIES[escaped.lower()]
+                if escaped.isupper():
+                    if in_class:
+                        return None
+                    out.append(f"[^{body}]")
+                else:
+                    out.append(body if in_class else f"[{body}]")
+            elif escaped == "b" and in_class:
+                out.append(r"\x08")
+            elif escaped in ("b", "B", "N"):
+                return None
+            elif escaped == "Z":
+                out.append(r"\z")
+            elif unicode_escape:
+                code = unicode_escape.group(1) or unicode_escape.group(2)
+                out.append(rf"\x{{{code}}}")
+                i = unicode_escape.end()
+                continue
+            else:
+                out.append(char + escaped)
+            i += 2
+            continue
+
+        if in_class:
+            if source.startswith("[:", i):
+                # RE2 reads a POSIX class such as [:alpha:], Python a literal.
+                return None
+            in_class = char != "]" or i == class_start
+            out.append(char)
+        elif char == "[":
+            in_class = True
+            class_start = i + 2 if source.startswith("^", i + 1) else i + 1
+            out.append(char)
+        elif char == "$" and "m" not in prefix:
+            # Python's `$` also matches before a trailing newline.
+            out.append(r"(?:\n?\z)")
+        elif char == "{" and _OPEN_LOWER_BOUND.match(source, i):
+            out.append("{0")
+        else:
+            out.append(char)
+        i += 1
+    return "".join(out)
+
+
+class RE2ActionPatterns:
+    """Per-action patterns matched in one linear-time pass with an RE2 set.
+
+    Every top-level alternation branch is added to the set on its own, so a
+    branch RE2 cannot run with the same meaning (a lookaround, a Unicode word
+    boundary, ...) falls back to `re` alone instead of taking its whole
+    action with it.
+    """
+
+    def __init__(self, by_action: dict[Action, Pattern]) -> None:
+        self.by_action = by_action
+        options = re2.Options()
+        options.log_errors = False
+        options.max_mem = RE2_MAX_MEM
+        self.set = re2.Set.SearchSet(options)
+        self.set_actions: list[Action] = []
+        fallback: dict[Action, Pattern] = {}
+        for action, pattern in by_action.items():
+            if not isinstance(pattern.pattern, str):
+                fallback[action] = pattern
+                continue
+            unsupported = [
+                branch
+                for branch in pattern_branches(pattern)
+                if not self._add(action, branch, pattern.flags)
+            ]
+            if not unsupported:
+                continue
+            logger.warning(
+                f"RE2 cannot run {len(unsupported)} {action} pattern(s), "
+                f"using re for them: {', '.join(map(repr, unsupported))}"
+            )
+            fallback[action] = (
+                pattern
+                if len(unsupported) == 1 and unsupported[0] == pattern.pattern
+                else re.compile("|".join(unsupported), pattern.flags)
+            )
+        if self.set_actions:
+            try:
+                self.set.Compile()
+            except re2.error:
+                logger.warning(
+                    "RE2 exceeded its memory budget for a set of "
+                    f"{len(self.set_actions)} patterns; using re for all of them."
+                )
+                self.set_actions = []
+                fallback = dict(by_action)
+        self.fallback = StdlibActionPatterns.from_patterns(fallback)
+
+    def __reduce__(self) -> tuple[type[RE2ActionPatterns], tuple[dict]]:
+        # RE2 sets cannot be pickled, so they are rebuilt from the patterns.
+        return type(self), (self.by_action,)
+
+    def _add(self, action: Action, branch: str, flags: int) -> bool:
+        translated = translate_for_re2(branch, flags)
+        if translated is None:
+            return False
+        try:
+            self.set.Add(translated)
+        except re2.error:
+            return False
+        self.set_actions.append(action)
+        return True
+
+    def matched_actions(self, text: str, remaining: list[Action]) -> set[Action]:
+        matched: set[Action] = set()
+        if self.set_actions:
+            matched = {self.set_actions[i] for i in self.set.Match(text) or ()}
+            matched.intersection_update(remaining)
+        rest = [
+            a for a in remaining if a in self.fallback.by_action and a not in matched
+        ]
+        if rest:
+            matched |= self.fallback.matched_actions(text, rest)
+        return matched
+
+
+class RE2Engine:
+    name: RegexEngineName = "re2"
+
+    def __init__(self) -> None:
+        if re2 is None:
+            raise ImportError(
+                "The re2 regex engine requires the google-re2 package; "
+                "install the re2 extra, e.g. `poetry install --extras re2`."
+            )
+
+    def version(self) -> str:
+        return metadata.version("google-re2")
+
+    def compile_action_patterns(
+        self, by_action: dict[Action, Pattern]
+    ) -> RE2ActionPatterns:
+        return RE2ActionPatterns(by_action)
+
+
+def get_regex_engine(name: RegexEngineName) -> RegexEngine:
+    if name == "re":
+        return StdlibEngine()
+    if name == "re2":
+        return RE2Engine()
+    raise ValueError(f"Unknown regex engine: {name}")
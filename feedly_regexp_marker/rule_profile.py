@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import re
+import time
+from collections import Counter, defaultdict
+from re import Pattern
+from typing import Iterable, NamedTuple, Optional
+
+from logzero import logger
+
+from feedly_regexp_marker.classifier import (
+    ENTRY_ATTRS,
+    UNNAMED_RULE,
+    Classifier,
+    EntryAttr,
+    EntryLike,
+)
+from feedly_regexp_marker.models import Action, StreamId
+
+DEFAULT_REPORT_LIMIT = 20
+
+
+class ProfiledPattern(NamedTuple):
+    action: Action
+    text: str
+    pattern: Pattern
+    rules: frozenset[str]
+
+
+class ProfileRow(NamedTuple):
+    name: str
+    hits: int
+    seconds: float
+
+
+class RuleProfiler:
+    """Classifies entries like a `Classifier` while attributing matches and
+    match time to individual rules and patterns.
+
+    Every pattern is searched on its own with `re`, whatever engine the
+    classifier uses, so one slow pattern stands out instead of hiding inside
+    a merged one. This is much slower than `Classifier.classify` and only
+    meant for finding the patterns that dominate classification time.
+
+    A hit counts the entries a pattern or rule matched. The time of a
+    pattern shared by several rules is added to each of them.
+    """
+
+    def __init__(self, clf: Classifier) -> None:
+        self.clf = clf
+        self.entries = 0
+        self.pattern_hits: Counter[str] = Counter()
+        self.pattern_seconds: defaultdict[str, float] = defaultdict(float)
+        self.rule_hits: Counter[str] = Counter()
+        self.rule_seconds: defaultdict[str, float] = defaultdict(float)
+        self.pattern_rules: dict[str, set[str]] = defaultdict(set)
+
+        # By flags too: a text merged with a global inline flag of another
+        # text, e.g. (?i), is compiled differently from the same text alone.
+        compiled: dict[tuple[str, int], Pattern] = {}
+        self._fields: defaultdict[tuple[StreamId, EntryAttr], list[ProfiledPattern]] = (
+            defaultdict(list)
+        )
+        for key, pattern in sorted(
+            clf.compiled_rule_index.items(), key=lambda item: item[0]
+        ):
+            if pattern is None:
+                continue
+            action, stream_id, entry_attr = key
+            rule_names = clf.rule_names.get(key)
+            if not rule_names:
+                # Without the rule mapping, the merged pattern is profiled as one.
+                rule_names = {pattern.pattern: frozenset({UNNAMED_RULE})}
+            for text, rules in sorted(rule_names.items()):
+                if (text, pattern.flags) not in compiled:
+                    compiled[(text, pattern.flags)] = re.compile(text, pattern.flags)
+                self.pattern_rules[text] |= rules
+                self._fields[(stream_id, entry_attr)].append(
+                    ProfiledPattern(
+                        action, text, compiled[(text, pattern.flags)], rules
+                    )
+                )
+
+    def classify(self, entry: EntryLike) -> set[Action]:
+        actions: set[Action] = set()
+        view = self.clf.view(entry)
+        if view.entry.stream_id is None:
+            return actions
+        self.entries += 1
+
+        hit_patterns: set[str] = set()
+        hit_rules: set[str] = set()
+        for entry_attr in ENTRY_ATTRS:
+            for profiled in self._fields.get((view.entry.stream_id, entry_attr), []):
+                for text in view.texts(entry_attr):
+                    start = time.perf_counter()
+                    matched = profiled.pattern.search(text) is not None
+                    elapsed = time.perf_counter() - start
+                    self.pattern_seconds[profiled.text] += elapsed
+                    for rule in profiled.rules:
+                        self.rule_seconds[rule] += elapsed
+                    if matched:
+                        actions.add(profiled.action)
+                        hit_patterns.add(profiled.text)
+                        hit_rules |= profiled.rules
+
+        self.pattern_hits.update(hit_patterns)
+        self.rule_hits.update(hit_rules)
+        return actions
+
+    def classify_many(self, entries: Iterable[EntryLike]) -> list[set[Action]]:
+        return [self.classify(entry) for entry in entries]
+
+    def rule_rows(self) -> list[ProfileRow]:
+        """Per-rule hits and match time, slowest first."""
+        return self._rows(self.rule_seconds, self.rule_hits)
+
+    def pattern_rows(self) -> list[ProfileRow]:
+        """Per-pattern hits and match time, slowest first."""
+        return self._rows(self.pattern_seconds, self.pattern_hits)
+
+    @staticmethod
+    def _rows(seconds: dict[str, float], hits: Counter[str]) -> list[ProfileRow]:
+        return sorted(
+            (ProfileRow(name, hits[name], secs) for name, secs in seconds.items()),
+            key=lambda row: (-row.seconds, -row.hits, row.name),
+        )
+
+    def log_report(self, limit: Optional[int] = DEFAULT_REPORT_LIMIT) -> None:
+        logger.info(f"Rule profile over {self.entries} classified entries:")
+        for heading, rows, label in (
+            ("Rules", self.rule_rows(), str),
+            ("Patterns", self.pattern_rows(), self._pattern_label),
+        ):
+            total = sum(row.seconds for row in rows)
+            logger.info(f"{heading} by match time (total {total * 1000:.1f} ms):")
+            for row in rows[:limit]:
+                logger.info(
+                    f"  {row.seconds * 1000:10.2f} ms {row.hits:8d} hits  "
+                    f"{label(row.name)}"
+                )
+
+    def _pattern_label(self, text: str) -> str:
+        return f"{text!r} ({', '.join(sorted(self.pattern_rules[text]))})"
@@ -4,9 +4,8 @@ from pathlib import Path
 from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, RootModel
-from pydantic_yaml import parse_yaml_file_as
 
-from feedly_regexp_marker.feedly_client import Action, StreamId
+from feedly_regexp_marker.models import Action, StreamId
 from feedly_regexp_marker.pattern_texts import PatternTexts
 
 
@@ -35,4 +34,6 @@ class Rules(RootModel[frozenset[Rule]]):
 
     @classmethod
     def from_yaml(cls, yaml_path: Path) -> Rules:
+        from pydantic_yaml import parse_yaml_file_as
+
         return parse_yaml_file_as(cls, yaml_path)
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+FileStamp = Optional[tuple[int, int, int]]
+
+
+class RulesWatcher:
+    """Detects changes to the rules files between polls.
+
+    A file counts as changed when its inode, size or modification time
+    differs, which also catches editors that save by replacing the file.
+    """
+
+    def __init__(self, paths: Iterable[Path]) -> None:
+        self.paths = list(paths)
+        self.stamps = self._stamps()
+
+    def _stamps(self) -> list[FileStamp]:
+        stamps: list[FileStamp] = []
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                stamps.append(None)
+                continue
+            stamps.append((st.st_ino, st.st_size, st.st_mtime_ns))
+        return stamps
+
+    def changed(self) -> bool:
+        stamps = self._stamps()
+        if stamps == self.stamps:
+            return False
+        self.stamps = stamps
+        return True
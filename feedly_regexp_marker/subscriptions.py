@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from logzero import logger
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+from feedly_regexp_marker.models import StreamId, Subscriptions
+
+if TYPE_CHECKING:
+    from feedly_regexp_marker.async_feedly_client import AsyncFeedlyClient
+
+SUBSCRIPTIONS_FILE_NAME = "feedly-regexp-marker.subscriptions.json"
+DEFAULT_TTL = timedelta(days=1)
+
+GLOBAL_ALL = "global.all"
+GLOBAL_UNCATEGORIZED = "global.uncategorized"
+
+_CATEGORY_ID = re.compile(r"user/[^/]+/category/(.+)")
+_TAG_ID = re.compile(r"user/[^/]+/tag/.+")
+
+
+class StreamExpansion:
+    """Replaces the category stream IDs of rules with the feeds in them.
+
+    Entries are looked up by the feed they come from, so a rule for a category
+    has to be indexed under each of its feeds. A category is matched by what
+    follows `/category/`, against both the ID and the label of the user's
+    categories, so rules may say `user/-/category/Tech` whatever the account.
+    `global.all` and `global.uncategorized` stand for every subscribed feed
+    and those in no category.
+
+    Tags label entries rather than feeds and cannot be expanded.
+    """
+
+    def __init__(self, subscriptions: Optional[Subscriptions] = None) -> None:
+        self.subscriptions = subscriptions
+        self._feeds: defaultdict[str, set[StreamId]] = defaultdict(set)
+        self._warned: set[StreamId] = set()
+        for subscription in subscriptions.root if subscriptions else []:
+            self._feeds[GLOBAL_ALL].add(subscription.id)
+            if not subscription.categories:
+                self._feeds[GLOBAL_UNCATEGORIZED].add(subscription.id)
+            for category in subscription.categories:
+                match = _CATEGORY_ID.fullmatch(category.id)
+                for name in (match and match.group(1), category.label):
+                    if name:
+                        self._feeds[name].add(subscription.id)
+
+    def expand(self, stream_ids: frozenset[StreamId]) -> frozenset[StreamId]:
+        if not any(stream_id.startswith("user/") for stream_id in stream_ids):
+            return stream_ids
+        expanded: set[StreamId] = set()
+        for stream_id in stream_ids:
+            expanded |= self._expand_one(stream_id)
+        return frozenset(expanded)
+
+    def _expand_one(self, stream_id: StreamId) -> set[StreamId]:
+        match = _CATEGORY_ID.fullmatch(stream_id)
+        if match is None:
+            if _TAG_ID.fullmatch(stream_id):
+                self._warn_once(
+                    stream_id,
+                    f"Tag {stream_id} labels entries rather than feeds; "
+                    "rules for it match nothing.",
+                )
+            return {stream_id}
+        if self.subscriptions is None:
+            self._warn_once(
+                stream_id,
+                f"Category {stream_id} is not expanded into its feeds without "
+                "the subscriptions; rules for it match nothing.",
+            )
+            return {stream_id}
+        feeds = self._feeds.get(match.group(1))
+        if not feeds:
+            self._warn_once(
+                stream_id,
+                f"No subscribed feeds in category {stream_id}; "
+                "rules for it match nothing.",
+            )
+            return set()
+        return feeds
+
+    def _warn_once(self, stream_id: StreamId, message: str) -> None:
+        if stream_id not in self._warned:
+            self._warned.add(stream_id)
+            logger.warning(message)
+
+
+class SubscriptionSnapshot(BaseModel):
+    fetched_at: float
+    subscriptions: Subscriptions
+    model_config = ConfigDict(frozen=True)
+
+
+class SubscriptionStore:
+    """Subscriptions fetched from Feedly, reused from disk for `ttl`."""
+
+    def __init__(self, path: Path, ttl: timedelta = DEFAULT_TTL) -> None:
+        self.path = path
+        self.ttl = ttl
+
+    @classmethod
+    def in_dir(cls, state_dir: Path, ttl: timedelta = DEFAULT_TTL) -> SubscriptionStore:
+        return cls(state_dir / SUBSCRIPTIONS_FILE_NAME, ttl=ttl)
+
+    def load(self) -> Optional[Subscriptions]:
+        """The stored subscriptions, or None if missing or older than `ttl`."""
+        try:
+            snapshot = SubscriptionSnapshot.model_validate_json(self.path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except ValidationError:
+            logger.warning(f"Ignoring unreadable subscriptions file: {self.path}")
+            return None
+        if not 0 <= time.time() - snapshot.fetched_at <= self.ttl.total_seconds():
+            return None
+        return snapshot.subscriptions
+
+    def save(self, subscriptions: Subscriptions) -> None:
+        snapshot = SubscriptionSnapshot(
+            fetched_at=time.time(), subscriptions=subscriptions
+        )
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        tmp_path.write_text(snapshot.model_dump_json())
+        os.replace(tmp_path, self.path)
+
+    async def get(self, feedly_client: AsyncFeedlyClient) -> Subscriptions:
+        """The stored subscriptions, fetched and stored again once stale."""
+        subscriptions = self.load()
+        if subscriptions is None:
+            logger.info("Fetching subscriptions...")
+            subscriptions = await feedly_client.fetch_subscriptions()
+            self.save(subscriptions)
+        return subscriptions
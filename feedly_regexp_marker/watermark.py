@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+from logzero import logger
+from pydantic import BaseModel, ConfigDict, RootModel, ValidationError
+
+from feedly_regexp_marker.models import Entry
+
+STATE_FILE_NAME = "feedly-regexp-marker.state.json"
+
+# Entries crawled shortly before the watermark are fetched again, so entries
+# that became visible late are not skipped. Marking twice is harmless.
+DEFAULT_OVERLAP_MS = 10 * 60 * 1000
+
+
+class Watermark(BaseModel):
+    """Newest `crawled` timestamp (ms) evaluated against a rule set."""
+
+    newer_than: int
+    rules_fingerprint: str
+    model_config = ConfigDict(frozen=True)
+
+    def newer_than_for(
+        self, rules_fingerprint: str, overlap_ms: int = DEFAULT_OVERLAP_MS
+    ) -> Optional[int]:
+        """`newerThan` to resume from, or None if the rules have changed."""
+        if rules_fingerprint != self.rules_fingerprint:
+            return None
+        return max(self.newer_than - overlap_ms, 0)
+
+    def advanced(self, entries: Iterable[Entry]) -> Watermark:
+        newest = max(
+            (e.crawled for e in entries if e.crawled is not None),
+            default=self.newer_than,
+        )
+        if newest <= self.newer_than:
+            return self
+        return self.model_copy(update={"newer_than": newest})
+
+
+class WatermarkState(RootModel[dict[str, Watermark]]):
+    """Watermarks keyed by Feedly user id."""
+
+    model_config = ConfigDict(frozen=True)
+
+
+class WatermarkStore:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    @classmethod
+    def in_dir(cls, state_dir: Path) -> WatermarkStore:
+        return cls(state_dir / STATE_FILE_NAME)
+
+    def _load_state(self) -> WatermarkState:
+        try:
+            return WatermarkState.model_validate_json(self.path.read_bytes())
+        except FileNotFoundError:
+            return WatermarkState({})
+        except ValidationError:
+            logger.warning(f"Ignoring unreadable state file: {self.path}")
+            return WatermarkState({})
+
+    def load(self, user_id: str) -> Optional[Watermark]:
+        return self._load_state().root.get(user_id)
+
+    def save(self, user_id: str, watermark: Watermark) -> None:
+        state = WatermarkState(self._load_state().root | {user_id: watermark})
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        tmp_path.write_text(state.model_dump_json(indent=2))
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,777 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Optional
+from unittest.mock import AsyncMock, MagicMock, call
+
+import aiohttp
+import pytest
+from feedly.api_client.session import FileAuthStore
+from pytest_mock import MockerFixture
+
+from feedly_regexp_marker.async_feedly_client import AsyncFeedlyClient
+from feedly_regexp_marker.feedly_client import MarkEntriesError
+from feedly_regexp_marker.models import Action, Entry, EntryOrigin, StreamContents
+from feedly_regexp_marker.rate_limit import AsyncRequestScheduler
+
+# --- Test AsyncFeedlyClient ---
+
+
+def make_response(
+    mocker: MockerFixture,
+    payload: Optional[Any],
+    status: int = 200,
+    headers: Optional[dict[str, str]] = None,
+) -> MagicMock:
+    """Build an async context manager mimicking an aiohttp response."""
+    resp = mocker.MagicMock()
+    resp.status = status
+    resp.headers = headers or {}
+    resp.raise_for_status = mocker.MagicMock()
+    resp.read = AsyncMock(
+        return_value=b"" if payload is None else json.dumps(payload).encode()
+    )
+    ctx = mocker.MagicMock()
+    ctx.__aenter__ = AsyncMock(return_value=resp)
+    ctx.__aexit__ = AsyncMock(return_value=False)
+    return ctx
+
+
+@pytest.fixture
+def mock_session(mocker: MockerFixture) -> MagicMock:
+    """Fixture to return a mock of aiohttp.ClientSession instance."""
+    session_mock = mocker.MagicMock(spec=aiohttp.ClientSession)
+    session_mock.close = AsyncMock()
+    return session_mock
+
+
+@pytest.fixture
+def async_feedly_client(mock_session: MagicMock) -> AsyncFeedlyClient:
+    """Fixture to create an AsyncFeedlyClient instance for testing."""
+    return AsyncFeedlyClient(
+        session=mock_session,
+        auth_token="test_token",
+        api_host="https://feedly.test",
+        user_id="test_user_id_mocked",
+    )
+
+
+def set_responses(
+    mocker: MockerFixture, session: MagicMock, payloads: list[Any]
+) -> None:
+    session.request.side_effect = [
+        make_response(mocker, payload) for payload in payloads
+    ]
+
+
+async def collect(client: AsyncFeedlyClient) -> list[Entry]:
+    return [entry async for entry in client.fetch_all_unread_entries()]
+
+
+BASE_PARAMS = {
+    "client": "feedly.python.client",
+    "streamId": "user/test_user_id_mocked/category/global.all",
+    "count": "1000",
+    "ranked": "oldest",
+    "unreadOnly": "true",
+}
+
+
+def stream_contents_call(**extra_params: str):
+    return call(
+        "get",
+        "https://feedly.test/v3/streams/contents",
+        params=BASE_PARAMS | extra_params,
+        json=None,
+        headers={"Authorization": "test_token"},
+    )
+
+
+class TestAsyncFeedlyClient:
+    def test_init(self, mock_session: MagicMock):
+        """Test AsyncFeedlyClient initialization sets the session correctly."""
+        client = AsyncFeedlyClient(session=mock_session, auth_token="t")
+        assert client.session is mock_session
+        assert client.api_host == "https://feedly.com"
+        assert client.user_id is None
+
+    def test_fetch_user_id_requests_profile_once(
+        self, mocker: MockerFixture, mock_session: MagicMock
+    ):
+        """Test the user id is fetched from /v3/profile and cached."""
+        client = AsyncFeedlyClient(session=mock_session, auth_token="t")
+        set_responses(mocker, mock_session, [{"id": "profile_user"}])
+
+        assert asyncio.run(client.fetch_user_id()) == "profile_user"
+        assert asyncio.run(client.fetch_user_id()) == "profile_user"
+        assert mock_session.request.call_count == 1
+
+    def test_fetch_subscriptions(
+        self,
+        mocker: MockerFixture,
+        mock_session: MagicMock,
+        async_feedly_client: AsyncFeedlyClient,
+    ):
+        """Test subscriptions are parsed with their categories."""
+        set_responses(
+            mocker,
+            mock_session,
+            [
+                [
+                    {
+                        "id": "feed/a",
+                        "title": "A",
+                        "categories": [{"id": "user/u/category/c1", "label": "Tech"}],
+                    },
+                    {"id": "feed/b"},
+                ]
+            ],
+        )
+
+        subscriptions = asyncio.run(async_feedly_client.fetch_subscriptions())
+
+        assert [s.id for s in subscriptions.root] == ["feed/a", "feed/b"]
+        assert subscriptions.root[0].categories[0].label == "Tech"
+        assert subscriptions.root[1].categories == []
+        assert mock_session.request.call_args.args[1] == (
+            "https://feedly.test/v3/subscriptions"
+        )
+
+    def test_context_manager_closes_session(
+        self,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+    ):
+        """Test leaving the async context closes the pooled session."""
+
+        async def run():
+            async with async_feedly_client:
+                pass
+
+        asyncio.run(run())
+        mock_session.close.assert_awaited_once()
+
+    # --- Test fetch_all_unread_entries ---
+    def test_fetch_all_unread_entries_single_page(
+        self,
+        mocker: MockerFixture,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+    ):
+        """Test fetching when API returns all entries in one page."""
+        set_responses(
+            mocker,
+            mock_session,
+            [{"items": [{"id": "e1"}, {"id": "e2"}], "continuation": None}],
+        )
+
+        entries = asyncio.run(collect(async_feedly_client))
+
+        mock_session.request.assert_called_once_with(
+            *stream_contents_call().args, **stream_contents_call().kwargs
+        )
+        assert [e.id for e in entries] == ["e1", "e2"]
+        assert all(isinstance(e, Entry) for e in entries)
+
+    def test_fetch_all_unread_entries_multiple_pages(
+        self,
+        mocker: MockerFixture,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+    ):
+        """Test fetching follows continuation tokens across pages."""
+        set_responses(
+            mocker,
+            mock_session,
+            [
+                {"items": [{"id": "e1"}, {"id": "e2"}], "continuation": "cont1"},
+                {"items": [{"id": "e3"}], "continuation": None},
+            ],
+        )
+
+        entries = asyncio.run(collect(async_feedly_client))
+
+        assert mock_session.request.call_args_list == [
+            stream_contents_call(),
+            stream_contents_call(continuation="cont1"),
+        ]
+        assert [e.id for e in entries] == ["e1", "e2", "e3"]
+
+    def test_fetch_all_unread_entries_prefetches_next_page(
+        self,
+        mocker: MockerFixture,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+    ):
+        """Test the next page is requested before the current page is consumed."""
+        set_responses(
+            mocker,
+            mock_session,
+            [
+                {"items": [{"id": "e1"}], "continuation": "cont1"},
+                {"items": [{"id": "e2"}], "continuation": None},
+            ],
+        )
+
+        async def first_entry_and_call_count() -> tuple[str, int]:
+            entries = async_feedly_client.fetch_all_unread_entries()
+            entry = await entries.__anext__()
+            call_count = mock_session.request.call_count
+            await entries.aclose()
+            return entry.id, call_count
+
+        assert asyncio.run(first_entry_and_call_count()) == ("e1", 2)
+
+    def test_fetch_unread_pages_yields_stream_contents(
+        self,
+        mocker: MockerFixture,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+    ):
+        """Test pages are yielded one StreamContents at a time."""
+        set_responses(
+            mocker,
+            mock_session,
+            [
+                {"items": [{"id": "e1"}, {"id": "e2"}], "continuation": "cont1"},
+                {"items": [{"id": "e3"}], "continuation": None},
+            ],
+        )
+
+        async def collect_pages() -> list[StreamContents]:
+            return [page async for page in async_feedly_client.fetch_unread_pages()]
+
+        pages = asyncio.run(collect_pages())
+
+        assert [[e.id for e in page.items] for page in pages] == [["e1", "e2"], ["e3"]]
+        assert [page.continuation for page in pages] == ["cont1", None]
+
+    def test_fetch_unread_pages_ignores_unused_fields(
+        self,
+        mocker: MockerFixture,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+    ):
+        """Test fields outside the Entry model are skipped while decoding."""
+        entry = {
+            "id": "e1",
+            "title": "t",
+            "origin": {"streamId": "s1", "htmlUrl": "https://example.com"},
+            "alternate": [{"href": "https://example.com/e1"}],
+            "tags": [{"id": "user/u/tag/global.saved"}],
+            "engagement": 3,
+        }
+        set_responses(mocker, mock_session, [{"items": [entry], "id": "s"}])
+
+        async def collect_pages() -> list[StreamContents]:
+            return [page async for page in async_feedly_client.fetch_unread_pages()]
+
+        (page,) = asyncio.run(collect_pages())
+        assert page == StreamContents(
+            items=[Entry(id="e1", title="t", origin=EntryOrigin(streamId="s1"))]
+        )
+
+    def test_do_api_request_empty_body(
+        self,
+        mocker: MockerFixture,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+    ):
+        """Test an empty response body, as returned by /v3/markers, is None."""
+        mock_session.request.side_effect = [make_response(mocker, None)]
+        result = asyncio.run(
+            async_feedly_client.do_api_request("/v3/markers", data={"a": 1})
+        )
+        assert result is None
+
+    def test_fetch_unread_pages_newer_than(
+        self,
+        mocker: MockerFixture,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+    ):
+        """Test newer_than is sent as newerThan on every page request."""
+        set_responses(
+            mocker,
+            mock_session,
+            [
+                {"items": [{"id": "e1"}], "continuation": "cont1"},
+                {"items": [{"id": "e2"}]},
+            ],
+        )
+
+        async def collect_pages() -> list[StreamContents]:
+            return [
+                page
+                async for page in async_feedly_client.fetch_unread_pages(newer_than=42)
+            ]
+
+        asyncio.run(collect_pages())
+
+        assert mock_session.request.call_args_list == [
+            stream_contents_call(newerThan="42"),
+            stream_contents_call(continuation="cont1", newerThan="42"),
+        ]
+
+    def test_fetch_all_unread_entries_stops_on_empty_items(
+        self,
+        mocker: MockerFixture,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+    ):
+        """Test fetching stops when API returns empty items even with continuation."""
+        set_responses(
+            mocker,
+            mock_session,
+            [
+                {"items": [{"id": "e1"}], "continuation": "cont1"},
+                {"items": [], "continuation": "cont2"},
+            ],
+        )
+
+        entries = asyncio.run(collect(async_feedly_client))
+
+        assert mock_session.request.call_count == 2
+        assert [e.id for e in entries] == ["e1"]
+
+    # --- Test mark_entries / save_entries / read_entries ---
+    def test_mark_entries_dry_run(
+        self,
+        mocker: MockerFixture,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+    ):
+        """Test mark_entries with dry_run=True prints titles and doesn't call the API."""
+        mock_print = mocker.patch("builtins.print")
+        entries = (e for e in [Entry(id="e1", title="T1"), Entry(id="e2", title="T2")])
+
+        asyncio.run(
+            async_feedly_client.mark_entries(
+                entries=entries, action="markAsRead", dry_run=True
+            )
+        )
+
+        mock_session.request.assert_not_called()
+        mock_print.assert_called_once_with(["T1", "T2"])
+
+    def test_mark_entries_empty_iterable(
+        self,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+    ):
+        """Test mark_entries with an empty iterable (even a generator) doesn't call API."""
+        asyncio.run(
+            async_feedly_client.mark_entries(
+                entries=iter([]), action="markAsRead", dry_run=False
+            )
+        )
+        mock_session.request.assert_not_called()
+
+    @pytest.mark.parametrize("action_to_test", ["markAsRead", "markAsSaved"])
+    def test_mark_entries_api_call(
+        self,
+        mocker: MockerFixture,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+        action_to_test: Action,
+    ):
+        """Test mark_entries posts the entry ids to /v3/markers."""
+        set_responses(mocker, mock_session, [None])
+
+        asyncio.run(
+            async_feedly_client.mark_entries(
+                entries=[Entry(id="id_e1"), Entry(id="id_e2")],
+                action=action_to_test,
+                dry_run=False,
+            )
+        )
+
+        mock_session.request.assert_called_once_with(
+            "post",
+            "https://feedly.test/v3/markers",
+            params={"client": "feedly.python.client"},
+            json={
+                "action": action_to_test,
+                "type": "entries",
+                "entryIds": ["id_e1", "id_e2"],
+            },
+            headers={"Authorization": "test_token"},
+        )
+
+    @pytest.mark.parametrize(
+        "method_name, expected_action",
+        [("save_entries", "markAsSaved"), ("read_entries", "markAsRead")],
+    )
+    def test_save_and_read_entries_call_mark(
+        self,
+        mocker: MockerFixture,
+        async_feedly_client: AsyncFeedlyClient,
+        method_name: str,
+        expected_action: Action,
+    ):
+        """Test save_entries/read_entries delegate to mark_entries."""
+        mock_mark = mocker.patch.object(
+            async_feedly_client, "mark_entries", new=AsyncMock()
+        )
+        entries = [Entry(id="e1")]
+
+        asyncio.run(getattr(async_feedly_client, method_name)(entries, dry_run=False))
+
+        mock_mark.assert_awaited_once_with(
+            entries=entries, action=expected_action, dry_run=False
+        )
+
+    # --- Test chunked / concurrent mark_entries ---
+    def test_mark_entries_splits_into_chunks(
+        self, mocker: MockerFixture, mock_session: MagicMock
+    ):
+        """Test entry ids are submitted in chunks of at most mark_chunk_size."""
+        client = AsyncFeedlyClient(
+            session=mock_session, auth_token="t", mark_chunk_size=2
+        )
+        set_responses(mocker, mock_session, [None, None, None])
+
+        asyncio.run(
+            client.mark_entries(
+                entries=[Entry(id=f"e{i}") for i in range(5)],
+                action="markAsRead",
+                dry_run=False,
+            )
+        )
+
+        assert [
+            c.kwargs["json"]["entryIds"] for c in mock_session.request.call_args_list
+        ] == [["e0", "e1"], ["e2", "e3"], ["e4"]]
+
+    def test_mark_entries_limits_concurrency(
+        self, mocker: MockerFixture, mock_session: MagicMock
+    ):
+        """Test no more than mark_concurrency chunks are in flight at once."""
+        client = AsyncFeedlyClient(
+            session=mock_session,
+            auth_token="t",
+            mark_chunk_size=1,
+            mark_concurrency=2,
+        )
+        in_flight = 0
+        max_in_flight = 0
+
+        async def do_api_request(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+
+        mocker.patch.object(client, "do_api_request", side_effect=do_api_request)
+
+        asyncio.run(
+            client.mark_entries(
+                entries=[Entry(id=f"e{i}") for i in range(6)],
+                action="markAsRead",
+                dry_run=False,
+            )
+        )
+
+        assert max_in_flight == 2
+
+    def test_mark_entries_fails_partially(
+        self, mocker: MockerFixture, mock_session: MagicMock
+    ):
+        """Test a chunk failing all retries is reported while others succeed."""
+        mock_sleep = mocker.patch(
+            "feedly_regexp_marker.async_feedly_client.asyncio.sleep", new=AsyncMock()
+        )
+        client = AsyncFeedlyClient(
+            session=mock_session, auth_token="t", mark_chunk_size=1, mark_retries=1
+        )
+
+        async def do_api_request(relative_url: str, data: dict):
+            if "bad" in data["entryIds"]:
+                raise aiohttp.ServerDisconnectedError()
+
+        mock_request = mocker.patch.object(
+            client, "do_api_request", side_effect=do_api_request
+        )
+
+        with pytest.raises(MarkEntriesError) as exc_info:
+            asyncio.run(
+                client.mark_entries(
+                    entries=[Entry(id="ok"), Entry(id="bad")],
+                    action="markAsSaved",
+                    dry_run=False,
+                )
+            )
+
+        assert exc_info.value.failed_entry_ids == ["bad"]
+        assert exc_info.value.marked_count == 1
+        assert mock_request.call_count == 3
+        mock_sleep.assert_awaited_once_with(1.0)
+
+    def test_mark_entries_does_not_resend_error_responses(
+        self, mocker: MockerFixture, mock_session: MagicMock
+    ):
+        """Test a chunk rejected by the API is reported without retrying."""
+        mock_sleep = mocker.patch(
+            "feedly_regexp_marker.async_feedly_client.asyncio.sleep", new=AsyncMock()
+        )
+        client = AsyncFeedlyClient(session=mock_session, auth_token="t")
+        mock_request = mocker.patch.object(
+            client,
+            "do_api_request",
+            side_effect=aiohttp.ClientResponseError(
+                request_info=mocker.MagicMock(), history=(), status=400
+            ),
+        )
+
+        with pytest.raises(MarkEntriesError) as exc_info:
+            asyncio.run(
+                client.mark_entries(
+                    entries=[Entry(id="bad")], action="markAsRead", dry_run=False
+                )
+            )
+
+        assert exc_info.value.failed_entry_ids == ["bad"]
+        assert mock_request.call_count == 1
+        mock_sleep.assert_not_awaited()
+
+    # --- Test fetch_unread_pages_of_streams ---
+    def test_fetch_unread_pages_of_streams(
+        self, mocker: MockerFixture, async_feedly_client: AsyncFeedlyClient
+    ):
+        """Test every stream is paginated on its own and all pages are yielded."""
+        responses = {
+            ("feed/a", None): {"items": [{"id": "a1"}], "continuation": "a-c1"},
+            ("feed/a", "a-c1"): {"items": [{"id": "a2"}]},
+            ("feed/b", None): {"items": [{"id": "b1"}]},
+        }
+
+        async def fetch_page(stream_id, continuation, newer_than=None):
+            assert newer_than == 7
+            return StreamContents.model_validate(responses[(stream_id, continuation)])
+
+        mock_fetch_page = mocker.patch.object(
+            async_feedly_client, "_fetch_page", side_effect=fetch_page
+        )
+
+        async def collect_ids() -> list[str]:
+            return [
+                entry.id
+                async for page in async_feedly_client.fetch_unread_pages_of_streams(
+                    ["feed/a", "feed/b", "feed/a"], newer_than=7
+                )
+                for entry in page.items
+            ]
+
+        assert sorted(asyncio.run(collect_ids())) == ["a1", "a2", "b1"]
+        assert mock_fetch_page.call_count == 3
+
+    def test_fetch_unread_pages_of_streams_propagates_errors(
+        self, mocker: MockerFixture, async_feedly_client: AsyncFeedlyClient
+    ):
+        """Test a failing stream makes the whole fetch fail."""
+
+        async def fetch_page(stream_id, continuation, newer_than=None):
+            if stream_id == "feed/bad":
+                raise aiohttp.ClientError("boom")
+            return {"items": [{"id": "ok"}]}
+
+        mocker.patch.object(async_feedly_client, "_fetch_page", side_effect=fetch_page)
+
+        async def consume():
+            async for _ in async_feedly_client.fetch_unread_pages_of_streams(
+                ["feed/ok", "feed/bad"]
+            ):
+                pass
+
+        with pytest.raises(aiohttp.ClientError):
+            asyncio.run(consume())
+
+    def test_fetch_unread_pages_of_streams_empty(
+        self, async_feedly_client: AsyncFeedlyClient, mock_session: MagicMock
+    ):
+        """Test no request is made when there are no streams to fetch."""
+
+        async def collect_pages() -> list[StreamContents]:
+            return [
+                page
+                async for page in async_feedly_client.fetch_unread_pages_of_streams([])
+            ]
+
+        assert asyncio.run(collect_pages()) == []
+        mock_session.request.assert_not_called()
+
+    # --- Test request scheduling ---
+    def test_do_api_request_retries_rate_limited_responses(
+        self,
+        mocker: MockerFixture,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+    ):
+        """Test 429/5xx responses are retried through the scheduler."""
+        mock_backoff = mocker.patch.object(
+            async_feedly_client.scheduler, "backoff", new=AsyncMock()
+        )
+        mock_session.request.side_effect = [
+            make_response(mocker, None, status=429, headers={"Retry-After": "1"}),
+            make_response(mocker, None, status=503),
+            make_response(mocker, {"id": "u"}),
+        ]
+
+        result = asyncio.run(async_feedly_client.do_api_request("/v3/profile"))
+
+        assert result == {"id": "u"}
+        assert mock_session.request.call_count == 3
+        assert mock_backoff.await_args_list == [
+            call(1, {"Retry-After": "1"}),
+            call(2, {}),
+        ]
+
+    def test_do_api_request_gives_up_after_max_attempts(
+        self, mocker: MockerFixture, mock_session: MagicMock
+    ):
+        """Test the last retryable response is raised once attempts run out."""
+        client = AsyncFeedlyClient(
+            session=mock_session,
+            auth_token="t",
+            scheduler=AsyncRequestScheduler(max_attempts=2),
+        )
+        mocker.patch.object(client.scheduler, "backoff", new=AsyncMock())
+        last = make_response(mocker, None, status=500)
+        last.__aenter__.return_value.raise_for_status.side_effect = aiohttp.ClientError(
+            "500"
+        )
+        mock_session.request.side_effect = [
+            make_response(mocker, None, status=500),
+            last,
+        ]
+
+        with pytest.raises(aiohttp.ClientError):
+            asyncio.run(client.do_api_request("/v3/profile"))
+        assert mock_session.request.call_count == 2
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            pytest.param(aiohttp.ServerDisconnectedError(), id="disconnected"),
+            pytest.param(asyncio.TimeoutError(), id="timeout"),
+        ],
+    )
+    def test_do_api_request_retries_connection_errors(
+        self,
+        mocker: MockerFixture,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+        error: Exception,
+    ):
+        """Test requests getting no response are retried through the scheduler."""
+        mock_backoff = mocker.patch.object(
+            async_feedly_client.scheduler, "backoff", new=AsyncMock()
+        )
+        mock_session.request.side_effect = [error, make_response(mocker, {"id": "u"})]
+
+        result = asyncio.run(async_feedly_client.do_api_request("/v3/profile"))
+
+        assert result == {"id": "u"}
+        assert mock_backoff.await_args_list == [call(1, {})]
+
+    def test_do_api_request_gives_up_on_connection_errors(
+        self, mocker: MockerFixture, mock_session: MagicMock
+    ):
+        """Test connection errors count against the same max_attempts."""
+        client = AsyncFeedlyClient(
+            session=mock_session,
+            auth_token="t",
+            scheduler=AsyncRequestScheduler(max_attempts=2),
+        )
+        mocker.patch.object(client.scheduler, "backoff", new=AsyncMock())
+        mock_session.request.side_effect = aiohttp.ServerDisconnectedError()
+
+        with pytest.raises(aiohttp.ServerDisconnectedError):
+            asyncio.run(client.do_api_request("/v3/profile"))
+        assert mock_session.request.call_count == 2
+
+    # --- Test access token refresh ---
+    @pytest.fixture
+    def token_dir(self, tmp_path: Path) -> Path:
+        (tmp_path / "access.token").write_text("old")
+        return tmp_path
+
+    def auth_headers(self, mock_session: MagicMock) -> list[str]:
+        return [
+            request.kwargs["headers"]["Authorization"]
+            for request in mock_session.request.call_args_list
+        ]
+
+    def test_refreshes_rejected_token(
+        self, mocker: MockerFixture, mock_session: MagicMock, token_dir: Path
+    ):
+        """Test a 401 refreshes the token, saves it and retries the request."""
+        (token_dir / "refresh.token").write_text("refresh")
+        auth = FileAuthStore(token_dir=token_dir)
+        client = AsyncFeedlyClient(
+            session=mock_session, auth_token=auth.auth_token, auth=auth
+        )
+        mock_session.request.side_effect = [
+            make_response(mocker, None, status=401),
+            make_response(mocker, {"access_token": "new"}),
+            make_response(mocker, {"id": "u"}),
+        ]
+
+        assert asyncio.run(client.do_api_request("/v3/profile")) == {"id": "u"}
+
+        assert self.auth_headers(mock_session) == ["old", "old", "new"]
+        refresh = mock_session.request.call_args_list[1]
+        assert refresh.args[1].endswith("/v3/auth/token")
+        assert refresh.kwargs["json"]["refresh_token"] == "refresh"
+        assert (token_dir / "access.token").read_text() == "new"
+
+    def test_rereads_saved_token(
+        self, mocker: MockerFixture, mock_session: MagicMock, token_dir: Path
+    ):
+        """Test a token saved since is used without a refresh token."""
+        auth = FileAuthStore(token_dir=token_dir)
+        client = AsyncFeedlyClient(
+            session=mock_session, auth_token=auth.auth_token, auth=auth
+        )
+        (token_dir / "access.token").write_text("saved")
+        mock_session.request.side_effect = [
+            make_response(mocker, None, status=401),
+            make_response(mocker, {"id": "u"}),
+        ]
+
+        assert asyncio.run(client.do_api_request("/v3/profile")) == {"id": "u"}
+        assert self.auth_headers(mock_session) == ["old", "saved"]
+
+    def test_unauthorized_without_new_token(
+        self, mocker: MockerFixture, mock_session: MagicMock, token_dir: Path
+    ):
+        """Test a 401 is raised when there is no other token to try."""
+        auth = FileAuthStore(token_dir=token_dir)
+        client = AsyncFeedlyClient(
+            session=mock_session, auth_token=auth.auth_token, auth=auth
+        )
+        mock_session.request.side_effect = [make_response(mocker, None, status=401)]
+
+        with pytest.raises(aiohttp.ClientResponseError) as exc_info:
+            asyncio.run(client.do_api_request("/v3/profile"))
+        assert exc_info.value.status == 401
+        assert mock_session.request.call_count == 1
+
+    def test_do_api_request_observes_quota_headers(
+        self,
+        mocker: MockerFixture,
+        async_feedly_client: AsyncFeedlyClient,
+        mock_session: MagicMock,
+    ):
+        """Test quota headers of every response reach the shared limiter."""
+        headers = {
+            "X-RateLimit-Limit": "100",
+            "X-RateLimit-Count": "40",
+            "X-RateLimit-Reset": "60",
+        }
+        mock_session.request.side_effect = [make_response(mocker, {}, headers=headers)]
+
+        asyncio.run(async_feedly_client.do_api_request("/v3/profile"))
+
+        assert async_feedly_client.scheduler.limiter.quota_remaining == 60
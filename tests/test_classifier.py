@@ -1,12 +1,32 @@
+import functools
+import operator
+import random
 import re
 from typing import Optional
 
 import pytest
 from pydantic import ValidationError
+from pytest_mock import MockerFixture
 
-from feedly_regexp_marker.classifier import Classifier, EntryAttr, RulePatternIndex
-from feedly_regexp_marker.feedly_client import Action, Entry, StreamId
-from feedly_regexp_marker.pattern_texts import PatternTexts
+from feedly_regexp_marker import literal_matcher
+from feedly_regexp_marker.classifier import (
+    Classifier,
+    ClassifierStats,
+    EntryAttr,
+    RulePatternIndex,
+    RulePatternIndexBuilder,
+    rule_names_by_pattern,
+)
+from feedly_regexp_marker.models import (
+    Action,
+    Entry,
+    EntryContent,
+    EntryOrigin,
+    StreamId,
+)
+from feedly_regexp_marker.normalization import NormalizationStep, TextNormalization
+from feedly_regexp_marker.pattern_texts import PatternPool, PatternTexts
+from feedly_regexp_marker.regex_engine import StdlibActionPatterns
 from feedly_regexp_marker.rules import EntryPatternTexts, Rule, Rules
 
 # === Test RulePatternIndex ===
@@ -364,6 +384,40 @@ class TestRulePatternIndex:
         rpi = RulePatternIndex.from_rules(input_rules)
         assert rpi.root == expected_root_data
 
+    # --- Test RulePatternIndexBuilder ---
+    def test_builder_matches_pairwise_merge(self):
+        """Test the builder yields the index merging one rule at a time does."""
+        rng = random.Random(0)
+        streams = [f"s{i}" for i in range(20)]
+        actions: list[Action] = ["markAsRead", "markAsSaved"]
+        rules = [
+            Rule(
+                name=f"r{i % 30}",
+                stream_ids=frozenset(rng.sample(streams, rng.randint(1, 4))),
+                actions=frozenset(rng.sample(actions, rng.randint(1, 2))),
+                patterns=EntryPatternTexts(
+                    title=PatternTexts(rng.sample(["a", "b", "c"], rng.randint(0, 2))),
+                    content=PatternTexts(rng.sample(["x", "y"], rng.randint(0, 1))),
+                ),
+            )
+            for i in range(200)
+        ]
+        merged = functools.reduce(
+            operator.__or__,
+            (RulePatternIndex.from_rule(rule) for rule in rules),
+            RulePatternIndex(),
+        )
+
+        builder = RulePatternIndexBuilder()
+        builder.add_rules(rules[:100])
+        builder.add_index(RulePatternIndex.from_rules(rules[100:]))
+        built = builder.build()
+
+        assert built == merged
+        assert built == RulePatternIndex(root=dict(built.root))
+        assert RulePatternIndex.from_rules(rules) == merged
+        assert builder.rule_names() == rule_names_by_pattern(rules[:100])
+
 
 # === Test Classifier ===
 
@@ -440,6 +494,37 @@ class TestClassifier:
         assert compiled2 is None  # Empty PatternTexts should compile to None
         assert isinstance(compiled3, re.Pattern)
 
+    def test_from_rule_pattern_index_shares_patterns(self):
+        """Test streams with equal patterns share compiled patterns and fields."""
+        rule = Rule(
+            stream_ids=frozenset({"s1", "s2", "s3"}),
+            actions=frozenset({"markAsRead"}),
+            patterns=EntryPatternTexts(title=PatternTexts(["foo", "bar"])),
+        )
+        other = Rule(
+            stream_ids=frozenset({"s3"}),
+            actions=frozenset({"markAsRead"}),
+            patterns=EntryPatternTexts(title=PatternTexts(["baz"])),
+        )
+        pool = PatternPool()
+        classifier = Classifier.from_rule_pattern_index(
+            RulePatternIndex.from_rules([rule, other]), pool=pool
+        )
+
+        index = classifier.compiled_rule_index
+        assert (
+            index[("markAsRead", "s1", "title")] is index[("markAsRead", "s2", "title")]
+        )
+        # foo|bar, baz and the empty content patterns of all three streams.
+        assert pool.stats().compiled == 3
+        assert classifier.stats() == ClassifierStats(
+            keys=3, patterns=2, fields=3, field_patterns=2
+        )
+        entry = Entry(id="e", title="a baz", origin=EntryOrigin(streamId="s3"))
+        assert classifier.classify(entry) == {"markAsRead"}
+        entry = Entry(id="e", title="a baz", origin=EntryOrigin(streamId="s2"))
+        assert classifier.classify(entry) == set()
+
     # --- Test to_act ---
     @pytest.fixture
     def classifier_for_to_act(self) -> Classifier:
@@ -673,3 +758,320 @@ class TestClassifier:
         # Create Entry object from data dictionary
         entry = Entry(**entry_data)
         assert classifier_for_to_act.to_act(entry, action) == expected_result
+
+    # --- Test classify / classify_many ---
+    @pytest.mark.parametrize(
+        "entry_data",
+        [
+            {"id": "e0", "title": "Important"},
+            {"id": "e1", "title": "Important", "origin": {"streamId": "s3"}},
+            {"id": "e2", "title": "Alert SaveMe", "origin": {"streamId": "s1"}},
+            {"id": "e3", "title": "SaveMe", "origin": {"streamId": "s1"}},
+            {
+                "id": "e4",
+                "title": "SaveMe",
+                "content": {"content": "has keyword"},
+                "origin": {"streamId": "s1"},
+            },
+            {
+                "id": "e5",
+                "title": "News",
+                "content": {"content": "nothing"},
+                "summary": {"content": "secret"},
+                "origin": {"streamId": "s1"},
+            },
+            {
+                "id": "e6",
+                "title": "News",
+                "content": {"content": "About projectX"},
+                "origin": {"streamId": "s2"},
+            },
+        ],
+    )
+    def test_classify_agrees_with_to_act(
+        self, classifier_for_to_act: Classifier, entry_data: dict
+    ):
+        """Tests classify returns exactly the actions to_act accepts."""
+        entry = Entry(**entry_data)
+        actions: list[Action] = ["markAsRead", "markAsSaved"]
+        expected = {
+            action for action in actions if classifier_for_to_act.to_act(entry, action)
+        }
+        assert classifier_for_to_act.classify(entry) == expected
+
+    def test_classify_uses_combined_pattern_per_field(self):
+        """Test patterns of all actions for one field are merged into one pattern."""
+        classifier = Classifier(
+            compiled_rule_index={
+                ("markAsRead", "s1", "content"): re.compile("fo+"),
+                ("markAsSaved", "s1", "content"): re.compile("ba+r"),
+            }
+        )
+        regexes = classifier._field_index[("s1", "content")].regexes
+        assert isinstance(regexes, StdlibActionPatterns)
+        assert regexes.combined is not None
+        assert set(regexes.combined.groupindex) == {"markAsRead", "markAsSaved"}
+
+    @pytest.mark.parametrize(
+        "read_pattern, save_pattern, text, expected",
+        [
+            pytest.param("foo", "bar", "foo then bar", {"markAsRead", "markAsSaved"}),
+            pytest.param("foo", "bar", "bar then foo", {"markAsRead", "markAsSaved"}),
+            pytest.param("foo", "bar", "only bar", {"markAsSaved"}),
+            pytest.param("foo", "fo", "foo", {"markAsRead", "markAsSaved"}),
+            pytest.param("^foo", "bar", "bar foo", {"markAsSaved"}),
+            pytest.param("(?<=x)foo", "bar", "bar xfoo", {"markAsRead", "markAsSaved"}),
+            pytest.param(
+                r"(a)\1", "bar", "aa bar", {"markAsRead", "markAsSaved"}, id="backref"
+            ),
+            pytest.param(
+                "(?P<g>a)", "(?P<g>b)", "b", {"markAsSaved"}, id="duplicate_group"
+            ),
+        ],
+    )
+    def test_classify_finds_all_actions(
+        self, read_pattern: str, save_pattern: str, text: str, expected: set
+    ):
+        """Test every matching action is reported regardless of match order."""
+        classifier = Classifier(
+            compiled_rule_index={
+                ("markAsRead", "s1", "content"): re.compile(read_pattern),
+                ("markAsSaved", "s1", "content"): re.compile(save_pattern),
+            }
+        )
+        entry = Entry(
+            id="e",
+            content=EntryContent(content=text),
+            origin=EntryOrigin(streamId="s1"),
+        )
+        assert classifier.classify(entry) == expected
+
+    def test_classify_separates_literals(self):
+        """Test keyword branches are matched apart from the regex remainder."""
+        classifier = Classifier(
+            compiled_rule_index={
+                ("markAsRead", "s1", "title"): re.compile(r"ad|^PR:|v\d+"),
+                ("markAsSaved", "s1", "title"): re.compile("release"),
+            }
+        )
+        field_patterns = classifier._field_index[("s1", "title")]
+        assert isinstance(field_patterns.regexes, StdlibActionPatterns)
+        assert field_patterns.regexes.by_action == {
+            "markAsRead": re.compile(r"^PR:|v\d+")
+        }
+        assert field_patterns.literals is not None
+        assert field_patterns.literals.literals == {
+            "ad": frozenset({"markAsRead"}),
+            "release": frozenset({"markAsSaved"}),
+        }
+
+    def test_classify_with_many_literals(self, mocker):
+        """Test classify agrees with to_act when literals go through an automaton."""
+        mocker.patch.object(literal_matcher, "SUBSTRING_SCAN_MAX_LITERALS", 0)
+        rpi = RulePatternIndex(
+            root={
+                ("markAsRead", "s1", "title"): PatternTexts(
+                    [f"word{i}" for i in range(50)] + [r"^\[AD\]"]
+                ),
+                ("markAsSaved", "s1", "title"): PatternTexts(["word7", "keep"]),
+            }
+        )
+        classifier = Classifier.from_rule_pattern_index(rpi)
+        for title in ["word7", "xword42y", "[AD] x", "keep", "wor", "x [AD]"]:
+            entry = Entry(id="e", title=title, origin=EntryOrigin(streamId="s1"))
+            expected = {
+                action
+                for action in ("markAsRead", "markAsSaved")
+                if classifier.to_act(entry, action)  # type: ignore[arg-type]
+            }
+            assert classifier.classify(entry) == expected
+
+    def test_classify_falls_back_for_group_references(self):
+        """Test patterns with group references are not merged."""
+        classifier = Classifier(
+            compiled_rule_index={
+                ("markAsRead", "s1", "title"): re.compile(r"(a)\1"),
+                ("markAsSaved", "s1", "title"): re.compile("b+"),
+            }
+        )
+        regexes = classifier._field_index[("s1", "title")].regexes
+        assert isinstance(regexes, StdlibActionPatterns)
+        assert regexes.combined is None
+
+    def test_classify_many(self, classifier_for_to_act: Classifier):
+        """Test classify_many returns one action set per entry, in order."""
+        entries = [
+            Entry(id="e1", title="Alert", origin=EntryOrigin(streamId="s1")),
+            Entry(id="e2", title="Nothing", origin=EntryOrigin(streamId="s1")),
+            Entry(id="e3", title="SaveMe", origin=EntryOrigin(streamId="s1")),
+        ]
+        assert classifier_for_to_act.classify_many(entries) == [
+            {"markAsRead"},
+            set(),
+            {"markAsSaved"},
+        ]
+
+    # --- Test fingerprint ---
+    def test_fingerprint_depends_on_patterns_only(self):
+        """Test equal rule sets share a fingerprint and different ones do not."""
+        rpi = RulePatternIndex(
+            root={("markAsRead", "s1", "title"): PatternTexts(["b", "a", "c"])}
+        )
+        same = Classifier.from_rule_pattern_index(rpi)
+        other = Classifier.from_rule_pattern_index(
+            RulePatternIndex(
+                root={("markAsRead", "s1", "title"): PatternTexts(["a", "b"])}
+            )
+        )
+
+        assert Classifier.from_rule_pattern_index(rpi).fingerprint() == (
+            same.fingerprint()
+        )
+        assert same.fingerprint() != other.fingerprint()
+        assert Classifier(compiled_rule_index={}).fingerprint() != same.fingerprint()
+
+    # --- Test stream_ids ---
+    def test_stream_ids(self, classifier_for_to_act: Classifier):
+        """Test only streams with at least one pattern are reported."""
+        classifier = Classifier(
+            compiled_rule_index=classifier_for_to_act.compiled_rule_index
+            | {
+                ("markAsRead", "s3", "title"): None,
+                ("markAsSaved", "s4", "content"): re.compile("x"),
+            }
+        )
+        assert classifier.stream_ids() == {"s1", "s2", "s4"}
+
+    # --- Test normalization ---
+    @pytest.fixture
+    def normalizing_classifier(self) -> Classifier:
+        return Classifier(
+            compiled_rule_index={
+                ("markAsRead", "s1", "content"): re.compile(r"big sale"),
+                ("markAsSaved", "s1", "content"): re.compile(r"^release notes$"),
+                ("markAsRead", "s1", "title"): re.compile(r"ＦＵＬＬ"),
+            },
+            normalization={
+                "content": TextNormalization(
+                    [
+                        NormalizationStep.strip_html,
+                        NormalizationStep.decode_entities,
+                        NormalizationStep.case_fold,
+                        NormalizationStep.collapse_whitespace,
+                    ]
+                )
+            },
+        )
+
+    @pytest.mark.parametrize(
+        "content, title, expected",
+        [
+            pytest.param("<p>Big&nbsp;<b>SALE</b></p>", "", {"markAsRead"}, id="html"),
+            pytest.param(
+                "<h1>Release</h1>\n  <p>Notes</p>", "", {"markAsSaved"}, id="whitespace"
+            ),
+            pytest.param("", "ＦＵＬＬ", {"markAsRead"}, id="title_untouched"),
+            pytest.param("<big>sale</big>", "", set(), id="tags_separate_words"),
+        ],
+    )
+    def test_normalized_fields(
+        self,
+        normalizing_classifier: Classifier,
+        content: str,
+        title: str,
+        expected: set,
+    ):
+        """Tests fields are matched after their configured normalization only."""
+        entry = Entry(
+            id="e",
+            title=title,
+            content=EntryContent(content=content),
+            origin=EntryOrigin(streamId="s1"),
+        )
+        assert normalizing_classifier.classify(entry) == expected
+        actions: list[Action] = ["markAsRead", "markAsSaved"]
+        assert {a for a in actions if normalizing_classifier.to_act(entry, a)} == (
+            expected
+        )
+
+    def test_view_normalizes_once(
+        self, normalizing_classifier: Classifier, mocker: MockerFixture
+    ):
+        """Test a view normalizes each field once for all actions."""
+        apply = mocker.spy(TextNormalization, "apply")
+        entry = Entry(
+            id="e",
+            content=EntryContent(content="<p>big sale</p>"),
+            summary=EntryContent(content="summary"),
+            origin=EntryOrigin(streamId="s1"),
+        )
+        view = normalizing_classifier.view(entry)
+
+        assert normalizing_classifier.to_read(view)
+        assert not normalizing_classifier.to_save(view)
+        assert normalizing_classifier.classify(view) == {"markAsRead"}
+        assert apply.call_count == 2
+        assert normalizing_classifier.view(view) is view
+
+    def test_with_settings(self, normalizing_classifier: Classifier):
+        """Test normalization is part of the fingerprint and can be changed."""
+        plain = normalizing_classifier.with_settings()
+        assert plain.normalization == {}
+        assert plain.compiled_rule_index is normalizing_classifier.compiled_rule_index
+        assert plain.fingerprint() != normalizing_classifier.fingerprint()
+        assert (
+            plain.with_settings(normalization={"title": TextNormalization()}) is plain
+        )
+
+    # --- Test max_content_chars ---
+    @pytest.fixture
+    def content_classifier(self) -> Classifier:
+        builder = RulePatternIndexBuilder()
+        builder.add_rule(
+            Rule(
+                stream_ids=frozenset({"s1"}),
+                actions=frozenset({"markAsRead"}),
+                patterns=EntryPatternTexts(
+                    title=PatternTexts(["alpha", r"beta\w*", "gamma"]),
+                    content=PatternTexts(["delta"]),
+                ),
+            )
+        )
+        return Classifier.from_rule_pattern_index(
+            builder.build(), rule_names=builder.rule_names()
+        )
+
+    def test_max_content_chars(self, content_classifier: Classifier):
+        """Test truncated contents only match near their beginning."""
+        truncated = content_classifier.with_settings(max_content_chars=10)
+        near = Entry(
+            id="e",
+            content=EntryContent(content="delta " + "x" * 100),
+            origin=EntryOrigin(streamId="s1"),
+        )
+        far = Entry(
+            id="e",
+            content=EntryContent(content="x" * 100 + " delta"),
+            origin=EntryOrigin(streamId="s1"),
+        )
+
+        assert truncated.classify(near) == {"markAsRead"}
+        assert truncated.classify(far) == set()
+        assert content_classifier.classify(far) == {"markAsRead"}
+        assert truncated.classify(truncated.compact(far)) == set()
+        assert truncated.fingerprint() != content_classifier.fingerprint()
+        assert truncated.with_settings(max_content_chars=10) is truncated
+        assert truncated.with_settings().classify(far) == {"markAsRead"}
+
+    def test_classify_compact_entry(self, classifier_for_to_act: Classifier):
+        """Test compact entries classify like the entries they come from."""
+        entry = Entry(
+            id="e",
+            title="tech news",
+            content=EntryContent(content="buy now"),
+            origin=EntryOrigin(streamId="s1"),
+        )
+        compact = classifier_for_to_act.compact(entry)
+        assert classifier_for_to_act.classify(compact) == (
+            classifier_for_to_act.classify(entry)
+        )
@@ -0,0 +1,135 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from feedly_regexp_marker.classifier import Classifier
+from feedly_regexp_marker.classifier_cache import CACHE_SUFFIX, ClassifierCache
+from feedly_regexp_marker.models import Entry, EntryOrigin
+
+RULES_YAML = """\
+- stream_ids: [s1]
+  actions: [markAsRead]
+  patterns:
+    title: [foo, 'bar\\d+']
+"""
+
+
+@pytest.fixture
+def rules_path(tmp_path: Path) -> Path:
+    path = tmp_path / "rules.yaml"
+    path.write_text(RULES_YAML)
+    return path
+
+
+def make_entry(title: str) -> Entry:
+    return Entry(id="e", title=title, origin=EntryOrigin(streamId="s1"))
+
+
+# --- Test ClassifierCache.key ---
+
+
+class TestKey:
+    def test_stable_for_same_content(self, rules_path: Path, tmp_path: Path):
+        """Test the key only depends on file content, not on the path."""
+        copy = tmp_path / "copy.yaml"
+        copy.write_bytes(rules_path.read_bytes())
+        assert ClassifierCache.key([rules_path], "re") == ClassifierCache.key(
+            [copy], "re"
+        )
+
+    def test_changes_with_content(self, rules_path: Path):
+        """Test editing a rules file yields a new key."""
+        before = ClassifierCache.key([rules_path], "re")
+        rules_path.write_text(RULES_YAML.replace("foo", "baz"))
+        assert ClassifierCache.key([rules_path], "re") != before
+
+    def test_changes_with_engine(self, rules_path: Path):
+        """Test each regex engine gets its own key."""
+        pytest.importorskip("re2")
+        assert ClassifierCache.key([rules_path], "re") != ClassifierCache.key(
+            [rules_path], "re2"
+        )
+
+    def test_missing_file(self, tmp_path: Path):
+        """Test a missing rules file raises like loading it would."""
+        with pytest.raises(FileNotFoundError):
+            ClassifierCache.key([tmp_path / "missing.yaml"], "re")
+
+
+# --- Test ClassifierCache load/store ---
+
+
+class TestClassifierCache:
+    def test_load_missing(self, tmp_path: Path):
+        """Test loading an unknown key returns None."""
+        assert ClassifierCache(tmp_path).load("unknown") is None
+
+    def test_round_trip(self, rules_path: Path, tmp_path: Path):
+        """Test a stored classifier loads back equal and working."""
+        cache = ClassifierCache(tmp_path / "cache")
+        clf = Classifier.from_yaml_paths([rules_path])
+        cache.store("k", clf)
+
+        loaded = cache.load("k")
+        assert isinstance(loaded, Classifier)
+        assert loaded.fingerprint() == clf.fingerprint()
+        assert loaded.classify(make_entry("bar12")) == {"markAsRead"}
+        assert loaded.classify(make_entry("qux")) == set()
+
+    def test_round_trip_re2(self, rules_path: Path, tmp_path: Path):
+        """Test classifiers using RE2 sets survive pickling."""
+        pytest.importorskip("re2")
+        cache = ClassifierCache(tmp_path)
+        cache.store("k", Classifier.from_yaml_paths([rules_path], regex_engine="re2"))
+
+        loaded = cache.load("k")
+        assert isinstance(loaded, Classifier)
+        assert loaded.regex_engine == "re2"
+        assert loaded.classify(make_entry("bar12")) == {"markAsRead"}
+
+    def test_corrupt_file(self, tmp_path: Path):
+        """Test an unreadable cache file is ignored."""
+        (tmp_path / f"k{CACHE_SUFFIX}").write_bytes(b"not a pickle")
+        assert ClassifierCache(tmp_path).load("k") is None
+
+    def test_prunes_oldest(self, rules_path: Path, tmp_path: Path):
+        """Test only the most recently written files are kept."""
+        cache = ClassifierCache(tmp_path, max_files=2)
+        clf = Classifier.from_yaml_paths([rules_path])
+        for i, key in enumerate(["a", "b", "c"]):
+            cache.store(key, clf)
+            os.utime(tmp_path / f"{key}{CACHE_SUFFIX}", ns=(i, i))
+        cache.store("d", clf)
+
+        assert sorted(p.name for p in tmp_path.glob(f"*{CACHE_SUFFIX}")) == [
+            f"c{CACHE_SUFFIX}",
+            f"d{CACHE_SUFFIX}",
+        ]
+
+
+# --- Test Classifier.from_yaml_paths with a cache ---
+
+
+class TestFromYamlPathsWithCache:
+    def test_hit_skips_parsing(self, rules_path: Path, tmp_path: Path, mocker):
+        """Test unchanged rules are loaded from the cache without parsing."""
+        cache = ClassifierCache(tmp_path / "cache")
+        clf = Classifier.from_yaml_paths([rules_path], cache=cache)
+
+        from_yaml = mocker.patch("feedly_regexp_marker.classifier.Rules.from_yaml")
+        cached = Classifier.from_yaml_paths([rules_path], cache=cache)
+
+        from_yaml.assert_not_called()
+        assert cached.fingerprint() == clf.fingerprint()
+
+    def test_changed_rules_are_parsed(self, rules_path: Path, tmp_path: Path):
+        """Test edited rules miss the cache and are compiled afresh."""
+        cache = ClassifierCache(tmp_path / "cache")
+        Classifier.from_yaml_paths([rules_path], cache=cache)
+        rules_path.write_text(RULES_YAML.replace("foo", "baz"))
+
+        clf = Classifier.from_yaml_paths([rules_path], cache=cache)
+
+        assert clf.classify(make_entry("baz")) == {"markAsRead"}
+        assert clf.classify(make_entry("foo")) == set()
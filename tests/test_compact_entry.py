@@ -0,0 +1,72 @@
+import pickle
+from typing import Optional
+
+import pytest
+
+from feedly_regexp_marker.compact_entry import CompactEntry
+from feedly_regexp_marker.models import Entry, EntryContent, EntryOrigin
+
+# --- Test CompactEntry.from_entry ---
+
+
+def test_from_entry():
+    """Test the fields read by classification are copied."""
+    entry = Entry(
+        id="e",
+        title="title",
+        content=EntryContent(content="content"),
+        summary=EntryContent(content="summary"),
+        origin=EntryOrigin(streamId="feed/a"),
+    )
+    assert CompactEntry.from_entry(entry) == CompactEntry(
+        id="e",
+        stream_id="feed/a",
+        title="title",
+        content="content",
+        summary="summary",
+    )
+
+
+def test_from_entry_missing_fields():
+    """Test missing fields stay None."""
+    assert CompactEntry.from_entry(Entry(id="e")) == CompactEntry(
+        id="e", stream_id=None, title=None, content=None, summary=None
+    )
+
+
+def test_stream_ids_interned():
+    """Test entries of the same feed share their stream ID string."""
+    first, second = (
+        CompactEntry.from_entry(
+            Entry(id=entry_id, origin=EntryOrigin(streamId="".join(["feed/", "a"])))
+        )
+        for entry_id in ("e1", "e2")
+    )
+    assert first.stream_id is second.stream_id
+
+
+@pytest.mark.parametrize(
+    "max_content_chars, expected",
+    [
+        pytest.param(None, ("0123456789", "abcdef"), id="unlimited"),
+        pytest.param(4, ("0123", "abcd"), id="truncated"),
+        pytest.param(100, ("0123456789", "abcdef"), id="shorter_than_limit"),
+    ],
+)
+def test_max_content_chars(max_content_chars: Optional[int], expected: tuple[str, str]):
+    """Test contents and summaries are truncated, titles are not."""
+    entry = Entry(
+        id="e",
+        title="a long title",
+        content=EntryContent(content="0123456789"),
+        summary=EntryContent(content="abcdef"),
+    )
+    compact = CompactEntry.from_entry(entry, max_content_chars)
+    assert (compact.content, compact.summary) == expected
+    assert compact.title == "a long title"
+
+
+def test_pickle_round_trip():
+    """Test compact entries can be sent to worker processes."""
+    compact = CompactEntry.from_entry(Entry(id="e", title="t"))
+    assert pickle.loads(pickle.dumps(compact)) == compact
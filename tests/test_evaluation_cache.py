@@ -0,0 +1,87 @@
+from datetime import timedelta
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from feedly_regexp_marker.evaluation_cache import EvaluationCache
+from feedly_regexp_marker.models import Entry
+
+# --- Test EvaluationCache ---
+
+
+class TestEvaluationCache:
+    def test_record_and_filter(self, tmp_path: Path):
+        """Test recorded entries are filtered out of later pages."""
+        with EvaluationCache(tmp_path / "cache.db", rules_fingerprint="fp") as cache:
+            cache.record(["e1", "e3"])
+            entries = [Entry(id="e1"), Entry(id="e2"), Entry(id="e3")]
+
+            assert cache.unevaluated(entries) == [Entry(id="e2")]
+            assert cache.evaluated_ids(["e1", "e2"]) == {"e1"}
+            assert len(cache) == 2
+
+    def test_many_ids_are_queried_in_chunks(self, tmp_path: Path):
+        """Test lookups with more ids than one SQL statement allows."""
+        with EvaluationCache(tmp_path / "cache.db", rules_fingerprint="fp") as cache:
+            ids = [f"e{i}" for i in range(2000)]
+            cache.record(ids[::2])
+
+            assert cache.evaluated_ids(ids) == set(ids[::2])
+
+    def test_persists_with_same_fingerprint(self, tmp_path: Path):
+        """Test entries survive reopening with an identical rule set."""
+        with EvaluationCache(tmp_path / "cache.db", rules_fingerprint="fp") as cache:
+            cache.record(["e1"])
+        with EvaluationCache(tmp_path / "cache.db", rules_fingerprint="fp") as cache:
+            assert cache.evaluated_ids(["e1"]) == {"e1"}
+
+    def test_cleared_when_rules_change(self, tmp_path: Path):
+        """Test a new fingerprint forgets every recorded entry."""
+        with EvaluationCache(tmp_path / "cache.db", rules_fingerprint="fp1") as cache:
+            cache.record(["e1"])
+        with EvaluationCache(tmp_path / "cache.db", rules_fingerprint="fp2") as cache:
+            assert len(cache) == 0
+        with EvaluationCache(tmp_path / "cache.db", rules_fingerprint="fp2") as cache:
+            cache.record(["e2"])
+        with EvaluationCache(tmp_path / "cache.db", rules_fingerprint="fp2") as cache:
+            assert cache.evaluated_ids(["e2"]) == {"e2"}
+
+    def test_evict_by_size(self, mocker: MockerFixture, tmp_path: Path):
+        """Test eviction keeps only the most recently evaluated entries."""
+        mock_time = mocker.patch("feedly_regexp_marker.evaluation_cache.time.time")
+        with EvaluationCache(
+            tmp_path / "cache.db", rules_fingerprint="fp", max_entries=2
+        ) as cache:
+            for i, entry_id in enumerate(["e1", "e2", "e3"]):
+                mock_time.return_value = 1000.0 + i
+                cache.record([entry_id])
+
+            assert cache.evict() == 1
+            assert cache.evaluated_ids(["e1", "e2", "e3"]) == {"e2", "e3"}
+
+    def test_evict_by_age(self, mocker: MockerFixture, tmp_path: Path):
+        """Test eviction drops entries older than max_age."""
+        mock_time = mocker.patch("feedly_regexp_marker.evaluation_cache.time.time")
+        with EvaluationCache(
+            tmp_path / "cache.db",
+            rules_fingerprint="fp",
+            max_age=timedelta(seconds=60),
+        ) as cache:
+            mock_time.return_value = 1000.0
+            cache.record(["old"])
+            mock_time.return_value = 1050.0
+            cache.record(["new"])
+
+            mock_time.return_value = 1100.0
+            assert cache.evict() == 1
+            assert cache.evaluated_ids(["old", "new"]) == {"new"}
+
+    def test_use_rules_switches_fingerprint(self, tmp_path: Path):
+        """Test switching rules on an open cache clears it only on change."""
+        with EvaluationCache(tmp_path / "cache.db", rules_fingerprint="fp1") as cache:
+            cache.record(["e1"])
+            cache.use_rules("fp1")
+            assert len(cache) == 1
+            cache.use_rules("fp2")
+            assert len(cache) == 0
+            assert cache.rules_fingerprint == "fp2"
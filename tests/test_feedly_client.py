@@ -1,10 +1,14 @@
 from unittest.mock import MagicMock, call
 
 import pytest
+import requests
+from feedly.api_client.protocol import BadRequestAPIError
 from feedly.api_client.session import FeedlySession
 from pytest_mock import MockerFixture
+from requests import HTTPError, Response
 
-from feedly_regexp_marker.feedly_client import Action, Entry, FeedlyClient
+from feedly_regexp_marker.feedly_client import FeedlyClient, MarkEntriesError, chunked
+from feedly_regexp_marker.models import Action, Entry
 
 # --- Test FeedlyClient ---
 
@@ -226,3 +230,112 @@ class TestFeedlyClient:
         mock_mark.assert_called_once_with(
             entries=entries, action="markAsRead", dry_run=False
         )
+
+    # --- Test chunked / concurrent mark_entries ---
+    def test_mark_entries_splits_into_chunks(self, mock_session: MagicMock):
+        """Test entry ids are submitted in chunks of at most mark_chunk_size."""
+        client = FeedlyClient(session=mock_session, mark_chunk_size=2)
+        entries = [Entry(id=f"e{i}") for i in range(5)]
+
+        client.mark_entries(entries=entries, action="markAsRead", dry_run=False)
+
+        submitted = sorted(
+            c.kwargs["data"]["entryIds"]
+            for c in mock_session.do_api_request.call_args_list
+        )
+        assert submitted == [["e0", "e1"], ["e2", "e3"], ["e4"]]
+
+    def test_mark_entries_retries_failed_chunk(
+        self, mocker: MockerFixture, mock_session: MagicMock
+    ):
+        """Test a failing chunk is retried before giving up."""
+        mock_sleep = mocker.patch("feedly_regexp_marker.feedly_client.time.sleep")
+        mock_session.do_api_request.side_effect = [
+            requests.ConnectionError("boom"),
+            None,
+        ]
+        client = FeedlyClient(session=mock_session, mark_retries=1)
+
+        client.mark_entries(
+            entries=[Entry(id="e1")], action="markAsSaved", dry_run=False
+        )
+
+        assert mock_session.do_api_request.call_count == 2
+        mock_sleep.assert_called_once_with(1.0)
+
+    def test_mark_entries_does_not_retry_api_errors(
+        self, mocker: MockerFixture, mock_session: MagicMock
+    ):
+        """Test a chunk rejected with a 4xx error is reported without retrying."""
+        mock_sleep = mocker.patch("feedly_regexp_marker.feedly_client.time.sleep")
+        response = Response()
+        response.status_code = 400
+        mock_session.do_api_request.side_effect = BadRequestAPIError(
+            HTTPError(response=response)
+        )
+        client = FeedlyClient(session=mock_session, mark_retries=2)
+
+        with pytest.raises(MarkEntriesError) as exc_info:
+            client.mark_entries(
+                entries=[Entry(id="e1")], action="markAsRead", dry_run=False
+            )
+
+        assert exc_info.value.failed_entry_ids == ["e1"]
+        assert mock_session.do_api_request.call_count == 1
+        mock_sleep.assert_not_called()
+
+    def test_mark_entries_fails_partially(
+        self, mocker: MockerFixture, mock_session: MagicMock
+    ):
+        """Test only the failing chunk is reported once its retries are exhausted."""
+        mocker.patch("feedly_regexp_marker.feedly_client.time.sleep")
+
+        def do_api_request(relative_url: str, data: dict):
+            if "bad" in data["entryIds"]:
+                raise requests.ConnectionError("boom")
+
+        mock_session.do_api_request.side_effect = do_api_request
+        client = FeedlyClient(session=mock_session, mark_chunk_size=1, mark_retries=2)
+
+        with pytest.raises(MarkEntriesError) as exc_info:
+            client.mark_entries(
+                entries=[Entry(id="ok1"), Entry(id="bad"), Entry(id="ok2")],
+                action="markAsRead",
+                dry_run=False,
+            )
+
+        assert exc_info.value.failed_entry_ids == ["bad"]
+        assert exc_info.value.marked_count == 2
+        assert len(exc_info.value.errors) == 1
+        # 2 successful chunks + 1 failing chunk tried 3 times
+        assert mock_session.do_api_request.call_count == 5
+
+
+@pytest.mark.parametrize(
+    "items, size, expected",
+    [
+        pytest.param([], 2, [], id="empty"),
+        pytest.param([1, 2, 3], 2, [[1, 2], [3]], id="remainder"),
+        pytest.param([1, 2], 2, [[1, 2]], id="exact"),
+        pytest.param(iter([1, 2, 3]), 5, [[1, 2, 3]], id="iterator"),
+    ],
+)
+def test_chunked(items, size: int, expected: list):
+    """Tests chunked splits any iterable into lists of at most size items."""
+    assert list(chunked(items, size)) == expected
+
+
+def test_chunked_invalid_size():
+    """Test chunked rejects non-positive sizes."""
+    with pytest.raises(ValueError):
+        list(chunked([1], 0))
+
+
+def test_fetch_all_unread_entries_newer_than(feedly_client: FeedlyClient):
+    """Test newer_than is passed to the API as newerThan."""
+    feedly_client.session.do_api_request.return_value = {"items": []}
+
+    list(feedly_client.fetch_all_unread_entries(newer_than=12345))
+
+    params = feedly_client.session.do_api_request.call_args.kwargs["params"]
+    assert params["newerThan"] == "12345"
@@ -0,0 +1,257 @@
+import random
+import re
+from typing import Optional
+
+import pytest
+from pytest_mock import MockerFixture
+
+from feedly_regexp_marker import literal_matcher
+from feedly_regexp_marker.literal_matcher import (
+    AhoCorasick,
+    LiteralMatcher,
+    LiteralSplit,
+    RequiredLiteral,
+    RequiredLiteralGate,
+    literal_text,
+    split_alternation,
+)
+from feedly_regexp_marker.models import Action
+
+# --- Test split_alternation ---
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        pytest.param("abc", ["abc"], id="single"),
+        pytest.param("a|b|c", ["a", "b", "c"], id="plain"),
+        pytest.param("(a|b)|c", ["(a|b)", "c"], id="group"),
+        pytest.param(r"a\|b|c", [r"a\|b", "c"], id="escaped_bar"),
+        pytest.param("[|(]|c", ["[|(]", "c"], id="class"),
+        pytest.param("[]|]|c", ["[]|]", "c"], id="class_leading_bracket"),
+        pytest.param("[^]|]|c", ["[^]|]", "c"], id="negated_class_leading_bracket"),
+        pytest.param(r"[\]|]|c", [r"[\]|]", "c"], id="class_escaped_bracket"),
+        pytest.param("a||b", ["a", "", "b"], id="empty_branch"),
+    ],
+)
+def test_split_alternation(source: str, expected: list[str]):
+    """Tests only top-level `|` operators split the pattern."""
+    assert split_alternation(source) == expected
+
+
+# --- Test literal_text ---
+
+
+@pytest.mark.parametrize(
+    "branch, expected",
+    [
+        pytest.param("keyword", "keyword", id="plain"),
+        pytest.param("two words", "two words", id="space"),
+        pytest.param(r"a\.b\(c\)", "a.b(c)", id="escaped"),
+        pytest.param("日本語", "日本語", id="unicode"),
+        pytest.param("a.b", None, id="dot"),
+        pytest.param("^a", None, id="anchor"),
+        pytest.param(r"\bword", None, id="word_boundary"),
+        pytest.param("colou?r", None, id="quantifier"),
+        pytest.param("(?i:a)", None, id="scoped_flag"),
+        pytest.param("(?i)a", None, id="global_flag"),
+        pytest.param("", None, id="empty"),
+        pytest.param("(", None, id="invalid"),
+    ],
+)
+def test_literal_text(branch: str, expected: Optional[str]):
+    """Tests a branch is a literal only when it matches exactly one text."""
+    assert literal_text(branch) == expected
+
+
+# --- Test LiteralSplit ---
+
+
+class TestLiteralSplit:
+    def test_mixed(self):
+        """Test literal branches are removed from the regex remainder."""
+        split = LiteralSplit.from_pattern(re.compile(r"^Sponsored|ad|v\d+|a\.b"))
+        assert split.literals == ["ad", "a.b"]
+        assert split.remainder == re.compile(r"^Sponsored|v\d+")
+
+    def test_all_literals(self):
+        """Test no remainder is left when every branch is a literal."""
+        split = LiteralSplit.from_pattern(re.compile("a|b"))
+        assert split == LiteralSplit(literals=["a", "b"], remainder=None)
+
+    @pytest.mark.parametrize(
+        "pattern",
+        [
+            pytest.param(re.compile("a+|b+"), id="no_literals"),
+            pytest.param(re.compile("a|b", re.IGNORECASE), id="flags"),
+            pytest.param(re.compile("(?i)a|b"), id="inline_global_flags"),
+            pytest.param(re.compile(r"a|(b)\1"), id="group_reference"),
+            pytest.param(re.compile(b"a|b"), id="bytes"),
+        ],
+    )
+    def test_kept_whole(self, pattern: re.Pattern):
+        """Test patterns that cannot be split safely are kept as they are."""
+        assert LiteralSplit.from_pattern(pattern) == LiteralSplit(
+            literals=[], remainder=pattern
+        )
+
+
+# --- Test AhoCorasick ---
+
+
+class TestAhoCorasick:
+    @pytest.fixture
+    def automaton(self) -> AhoCorasick:
+        return AhoCorasick(
+            {
+                "he": frozenset({"markAsRead"}),
+                "she": frozenset({"markAsRead"}),
+                "hers": frozenset({"markAsSaved"}),
+            }
+        )
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            pytest.param("ushers", {"markAsRead", "markAsSaved"}, id="overlapping"),
+            pytest.param("ahe", {"markAsRead"}, id="suffix"),
+            pytest.param("her", {"markAsRead"}, id="prefix_of_longer_word"),
+            pytest.param("hxers", set(), id="no_match"),
+            pytest.param("", set(), id="empty"),
+        ],
+    )
+    def test_search(self, automaton: AhoCorasick, text: str, expected: set):
+        """Tests the labels of every occurring word are found."""
+        both: frozenset[Action] = frozenset({"markAsRead", "markAsSaved"})
+        assert automaton.search(text, both) == expected
+
+    def test_search_only_wanted(self, automaton: AhoCorasick):
+        """Test labels that are not wanted are never reported."""
+        assert automaton.search("ushers", frozenset({"markAsSaved"})) == {"markAsSaved"}
+
+
+# --- Test LiteralMatcher ---
+
+
+@pytest.mark.parametrize("force_automaton", [False, True], ids=["scan", "automaton"])
+def test_literal_matcher_agrees_with_regex(
+    mocker: MockerFixture, force_automaton: bool
+):
+    """Tests both backends report the same actions as searching with `re`."""
+    if force_automaton:
+        mocker.patch.object(literal_matcher, "SUBSTRING_SCAN_MAX_LITERALS", 0)
+    rng = random.Random(0)
+    actions: list[Action] = ["markAsRead", "markAsSaved"]
+    words = {
+        action: ["".join(rng.choices("abc", k=rng.randint(2, 4))) for _ in range(8)]
+        for action in actions
+    }
+    matcher = LiteralMatcher.from_literals(words)
+    assert matcher is not None
+    patterns = {action: re.compile("|".join(ws)) for action, ws in words.items()}
+
+    for _ in range(200):
+        text = "".join(rng.choices("abcd", k=rng.randint(0, 12)))
+        expected = {a for a, p in patterns.items() if p.search(text)}
+        assert matcher.matched_actions(text, frozenset(words)) == expected
+
+
+def test_literal_matcher_from_no_literals():
+    """Test no matcher is built when there are no literals."""
+    assert LiteralMatcher.from_literals({"markAsRead": []}) is None
+
+
+# --- Test RequiredLiteral ---
+
+
+@pytest.mark.parametrize(
+    "branch, flags, expected",
+    [
+        pytest.param(r"foo\s+bars", 0, RequiredLiteral("bars", False), id="longest"),
+        pytest.param(r"x*abc", 0, RequiredLiteral("abc", False), id="after_repeat"),
+        pytest.param(
+            r"(?:ab)+cde", 0, RequiredLiteral("cde", False), id="group_repeat"
+        ),
+        pytest.param(r"(?:xyz)+", 0, RequiredLiteral("xyz", False), id="repeated"),
+        pytest.param(r"(abcd)?efg", 0, RequiredLiteral("efg", False), id="optional"),
+        pytest.param(r"(word)\d", 0, RequiredLiteral("word", False), id="group"),
+        pytest.param(
+            r"(?i)Release v\d+", 0, RequiredLiteral("relea", True), id="ignore_case"
+        ),
+        pytest.param(
+            r"Update ok", re.IGNORECASE, RequiredLiteral("update o", True), id="flag"
+        ),
+        pytest.param(r"(?i:abcd)efg", 0, RequiredLiteral("efg", False), id="scoped"),
+        pytest.param(r"ab\d", 0, None, id="too_short"),
+        pytest.param(r"(abc|def)", 0, None, id="alternation"),
+        pytest.param(r"(?=abc)", 0, None, id="lookahead"),
+        pytest.param(r"(?i)日本語\d", 0, None, id="ignore_case_non_ascii"),
+        pytest.param(r"(", 0, None, id="invalid"),
+    ],
+)
+def test_required_literal(branch: str, flags: int, expected):
+    """Tests the literal every match contains is extracted."""
+    assert RequiredLiteral.from_branch(branch, flags) == expected
+
+
+# --- Test RequiredLiteralGate ---
+
+
+class TestRequiredLiteralGate:
+    def test_ungated_action(self):
+        """Test actions with a branch lacking a required literal always pass."""
+        gate = RequiredLiteralGate.from_patterns(
+            {
+                "markAsRead": re.compile(r"foo\d|\d+"),
+                "markAsSaved": re.compile(r"(?i)keep\w+|save\d"),
+            }
+        )
+        assert gate is not None
+        assert gate.ungated == {"markAsRead"}
+
+        both: frozenset[Action] = frozenset({"markAsRead", "markAsSaved"})
+        assert gate.possible_actions("nothing", both) == {"markAsRead"}
+        assert gate.possible_actions("KEEPING", both) == both
+        assert gate.possible_actions("save1", both) == both
+
+    def test_nothing_to_gate(self):
+        """Test no gate is built when no action has required literals."""
+        assert RequiredLiteralGate.from_patterns(
+            {"markAsRead": re.compile(r"\d+")}
+        ) is (None)
+
+    @pytest.mark.parametrize(
+        "pattern",
+        [
+            r"foo\s+bar",
+            r"(?i)release v\d+",
+            r"colou?red",
+            r"(?:ab)+cde|x.yz\b",
+            r"(?i)stop\w*|TASKS?",
+            r"(?i)Über\w+",
+        ],
+    )
+    def test_never_skips_a_match(self, pattern: str):
+        """Tests the gate passes every text the pattern matches."""
+        compiled = re.compile(pattern)
+        gate = RequiredLiteralGate.from_patterns({"markAsRead": compiled})
+        texts = [
+            "foo   bar",
+            "RELEASE V2",
+            "Release v10",
+            "colored",
+            "ababcde",
+            "xayz",
+            "ſtop",
+            "TAſKS",
+            "\u212akask",
+            "İstop",
+            "überall",
+            "ÜBERALL",
+            "nothing here",
+        ]
+        for text in texts:
+            if compiled.search(text):
+                assert gate is None or gate.possible_actions(
+                    text, frozenset({"markAsRead"})
+                ), text
@@ -0,0 +1,97 @@
+import subprocess
+import sys
+
+import pytest
+from typer.testing import CliRunner
+
+from feedly_regexp_marker.__main__ import COMMAND_MODULES, app
+
+HEAVY_MODULES = {
+    "aiohttp",
+    "feedly",
+    "logzero",
+    "pydantic_yaml",
+    "requests",
+    "ruamel",
+    "sqlite3",
+}
+
+# Imports the CLI, or runs it with the arguments given, in a fresh interpreter
+# and lists the imported modules on stderr, as commands may write to stdout.
+LIST_MODULES = """\
+import runpy
+import sys
+
+if len(sys.argv) > 1:
+    sys.argv[0] = "feedly_regexp_marker"
+    try:
+        runpy.run_module("feedly_regexp_marker", run_name="__main__")
+    except SystemExit:
+        pass
+else:
+    import feedly_regexp_marker.__main__
+print("\\n".join(sys.modules), file=sys.stderr)
+"""
+
+
+def imported_modules(*args: str) -> set[str]:
+    """Modules in `sys.modules` after importing the CLI, or after running it
+    with `args` if given."""
+    completed = subprocess.run(
+        [sys.executable, "-c", LIST_MODULES, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(completed.stderr.splitlines())
+
+
+def top_level(modules: set[str]) -> set[str]:
+    return {name.split(".")[0] for name in modules}
+
+
+# --- Test startup imports ---
+
+
+def test_main_imports():
+    """Test the CLI starts without the modules of its commands."""
+    modules = imported_modules()
+
+    assert "feedly_regexp_marker.__main__" in modules
+    assert not top_level(modules) & HEAVY_MODULES
+    assert not modules & set(COMMAND_MODULES.values())
+
+
+def test_gen_json_schema_for_rules_imports():
+    """Test generating the schema only imports the rule models."""
+    modules = imported_modules("gen-json-schema-for-rules")
+
+    assert "feedly_regexp_marker.commands.gen_json_schema_for_rules" in modules
+    assert not top_level(modules) & HEAVY_MODULES
+    assert "feedly_regexp_marker.commands.watch" not in modules
+
+
+# --- Test commands ---
+
+
+def test_help_lists_commands():
+    """Test every command is listed without running it."""
+    result = CliRunner().invoke(app, ["--help"])
+    assert result.exit_code == 0
+    for name in COMMAND_MODULES:
+        assert name in result.output
+
+
+@pytest.mark.parametrize(
+    "name", [pytest.param(name, id=name) for name in COMMAND_MODULES]
+)
+def test_command_help(name: str):
+    """Test each command loads with its options."""
+    result = CliRunner().invoke(app, [name, "--help"])
+    assert result.exit_code == 0
+    assert "Usage" in result.output
+
+
+def test_unknown_command():
+    result = CliRunner().invoke(app, ["nope"])
+    assert result.exit_code != 0
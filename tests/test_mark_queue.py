@@ -0,0 +1,109 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, call
+
+import pytest
+from pytest_mock import MockerFixture
+
+from feedly_regexp_marker.feedly_client import MarkEntriesError
+from feedly_regexp_marker.mark_queue import MarkQueue
+from feedly_regexp_marker.models import Entry, EntryContent
+
+# --- Test MarkQueue ---
+
+
+@pytest.fixture
+def mock_marker(mocker: MockerFixture) -> MagicMock:
+    """Fixture to return a mock exposing an async mark_entries."""
+    marker = mocker.MagicMock()
+    marker.mark_entries = AsyncMock()
+    return marker
+
+
+class TestMarkQueue:
+    def test_invalid_batch_size(self, mock_marker: MagicMock):
+        """Test a non-positive batch size is rejected."""
+        with pytest.raises(ValueError):
+            MarkQueue(marker=mock_marker, batch_size=0, dry_run=False)
+
+    def test_put_flushes_full_batches(self, mock_marker: MagicMock):
+        """Test a batch is submitted as soon as it reaches batch_size."""
+        queue = MarkQueue(marker=mock_marker, batch_size=2, dry_run=False)
+
+        async def run():
+            for i in range(5):
+                await queue.put(Entry(id=f"e{i}"), "markAsRead")
+
+        asyncio.run(run())
+
+        assert mock_marker.mark_entries.await_args_list == [
+            call(
+                entries=[Entry(id="e0"), Entry(id="e1")],
+                action="markAsRead",
+                dry_run=False,
+            ),
+            call(
+                entries=[Entry(id="e2"), Entry(id="e3")],
+                action="markAsRead",
+                dry_run=False,
+            ),
+        ]
+        assert [e.id for e in queue.pending["markAsRead"]] == ["e4"]
+        assert queue.marked["markAsRead"] == 4
+
+    def test_flush_submits_remaining_per_action(self, mock_marker: MagicMock):
+        """Test flush drains every partially filled batch and tracks counts."""
+        queue = MarkQueue(marker=mock_marker, batch_size=10, dry_run=True)
+
+        async def run():
+            await queue.put(Entry(id="e1"), "markAsSaved")
+            await queue.put(Entry(id="e2"), "markAsRead")
+            await queue.put(Entry(id="e3"), "markAsSaved")
+            await queue.flush()
+            await queue.flush()
+
+        asyncio.run(run())
+
+        assert mock_marker.mark_entries.await_args_list == [
+            call(
+                entries=[Entry(id="e1"), Entry(id="e3")],
+                action="markAsSaved",
+                dry_run=True,
+            ),
+            call(entries=[Entry(id="e2")], action="markAsRead", dry_run=True),
+        ]
+        assert queue.pending == {}
+        assert queue.marked == {"markAsSaved": 2, "markAsRead": 1}
+
+    def test_put_drops_entry_bodies(self, mock_marker: MagicMock):
+        """Test queued entries keep only the fields needed for marking."""
+        queue = MarkQueue(marker=mock_marker, batch_size=10, dry_run=False)
+        entry = Entry(
+            id="e1",
+            title="Title",
+            content=EntryContent(content="<p>large body</p>"),
+            summary=EntryContent(content="summary"),
+        )
+
+        asyncio.run(queue.put(entry, "markAsRead"))
+
+        assert queue.pending["markAsRead"] == [Entry(id="e1", title="Title")]
+
+    def test_partial_failure_is_counted(self, mock_marker: MagicMock):
+        """Test a partially failed batch is counted instead of raised."""
+        mock_marker.mark_entries.side_effect = MarkEntriesError(
+            action="markAsRead",
+            failed_entry_ids=["e2"],
+            marked_count=1,
+            errors=[RuntimeError("boom")],
+        )
+        queue = MarkQueue(marker=mock_marker, batch_size=2, dry_run=False)
+
+        async def run():
+            await queue.put(Entry(id="e1"), "markAsRead")
+            await queue.put(Entry(id="e2"), "markAsRead")
+
+        asyncio.run(run())
+
+        assert queue.marked["markAsRead"] == 1
+        assert queue.failed["markAsRead"] == 1
+        assert queue.pending == {}
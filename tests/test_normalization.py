@@ -0,0 +1,64 @@
+import pytest
+
+from feedly_regexp_marker.normalization import (
+    NormalizationStep,
+    TextNormalization,
+    collapse_whitespace,
+    strip_html,
+)
+
+# --- Test strip_html ---
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        pytest.param("plain", "plain", id="no_markup"),
+        pytest.param("<p>a</p><p>b</p>", " a  b ", id="tags_become_spaces"),
+        pytest.param('<a href="x>">link</a>', ' ">link ', id="quoted_gt"),
+        pytest.param("a<!-- <b>hidden</b> -->b", "a b", id="comment"),
+        pytest.param("a<script>var x = '<p>';</script>b", "a b", id="script"),
+        pytest.param("a<STYLE type=x>p {}</style >b", "a b", id="style"),
+        pytest.param("1 &lt; 2", "1 &lt; 2", id="entities_kept"),
+    ],
+)
+def test_strip_html(text: str, expected: str):
+    """Tests markup is removed while the text between tags is kept."""
+    assert strip_html(text) == expected
+
+
+def test_collapse_whitespace():
+    """Test runs of whitespace become single spaces and the ends are trimmed."""
+    assert collapse_whitespace("  a \n\t b　c  ") == "a b c"
+
+
+# --- Test TextNormalization ---
+
+
+@pytest.mark.parametrize(
+    "steps, text, expected",
+    [
+        pytest.param([], " <b>A&amp;B</b> ", " <b>A&amp;B</b> ", id="identity"),
+        pytest.param(
+            [NormalizationStep.decode_entities], "A&amp;B&#x21;", "A&B!", id="entities"
+        ),
+        pytest.param([NormalizationStep.nfkc], "ｆｕｌｌ①", "full1", id="nfkc"),
+        pytest.param([NormalizationStep.case_fold], "Straße", "strasse", id="casefold"),
+        pytest.param(
+            [NormalizationStep.decode_entities, NormalizationStep.strip_html],
+            "&lt;b&gt;x<i>y</i>",
+            "<b>x y ",
+            id="entities_after_tags",
+        ),
+        pytest.param(
+            list(NormalizationStep),
+            "<p>Big&nbsp;\n<b>ＳＡＬＥ</b></p>",
+            "big sale",
+            id="all_steps",
+        ),
+    ],
+)
+def test_apply(steps: list[NormalizationStep], text: str, expected: str):
+    """Tests steps run in their fixed order whatever order they are given in."""
+    assert TextNormalization(steps).apply(text) == expected
+    assert TextNormalization(reversed(steps)).apply(text) == expected
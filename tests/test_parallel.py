@@ -0,0 +1,75 @@
+import re
+
+import pytest
+
+from feedly_regexp_marker.classifier import Classifier
+from feedly_regexp_marker.models import Entry, EntryContent, EntryOrigin
+from feedly_regexp_marker.parallel import ParallelClassifier, _classify_chunk
+
+
+@pytest.fixture
+def classifier() -> Classifier:
+    return Classifier(
+        compiled_rule_index={
+            ("markAsRead", "s1", "title"): re.compile(r"read\d"),
+            ("markAsSaved", "s1", "content"): re.compile("save"),
+        }
+    )
+
+
+def make_entries(count: int) -> list[Entry]:
+    return [
+        Entry(
+            id=f"e{i}",
+            title=f"read{i % 10}" if i % 3 == 0 else "other",
+            content=EntryContent(content="save me" if i % 4 == 0 else "no"),
+            origin=EntryOrigin(streamId="s1"),
+        )
+        for i in range(count)
+    ]
+
+
+# --- Test ParallelClassifier ---
+
+
+class TestParallelClassifier:
+    @pytest.mark.parametrize(
+        "workers, chunk_size",
+        [pytest.param(0, 1, id="no_workers"), pytest.param(1, 0, id="empty_chunks")],
+    )
+    def test_invalid_arguments(
+        self, classifier: Classifier, workers: int, chunk_size: int
+    ):
+        """Tests non-positive worker counts and chunk sizes are rejected."""
+        with pytest.raises(ValueError):
+            ParallelClassifier(classifier, workers=workers, chunk_size=chunk_size)
+
+    def test_single_worker_runs_in_process(self, classifier: Classifier):
+        """Test one worker classifies in this process without a pool."""
+        entries = make_entries(10)
+        with ParallelClassifier(classifier, workers=1) as parallel:
+            assert parallel._executor is None
+            assert parallel.classify_many(entries) == classifier.classify_many(entries)
+
+    def test_pool_matches_in_process(self, classifier: Classifier):
+        """Test a pool classifies like the classifier, in the entries' order."""
+        entries = make_entries(101)
+        with ParallelClassifier(classifier, workers=2, chunk_size=8) as parallel:
+            assert parallel.classify_many(entries) == classifier.classify_many(entries)
+            assert parallel.classify_many(entries[:1]) == [
+                {"markAsRead", "markAsSaved"}
+            ]
+            assert parallel.classify_many([]) == []
+        assert parallel._executor is None
+
+
+def test_classify_chunk_returns_ids(classifier: Classifier, mocker):
+    """Test a worker sends back entry ids with the actions only."""
+    mocker.patch("feedly_regexp_marker.parallel._worker_classifier", classifier)
+    entries = [classifier.compact(entry) for entry in make_entries(4)]
+    assert _classify_chunk(entries) == [
+        ("e0", {"markAsRead", "markAsSaved"}),
+        ("e1", set()),
+        ("e2", set()),
+        ("e3", {"markAsRead"}),
+    ]
@@ -0,0 +1,243 @@
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from feedly_regexp_marker.classifier import Classifier
+from feedly_regexp_marker.models import Entry, EntryContent, EntryOrigin
+from feedly_regexp_marker.pattern_safety import (
+    DEADLINE_SUPPORTED,
+    NESTED_QUANTIFIER,
+    OVERLAPPING_ALTERNATION,
+    MatchTimeout,
+    match_deadline,
+    redos_risks,
+    warn_redos_risks,
+)
+
+# Backtracks exponentially on a long run of "a" not followed by the end.
+CATASTROPHIC = r"(a+)+$"
+SLOW_TEXT = "a" * 40 + "!"
+
+needs_deadline = pytest.mark.skipif(
+    not DEADLINE_SUPPORTED, reason="re is not interrupted by signals before 3.11"
+)
+
+# --- Test redos_risks ---
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        pytest.param(r"foo\d+", [], id="plain"),
+        pytest.param(r"(foo|bar)+", [], id="disjoint_alternation"),
+        pytest.param(r"(\w|\s)*", [], id="disjoint_classes"),
+        pytest.param(r"(a{2}){3}", [], id="bounded_nesting"),
+        pytest.param(r"(a+)", [], id="single_quantifier"),
+        pytest.param(CATASTROPHIC, [NESTED_QUANTIFIER], id="nested"),
+        pytest.param(r"(.*)*", [NESTED_QUANTIFIER], id="nested_star"),
+        pytest.param(r"(?:x(?:\s+))+y", [NESTED_QUANTIFIER], id="nested_deeper"),
+        pytest.param(r"(ab|\wc)*", [OVERLAPPING_ALTERNATION], id="overlap_class"),
+        pytest.param(r"([^x]|y)+", [OVERLAPPING_ALTERNATION], id="overlap_negated"),
+        pytest.param(r"(?i)(Ab|ac)+", [OVERLAPPING_ALTERNATION], id="overlap_case"),
+        pytest.param(r"(Ab|ac)+", [], id="distinct_case"),
+        pytest.param(
+            r"(\d+|\w+)*",
+            [NESTED_QUANTIFIER, OVERLAPPING_ALTERNATION],
+            id="both",
+        ),
+        pytest.param(r"(?=(a+)+)", [NESTED_QUANTIFIER], id="in_lookahead"),
+        pytest.param(r"(", [], id="invalid"),
+    ],
+)
+def test_redos_risks(source: str, expected: list[str]):
+    """Tests risky constructs are flagged and common safe ones are not."""
+    assert redos_risks(source) == expected
+
+
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="atomic groups need Python 3.11")
+def test_redos_risks_atomic_group():
+    """Test atomic groups and possessive repeats are not flagged."""
+    assert redos_risks(r"(?>a+)+") == []
+    assert redos_risks(r"(a++)+") == []
+
+
+def test_warn_redos_risks(mocker: MockerFixture):
+    """Test risky patterns are logged with the rules using them."""
+    logger = mocker.patch("feedly_regexp_marker.pattern_safety.logger")
+
+    risky = warn_redos_risks({CATASTROPHIC: {"b", "a"}, "safe": {"c"}})
+
+    assert risky == {CATASTROPHIC: [NESTED_QUANTIFIER]}
+    logger.warning.assert_called_once()
+    assert "rule(s) a, b" in logger.warning.call_args.args[0]
+
+
+# --- Test match_deadline ---
+
+
+class TestMatchDeadline:
+    @needs_deadline
+    def test_interrupts_backtracking(self):
+        """Test a runaway search is interrupted once the time is up."""
+        start = time.perf_counter()
+        with pytest.raises(MatchTimeout):
+            with match_deadline(0.05):
+                re.search(CATASTROPHIC, SLOW_TEXT)
+        assert time.perf_counter() - start < 5
+
+    def test_fast_block(self):
+        """Test a block finishing in time is not interrupted later."""
+        with match_deadline(0.05):
+            assert re.search("a", "a")
+        time.sleep(0.1)
+
+    def test_no_budget(self):
+        """Test no deadline is set without a budget."""
+        with match_deadline(None):
+            assert re.search("a", "a")
+
+    def test_unsupported_python_runs_unbounded(self, mocker: MockerFixture):
+        """Test no deadline is set where `re` may not be interrupted."""
+        mocker.patch("feedly_regexp_marker.pattern_safety.DEADLINE_SUPPORTED", False)
+        with match_deadline(0.01):
+            time.sleep(0.05)
+
+    def test_other_thread_runs_unbounded(self):
+        """Test threads other than the main one are not interrupted."""
+        errors = []
+
+        def run():
+            try:
+                with match_deadline(0.01):
+                    time.sleep(0.05)
+            except MatchTimeout as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        assert errors == []
+
+
+# --- Test Classifier match budget ---
+
+RULES_YAML = f"""\
+- name: slow
+  stream_ids: [s1]
+  actions: [markAsRead]
+  patterns:
+    content: ['{CATASTROPHIC}']
+- name: fast
+  stream_ids: [s1]
+  actions: [markAsRead]
+  patterns:
+    content: [zzz]
+- name: keep
+  stream_ids: [s1]
+  actions: [markAsSaved]
+  patterns:
+    title: [keep]
+"""
+
+
+def make_entry(title: str, content: str) -> Entry:
+    return Entry(
+        id="e1",
+        title=title,
+        content=EntryContent(content=content),
+        origin=EntryOrigin(streamId="s1"),
+    )
+
+
+class TestMatchBudget:
+    @pytest.fixture
+    def rules_path(self, tmp_path: Path) -> Path:
+        path = tmp_path / "rules.yaml"
+        path.write_text(RULES_YAML)
+        return path
+
+    def test_build_warns_about_risky_patterns(
+        self, rules_path: Path, mocker: MockerFixture
+    ):
+        """Test risky patterns are reported with their rule name when building."""
+        logger = mocker.patch("feedly_regexp_marker.pattern_safety.logger")
+        Classifier.from_yaml_paths([rules_path])
+        logger.warning.assert_called_once()
+        assert "rule(s) slow" in logger.warning.call_args.args[0]
+
+    @needs_deadline
+    def test_slow_pattern_is_quarantined(self, rules_path: Path, mocker: MockerFixture):
+        """Test a pattern over the budget is logged and skipped from then on."""
+        logger = mocker.patch("feedly_regexp_marker.classifier.logger")
+        clf = Classifier.from_yaml_paths([rules_path], match_budget=0.05)
+
+        assert clf.classify(make_entry("keep", SLOW_TEXT)) == {"markAsSaved"}
+        logger.warning.assert_called_once()
+        assert "rule(s) slow" in logger.warning.call_args.args[0]
+
+        start = time.perf_counter()
+        assert clf.classify(make_entry("x", SLOW_TEXT)) == set()
+        assert clf.classify(make_entry("x", "zzz")) == {"markAsRead"}
+        assert time.perf_counter() - start < 0.05
+        logger.warning.assert_called_once()
+
+    @needs_deadline
+    def test_to_act_within_budget(self, rules_path: Path, mocker: MockerFixture):
+        """Test to_act answers without the slow pattern once over budget."""
+        mocker.patch("feedly_regexp_marker.classifier.logger")
+        clf = Classifier.from_yaml_paths([rules_path], match_budget=0.05)
+
+        assert not clf.to_read(make_entry("x", SLOW_TEXT))
+        assert clf.to_read(make_entry("x", SLOW_TEXT + "zzz"))
+
+        start = time.perf_counter()
+        for _ in range(3):
+            assert not clf.to_read(make_entry("x", SLOW_TEXT))
+        assert time.perf_counter() - start < 0.05
+
+    @needs_deadline
+    def test_quarantine_spans_streams(self, tmp_path: Path, mocker: MockerFixture):
+        """Test a pattern over the budget is skipped in the other streams using
+        it too, without timing out there again."""
+        path = tmp_path / "rules.yaml"
+        path.write_text(RULES_YAML.replace("[s1]", "[s1, s2]"))
+        logger = mocker.patch("feedly_regexp_marker.classifier.logger")
+        clf = Classifier.from_yaml_paths([path], match_budget=0.05)
+
+        assert clf.classify(make_entry("x", SLOW_TEXT)) == set()
+        logger.warning.assert_called_once()
+
+        entry = make_entry("keep", SLOW_TEXT + "zzz").model_copy(
+            update={"origin": EntryOrigin(streamId="s2")}
+        )
+        start = time.perf_counter()
+        assert clf.classify(entry) == {"markAsRead", "markAsSaved"}
+        assert time.perf_counter() - start < 0.05
+        logger.warning.assert_called_once()
+
+    def test_isolated_patterns_compiled_once(
+        self, rules_path: Path, mocker: MockerFixture
+    ):
+        """Test classifying pattern by pattern reuses the compiled texts."""
+        mocker.patch("feedly_regexp_marker.classifier.logger")
+        clf = Classifier.from_yaml_paths([rules_path], match_budget=0.05)
+        entry = make_entry("keep", "zzz")
+        assert clf._classify_isolated(entry) == {"markAsRead", "markAsSaved"}
+
+        compile = mocker.spy(re, "compile")
+        assert clf._classify_isolated(entry) == {"markAsRead", "markAsSaved"}
+        compile.assert_not_called()
+
+    def test_with_match_budget(self, rules_path: Path):
+        """Test the budget can be changed without rebuilding the patterns."""
+        clf = Classifier.from_yaml_paths([rules_path])
+        assert clf.with_settings(match_budget=None) is clf
+
+        budgeted = clf.with_settings(match_budget=1.0)
+        assert budgeted.match_budget == 1.0
+        assert budgeted.fingerprint() == clf.fingerprint()
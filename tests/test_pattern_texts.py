@@ -4,7 +4,7 @@ from typing import Optional
 import pytest
 from pydantic import ValidationError
 
-from feedly_regexp_marker.pattern_texts import PatternText, PatternTexts
+from feedly_regexp_marker.pattern_texts import PatternPool, PatternText, PatternTexts
 
 # --- Test Cases for PatternTexts ---
 
@@ -182,3 +182,28 @@ def test_pattern_texts_compile_with_pipe_in_pattern():
     assert compiled.search("contains a here")
     assert compiled.search("contains b here")
     assert compiled.search("contains c here")
+
+
+# --- Test Cases for PatternPool ---
+
+
+def test_pattern_pool_shares_equal_sets():
+    """Test equal pattern sets compile once into one shared pattern."""
+    pool = PatternPool()
+    first = pool.compile(PatternTexts(["b", "a"]))
+    second = pool.compile(PatternTexts(["a", "b"]))
+    other = pool.compile(PatternTexts(["c"]))
+
+    assert first is second
+    assert other is not first
+    stats = pool.stats()
+    assert (stats.requested, stats.compiled, stats.reused) == (3, 2, 1)
+    assert stats.seconds >= 0
+
+
+def test_pattern_pool_empty():
+    """Test empty sets compile to None like PatternTexts.compile."""
+    pool = PatternPool()
+    assert pool.compile(PatternTexts()) is None
+    assert pool.compile(PatternTexts()) is None
+    assert pool.stats().compiled == 1
@@ -0,0 +1,208 @@
+import asyncio
+import re
+from pathlib import Path
+from typing import Optional
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from feedly_regexp_marker.classifier import Classifier
+from feedly_regexp_marker.evaluation_cache import EvaluationCache
+from feedly_regexp_marker.feedly_client import MarkEntriesError
+from feedly_regexp_marker.models import Entry, EntryOrigin, StreamContents
+from feedly_regexp_marker.pipeline import (
+    CycleOptions,
+    CycleResult,
+    EntryClassifier,
+    run_marking_cycle,
+)
+from feedly_regexp_marker.rule_profile import RuleProfiler
+from feedly_regexp_marker.watermark import (
+    DEFAULT_OVERLAP_MS,
+    Watermark,
+    WatermarkStore,
+)
+
+
+def make_entry(entry_id: str, title: str, crawled: int) -> Entry:
+    return Entry(
+        id=entry_id, title=title, crawled=crawled, origin=EntryOrigin(streamId="s1")
+    )
+
+
+@pytest.fixture
+def classifier() -> Classifier:
+    return Classifier(
+        compiled_rule_index={
+            ("markAsRead", "s1", "title"): re.compile("ad"),
+            ("markAsSaved", "s1", "title"): re.compile("news"),
+        }
+    )
+
+
+@pytest.fixture
+def mock_client(mocker: MockerFixture) -> MagicMock:
+    """Fixture to return a mock AsyncFeedlyClient serving two pages."""
+    pages = [
+        StreamContents(
+            items=[
+                make_entry("e1", "ad", 100_000_000),
+                make_entry("e2", "other", 200_000_000),
+            ],
+        ),
+        StreamContents(items=[make_entry("e3", "news", 300_000_000)]),
+    ]
+
+    async def fetch_unread_pages(newer_than: Optional[int] = None):
+        for page in pages:
+            yield page
+
+    client = mocker.MagicMock()
+    client.fetch_user_id = AsyncMock(return_value="user")
+    client.fetch_unread_pages = mocker.MagicMock(side_effect=fetch_unread_pages)
+    client.fetch_unread_pages_of_streams = mocker.MagicMock(
+        side_effect=lambda stream_ids, newer_than, max_concurrent_streams: (
+            fetch_unread_pages(newer_than)
+        )
+    )
+    client.mark_entries = AsyncMock()
+    return client
+
+
+def run_cycle(
+    classifier: Classifier,
+    client: MagicMock,
+    store: WatermarkStore,
+    evaluation_cache: Optional[EvaluationCache] = None,
+    entry_classifier: Optional[EntryClassifier] = None,
+    **options,
+) -> CycleResult:
+    return asyncio.run(
+        run_marking_cycle(
+            clf=classifier,
+            feedly_client=client,
+            options=CycleOptions(**options),
+            watermark_store=store,
+            evaluation_cache=evaluation_cache,
+            entry_classifier=entry_classifier,
+        )
+    )
+
+
+# --- Test run_marking_cycle ---
+
+
+class TestRunMarkingCycle:
+    def test_marks_matches(
+        self, classifier: Classifier, mock_client: MagicMock, tmp_path: Path
+    ):
+        """Test every page is classified and the matches are marked."""
+        result = run_cycle(classifier, mock_client, WatermarkStore.in_dir(tmp_path))
+
+        assert result == CycleResult(
+            fetched=3, marked={"markAsRead": 1, "markAsSaved": 1}, failed={}
+        )
+        marked = {
+            call.kwargs["action"]: [e.id for e in call.kwargs["entries"]]
+            for call in mock_client.mark_entries.await_args_list
+        }
+        assert marked == {"markAsRead": ["e1"], "markAsSaved": ["e3"]}
+        mock_client.fetch_user_id.assert_not_awaited()
+
+    def test_profiler_classifies(
+        self, classifier: Classifier, mock_client: MagicMock, tmp_path: Path
+    ):
+        """Test a profiler classifies every entry like the classifier would."""
+        profiler = RuleProfiler(classifier)
+        result = run_cycle(
+            classifier,
+            mock_client,
+            WatermarkStore.in_dir(tmp_path),
+            entry_classifier=profiler,
+        )
+
+        assert result == CycleResult(
+            fetched=3, marked={"markAsRead": 1, "markAsSaved": 1}, failed={}
+        )
+        assert profiler.entries == 3
+
+    def test_only_rule_streams(
+        self, classifier: Classifier, mock_client: MagicMock, tmp_path: Path
+    ):
+        """Test only the streams referenced by rules are fetched when asked."""
+        run_cycle(
+            classifier,
+            mock_client,
+            WatermarkStore.in_dir(tmp_path),
+            only_rule_streams=True,
+            stream_concurrency=2,
+        )
+
+        mock_client.fetch_unread_pages.assert_not_called()
+        mock_client.fetch_unread_pages_of_streams.assert_called_once_with(
+            {"s1"}, newer_than=None, max_concurrent_streams=2
+        )
+
+    def test_incremental_saves_and_resumes_watermark(
+        self, classifier: Classifier, mock_client: MagicMock, tmp_path: Path
+    ):
+        """Test the watermark is saved and used as newerThan on the next cycle."""
+        store = WatermarkStore.in_dir(tmp_path)
+
+        run_cycle(classifier, mock_client, store, incremental=True)
+        assert store.load("user") == Watermark(
+            newer_than=300_000_000, rules_fingerprint=classifier.fingerprint()
+        )
+
+        run_cycle(classifier, mock_client, store, incremental=True)
+        newer_than = mock_client.fetch_unread_pages.call_args_list[-1].kwargs
+        assert newer_than == {"newer_than": 300_000_000 - DEFAULT_OVERLAP_MS}
+
+    @pytest.mark.parametrize(
+        "dry_run, fail",
+        [
+            pytest.param(True, False, id="dry_run"),
+            pytest.param(False, True, id="mark_failed"),
+        ],
+    )
+    def test_incremental_keeps_watermark(
+        self,
+        classifier: Classifier,
+        mock_client: MagicMock,
+        tmp_path: Path,
+        dry_run: bool,
+        fail: bool,
+    ):
+        """Test the watermark is not saved on dry runs or failed marks."""
+        if fail:
+            mock_client.mark_entries.side_effect = MarkEntriesError(
+                "markAsRead", ["e1"], 0, [RuntimeError("boom")]
+            )
+        store = WatermarkStore.in_dir(tmp_path)
+
+        result = run_cycle(
+            classifier, mock_client, store, incremental=True, dry_run=dry_run
+        )
+
+        assert bool(result.failed) is fail
+        assert store.load("user") is None
+
+    def test_evaluation_cache_skips_unmatched_entries(
+        self, classifier: Classifier, mock_client: MagicMock, tmp_path: Path
+    ):
+        """Test entries without a match are recorded and skipped next cycle."""
+        store = WatermarkStore.in_dir(tmp_path)
+        with EvaluationCache(tmp_path / "cache.db", rules_fingerprint="old") as cache:
+            run_cycle(classifier, mock_client, store, evaluation_cache=cache)
+            assert cache.rules_fingerprint == classifier.fingerprint()
+            assert cache.evaluated_ids(["e1", "e2", "e3"]) == {"e2"}
+
+            mock_classify_many = MagicMock(side_effect=classifier.classify_many)
+            object.__setattr__(classifier, "classify_many", mock_classify_many)
+            run_cycle(classifier, mock_client, store, evaluation_cache=cache)
+
+        classified = [
+            [e.id for e in call.args[0]] for call in mock_classify_many.call_args_list
+        ]
+        assert classified == [["e1"], ["e3"]]
@@ -0,0 +1,164 @@
+import asyncio
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from unittest.mock import AsyncMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from feedly_regexp_marker.rate_limit import (
+    AsyncRequestScheduler,
+    RateLimiter,
+    backoff_delay,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# --- Test parse_retry_after ---
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        pytest.param(None, None, id="missing"),
+        pytest.param("", None, id="empty"),
+        pytest.param("30", 30.0, id="seconds"),
+        pytest.param("-5", 0.0, id="negative_seconds"),
+        pytest.param(
+            format_datetime(datetime.fromtimestamp(1060, tz=timezone.utc), usegmt=True),
+            60.0,
+            id="http_date",
+        ),
+        pytest.param("soon", None, id="garbage"),
+    ],
+)
+def test_parse_retry_after(value, expected):
+    """Tests Retry-After parsing for delta-seconds and HTTP dates."""
+    assert parse_retry_after(value, now=1000.0) == expected
+
+
+# --- Test backoff_delay ---
+
+
+@pytest.mark.parametrize(
+    "attempt, expected_upper",
+    [(1, 1.0), (2, 2.0), (3, 4.0), (10, 60.0)],
+)
+def test_backoff_delay_bounds(attempt: int, expected_upper: float):
+    """Tests the jitter range doubles per attempt up to the cap."""
+    assert backoff_delay(attempt, rng=lambda low, high: high) == expected_upper
+    assert backoff_delay(attempt, rng=lambda low, high: low) == 0.0
+
+
+# --- Test RateLimiter ---
+
+
+class TestRateLimiter:
+    def test_invalid_config(self):
+        """Test rate and burst must be positive."""
+        with pytest.raises(ValueError):
+            RateLimiter(rate=0)
+        with pytest.raises(ValueError):
+            RateLimiter(burst=0)
+
+    def test_burst_then_paced(self):
+        """Test a full bucket passes a burst, then requests are spaced by rate."""
+        limiter = RateLimiter(rate=2.0, burst=2, clock=FakeClock())
+        assert [limiter.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+
+    def test_refills_over_time(self):
+        """Test tokens come back at the configured rate."""
+        clock = FakeClock()
+        limiter = RateLimiter(rate=1.0, burst=1, clock=clock)
+        assert limiter.reserve() == 0.0
+        clock.now = 1.0
+        assert limiter.reserve() == 0.0
+
+    def test_quota_exhaustion_waits_for_reset(self):
+        """Test the remaining quota reported by Feedly is used, then waited out."""
+        clock = FakeClock(100.0)
+        limiter = RateLimiter(rate=100.0, burst=100, clock=clock)
+        limiter.update(
+            {
+                "X-RateLimit-Limit": "10",
+                "X-RateLimit-Count": "8",
+                "X-RateLimit-Reset": "30",
+            }
+        )
+
+        assert limiter.reserve() == 0.0
+        assert limiter.reserve() == 0.0
+        assert limiter.reserve() == 30.0
+        # Later reservations queue behind the reset as well.
+        assert limiter.reserve() == 30.0
+
+    def test_incomplete_headers_are_ignored(self):
+        """Test quota tracking needs limit, count and reset."""
+        limiter = RateLimiter(clock=FakeClock())
+        limiter.update({"X-RateLimit-Limit": "10", "X-RateLimit-Count": "10"})
+        assert limiter.quota_remaining is None
+
+    def test_block_for(self):
+        """Test blocking delays every subsequent reservation."""
+        limiter = RateLimiter(clock=FakeClock(5.0))
+        limiter.block_for(12.0)
+        assert limiter.reserve() == 12.0
+
+
+# --- Test AsyncRequestScheduler ---
+
+
+class TestAsyncRequestScheduler:
+    @pytest.mark.parametrize(
+        "status, attempt, expected",
+        [
+            (429, 1, True),
+            (503, 4, True),
+            (503, 5, False),
+            (404, 1, False),
+            (200, 1, False),
+        ],
+    )
+    def test_should_retry(self, status: int, attempt: int, expected: bool):
+        """Tests only 429/5xx are retried, up to max_attempts."""
+        scheduler = AsyncRequestScheduler(max_attempts=5)
+        assert scheduler.should_retry(status, attempt) is expected
+
+    def test_backoff_honours_retry_after(self, mocker: MockerFixture):
+        """Test Retry-After blocks the shared limiter and delays the retry."""
+        mock_sleep = mocker.patch(
+            "feedly_regexp_marker.rate_limit.asyncio.sleep", new=AsyncMock()
+        )
+        clock = FakeClock()
+        scheduler = AsyncRequestScheduler(
+            limiter=RateLimiter(clock=clock), backoff_base=0.5
+        )
+
+        asyncio.run(scheduler.backoff(1, {"Retry-After": "20"}))
+
+        delay = mock_sleep.await_args_list[0].args[0]
+        assert 20.0 <= delay <= 20.5
+        assert scheduler.limiter.reserve() == 20.0
+
+    def test_backoff_without_retry_after(self, mocker: MockerFixture):
+        """Test the exponential jittered backoff is used without Retry-After."""
+        mock_sleep = mocker.patch(
+            "feedly_regexp_marker.rate_limit.asyncio.sleep", new=AsyncMock()
+        )
+        mocker.patch(
+            "feedly_regexp_marker.rate_limit.random.uniform",
+            side_effect=lambda low, high: high,
+        )
+        scheduler = AsyncRequestScheduler(backoff_base=1.0)
+
+        asyncio.run(scheduler.backoff(3, {}))
+
+        mock_sleep.assert_awaited_once_with(4.0)
@@ -0,0 +1,153 @@
+import re
+from typing import Optional
+
+import pytest
+from pytest_mock import MockerFixture
+
+from feedly_regexp_marker import regex_engine
+from feedly_regexp_marker.classifier import Classifier, EntryAttr
+from feedly_regexp_marker.models import Action, Entry, EntryOrigin, StreamId
+from feedly_regexp_marker.regex_engine import (
+    RE2ActionPatterns,
+    RE2Engine,
+    StdlibEngine,
+    get_regex_engine,
+    translate_for_re2,
+)
+
+# --- Test translate_for_re2 ---
+
+
+@pytest.mark.parametrize(
+    "source, flags, expected",
+    [
+        pytest.param("abc", 0, "abc", id="plain"),
+        pytest.param("abc", re.IGNORECASE | re.DOTALL, "(?is)abc", id="flags"),
+        pytest.param(r"\d+", 0, r"[\p{Nd}]+", id="digit"),
+        pytest.param(r"[\w-]", 0, r"[\p{L}\p{N}_-]", id="word_in_class"),
+        pytest.param(r"\S", 0, r"[^\t\n\x0b\f\r\x1c-\x1f\x85\p{Z}]", id="non_space"),
+        pytest.param("a$", 0, r"a(?:\n?\z)", id="dollar"),
+        pytest.param("a$", re.MULTILINE, "(?m)a$", id="dollar_multiline"),
+        pytest.param(r"[$]\$", 0, r"[$]\$", id="literal_dollar"),
+        pytest.param(r"a\Z", 0, r"a\z", id="end_of_string"),
+        pytest.param(r"\u3042\U0001F600", 0, r"\x{3042}\x{0001F600}", id="unicode"),
+        pytest.param("a{,3}", 0, "a{0,3}", id="open_lower_bound"),
+        pytest.param(r"[\b]", 0, r"[\x08]", id="backspace"),
+        pytest.param(r"\bword", 0, None, id="word_boundary"),
+        pytest.param(r"[^\W]", 0, None, id="negated_in_class"),
+        pytest.param("[[:alpha:]]", 0, None, id="posix_class"),
+        pytest.param("[x[:]", 0, None, id="posix_class_opening"),
+        pytest.param("[[]:", 0, "[[]:", id="bracket_in_class"),
+        pytest.param("a", re.VERBOSE, None, id="verbose"),
+        pytest.param("a", re.ASCII, None, id="ascii"),
+    ],
+)
+def test_translate_for_re2(source: str, flags: int, expected: Optional[str]):
+    """Tests Python-only syntax is rewritten or rejected."""
+    assert translate_for_re2(source, flags | re.UNICODE) == expected
+
+
+# --- Test get_regex_engine ---
+
+
+class TestGetRegexEngine:
+    def test_stdlib(self):
+        """Test the default engine is the standard library."""
+        assert isinstance(get_regex_engine("re"), StdlibEngine)
+
+    def test_unknown(self):
+        """Test an unknown engine name is rejected."""
+        with pytest.raises(ValueError):
+            get_regex_engine("pcre")  # type: ignore[arg-type]
+
+    def test_re2_missing(self, mocker: MockerFixture):
+        """Test a helpful ImportError is raised without google-re2."""
+        mocker.patch.object(regex_engine, "re2", None)
+        with pytest.raises(ImportError, match="google-re2"):
+            get_regex_engine("re2")
+
+
+# --- Test RE2ActionPatterns ---
+
+PATTERNS = [
+    r"\d{3}-\d{4}",
+    r"^\[PR\]",
+    r"(?i:sponsored)",
+    r"colou?r|gr[ae]y",
+    r"\w+ing\b",
+    r"(?<=#)\w+",
+    r"end$",
+    r"[^\s]{12,}",
+    r"(a)\1",
+    r"日本\S+",
+]
+TEXTS = [
+    "",
+    "call 555-1234",
+    "[PR] launch",
+    "x [PR]",
+    "SPONSORED content",
+    "grey colour",
+    "running fast",
+    "#tag",
+    "the end",
+    "the end\n",
+    "the end\nmore",
+    "supercalifragilistic",
+    "aa",
+    "日本語の記事",
+    "ΑΒΓ１２３-４５６７",
+]
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_re2_agrees_with_re(pattern: str):
+    """Tests RE2 matching, with per-pattern fallback, agrees with re."""
+    pytest.importorskip("re2")
+    compiled = re.compile(pattern)
+    patterns = RE2ActionPatterns({"markAsRead": compiled})
+    for text in TEXTS:
+        expected = {"markAsRead"} if compiled.search(text) else set()
+        assert patterns.matched_actions(text, ["markAsRead"]) == expected, text
+
+
+def test_re2_runs_catastrophic_pattern_in_linear_time():
+    """Test a pattern that backtracks exponentially in re is safe with RE2."""
+    pytest.importorskip("re2")
+    patterns = RE2ActionPatterns({"markAsRead": re.compile(r"(a+)+$")})
+    assert patterns.fallback.by_action == {}
+    assert patterns.matched_actions("a" * 5000 + "b", ["markAsRead"]) == set()
+
+
+def test_re2_falls_back_per_branch():
+    """Test only the branches RE2 cannot run are left to re."""
+    pytest.importorskip("re2")
+    patterns = RE2ActionPatterns(
+        {
+            "markAsRead": re.compile(r"(?<=#)tag|\d+"),
+            "markAsSaved": re.compile(r"keep"),
+        }
+    )
+    assert patterns.set_actions == ["markAsRead", "markAsSaved"]
+    assert patterns.fallback.by_action == {"markAsRead": re.compile("(?<=#)tag")}
+
+    remaining: list[Action] = ["markAsRead", "markAsSaved"]
+    assert patterns.matched_actions("#tag keep", remaining) == set(remaining)
+    assert patterns.matched_actions("tag 42", remaining) == {"markAsRead"}
+    assert patterns.matched_actions("tag", remaining) == set()
+    assert patterns.matched_actions("#tag keep", ["markAsSaved"]) == {"markAsSaved"}
+
+
+def test_classifier_with_re2():
+    """Test a classifier built with RE2 classifies like one built with re."""
+    pytest.importorskip("re2")
+    assert isinstance(get_regex_engine("re2"), RE2Engine)
+    index: dict[tuple[Action, StreamId, EntryAttr], Optional[re.Pattern]] = {
+        ("markAsRead", "s1", "title"): re.compile("|".join(PATTERNS)),
+        ("markAsSaved", "s1", "title"): re.compile(r"(?i)launch|\d+"),
+    }
+    with_re = Classifier(compiled_rule_index=index)
+    with_re2 = Classifier(compiled_rule_index=index, regex_engine="re2")
+    for text in TEXTS:
+        entry = Entry(id="e", title=text, origin=EntryOrigin(streamId="s1"))
+        assert with_re2.classify(entry) == with_re.classify(entry), text
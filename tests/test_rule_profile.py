@@ -0,0 +1,168 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from feedly_regexp_marker.classifier import (
+    UNNAMED_RULE,
+    Classifier,
+    rule_names_by_pattern,
+)
+from feedly_regexp_marker.models import Entry, EntryContent, EntryOrigin
+from feedly_regexp_marker.pattern_texts import PatternTexts
+from feedly_regexp_marker.rule_profile import ProfileRow, RuleProfiler
+from feedly_regexp_marker.rules import EntryPatternTexts, Rule
+
+RULES_YAML = """\
+- name: releases
+  stream_ids: [s1]
+  actions: [markAsRead]
+  patterns:
+    title: ['v\\d+', release]
+- name: promos
+  stream_ids: [s1]
+  actions: [markAsRead]
+  patterns:
+    title: [release]
+    content: [sale]
+- stream_ids: [s1]
+  actions: [markAsSaved]
+  patterns:
+    title: [keep]
+"""
+
+
+@pytest.fixture
+def classifier(tmp_path: Path) -> Classifier:
+    path = tmp_path / "rules.yaml"
+    path.write_text(RULES_YAML)
+    return Classifier.from_yaml_paths([path])
+
+
+def make_entry(title: str, content: str = "", stream_id: str = "s1") -> Entry:
+    return Entry(
+        id="e",
+        title=title,
+        content=EntryContent(content=content) if content else None,
+        origin=EntryOrigin(streamId=stream_id),
+    )
+
+
+# --- Test rule_names_by_pattern ---
+
+
+def test_rule_names_by_pattern():
+    """Test each pattern text maps to the rules it comes from."""
+    rules = [
+        Rule(
+            name="a",
+            stream_ids=frozenset({"s1"}),
+            actions=frozenset({"markAsRead"}),
+            patterns=EntryPatternTexts(title=PatternTexts(["x", "y"])),
+        ),
+        Rule(
+            stream_ids=frozenset({"s1"}),
+            actions=frozenset({"markAsRead"}),
+            patterns=EntryPatternTexts(title=PatternTexts(["x"])),
+        ),
+    ]
+    assert rule_names_by_pattern(rules) == {
+        ("markAsRead", "s1", "title"): {
+            "x": frozenset({"a", UNNAMED_RULE}),
+            "y": frozenset({"a"}),
+        }
+    }
+
+
+# --- Test RuleProfiler ---
+
+
+class TestRuleProfiler:
+    @pytest.mark.parametrize(
+        "entry",
+        [
+            pytest.param(make_entry("release v2"), id="both_rules"),
+            pytest.param(make_entry("nothing", "big sale"), id="content"),
+            pytest.param(make_entry("keep v3"), id="two_actions"),
+            pytest.param(make_entry("nothing"), id="no_match"),
+            pytest.param(make_entry("release", stream_id="s2"), id="other_stream"),
+            pytest.param(Entry(id="e", title="release"), id="no_origin"),
+        ],
+    )
+    def test_classifies_like_classifier(self, classifier: Classifier, entry: Entry):
+        """Test profiled classification returns the classifier's actions."""
+        assert RuleProfiler(classifier).classify(entry) == classifier.classify(entry)
+
+    def test_counts_hits_per_rule_and_pattern(self, classifier: Classifier):
+        """Test hits are counted once per entry for every matching rule."""
+        profiler = RuleProfiler(classifier)
+        profiler.classify_many(
+            [make_entry("release v1"), make_entry("release"), make_entry("x", "sale")]
+        )
+
+        assert profiler.entries == 3
+        assert profiler.rule_hits == {"releases": 2, "promos": 3}
+        assert profiler.pattern_hits == {r"v\d+": 1, "release": 2, "sale": 1}
+        assert set(profiler.rule_seconds) == {"releases", "promos", UNNAMED_RULE}
+        assert profiler.pattern_rules["release"] == {"releases", "promos"}
+
+    def test_rows_sorted_by_time(self, classifier: Classifier):
+        """Test report rows list the slowest first."""
+        profiler = RuleProfiler(classifier)
+        profiler.rule_seconds.update({"a": 0.1, "b": 0.3, "c": 0.2})
+        profiler.rule_hits.update({"b": 4})
+
+        assert profiler.rule_rows() == [
+            ProfileRow("b", 4, 0.3),
+            ProfileRow("c", 0, 0.2),
+            ProfileRow("a", 0, 0.1),
+        ]
+
+    def test_without_rule_names(self):
+        """Test a classifier built without rules is profiled per merged pattern."""
+        clf = Classifier(
+            compiled_rule_index={("markAsRead", "s1", "title"): re.compile("a|b")}
+        )
+        profiler = RuleProfiler(clf)
+
+        assert profiler.classify(make_entry("b")) == {"markAsRead"}
+        assert profiler.pattern_hits == {"a|b": 1}
+        assert profiler.rule_hits == {UNNAMED_RULE: 1}
+
+    def test_flags_stay_with_their_stream(self, tmp_path: Path):
+        """Test a global inline flag of one stream's patterns does not apply
+        to the same text in other streams."""
+        path = tmp_path / "rules.yaml"
+        path.write_text(
+            "- stream_ids: [s1]\n"
+            "  actions: [markAsRead]\n"
+            "  patterns:\n"
+            "    title: ['(?i)foo', bar]\n"
+            "- stream_ids: [s2]\n"
+            "  actions: [markAsRead]\n"
+            "  patterns:\n"
+            "    title: [bar]\n"
+        )
+        clf = Classifier.from_yaml_paths([path])
+        profiler = RuleProfiler(clf)
+
+        for entry in (
+            make_entry("BAR", stream_id="s1"),
+            make_entry("BAR", stream_id="s2"),
+        ):
+            assert profiler.classify(entry) == clf.classify(entry)
+        assert profiler.classify(make_entry("BAR", stream_id="s2")) == set()
+
+    def test_log_report(self, classifier: Classifier, mocker):
+        """Test the report logs both tables with the rules of each pattern."""
+        logger = mocker.patch("feedly_regexp_marker.rule_profile.logger")
+        profiler = RuleProfiler(classifier)
+        profiler.classify(make_entry("release"))
+
+        profiler.log_report(limit=1)
+
+        lines = [call.args[0] for call in logger.info.call_args_list]
+        assert lines[0] == "Rule profile over 1 classified entries:"
+        assert lines[1].startswith("Rules by match time")
+        assert lines[3].startswith("Patterns by match time")
+        assert len(lines) == 5
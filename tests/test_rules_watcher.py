@@ -0,0 +1,47 @@
+import os
+from pathlib import Path
+
+from feedly_regexp_marker.rules_watcher import RulesWatcher
+
+# --- Test RulesWatcher ---
+
+
+class TestRulesWatcher:
+    def test_unchanged(self, tmp_path: Path):
+        """Test untouched files are not reported as changed."""
+        path = tmp_path / "rules.yaml"
+        path.write_text("[]")
+        watcher = RulesWatcher([path])
+        assert not watcher.changed()
+
+    def test_modified(self, tmp_path: Path):
+        """Test a rewritten file is reported once."""
+        path = tmp_path / "rules.yaml"
+        path.write_text("[]")
+        watcher = RulesWatcher([path])
+
+        path.write_text("[] # edited")
+        assert watcher.changed()
+        assert not watcher.changed()
+
+    def test_replaced(self, tmp_path: Path):
+        """Test a file replaced by rename is reported even with the same size."""
+        path = tmp_path / "rules.yaml"
+        path.write_text("[]")
+        stat = os.stat(path)
+        watcher = RulesWatcher([path])
+
+        replacement = tmp_path / "rules.yaml.new"
+        replacement.write_text("{}")
+        os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(replacement, path)
+        assert watcher.changed()
+
+    def test_removed(self, tmp_path: Path):
+        """Test a removed file is reported as changed."""
+        path = tmp_path / "rules.yaml"
+        path.write_text("[]")
+        watcher = RulesWatcher([path])
+
+        path.unlink()
+        assert watcher.changed()
@@ -0,0 +1,164 @@
+import asyncio
+import os
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from feedly_regexp_marker.classifier import Classifier
+from feedly_regexp_marker.classifier_cache import ClassifierCache
+from feedly_regexp_marker.models import (
+    Entry,
+    EntryOrigin,
+    Subscription,
+    SubscriptionCategory,
+    Subscriptions,
+)
+from feedly_regexp_marker.subscriptions import (
+    SUBSCRIPTIONS_FILE_NAME,
+    StreamExpansion,
+    SubscriptionStore,
+)
+
+TECH = SubscriptionCategory(id="user/u1/category/1234-abcd", label="Tech")
+NEWS = SubscriptionCategory(id="user/u1/category/news", label="News")
+
+SUBSCRIPTIONS = Subscriptions(
+    [
+        Subscription(id="feed/a", categories=[TECH]),
+        Subscription(id="feed/b", categories=[TECH, NEWS]),
+        Subscription(id="feed/c", categories=[NEWS]),
+        Subscription(id="feed/d"),
+    ]
+)
+
+RULES_YAML = """\
+- stream_ids: [user/-/category/Tech, feed/d]
+  actions: [markAsRead]
+  patterns:
+    title: [foo]
+"""
+
+
+# --- Test StreamExpansion ---
+
+
+@pytest.mark.parametrize(
+    "stream_ids, expected",
+    [
+        pytest.param({"feed/x"}, {"feed/x"}, id="feed"),
+        pytest.param(
+            {"user/-/category/Tech"}, {"feed/a", "feed/b"}, id="category_label"
+        ),
+        pytest.param(
+            {"user/u1/category/1234-abcd"}, {"feed/a", "feed/b"}, id="category_id"
+        ),
+        pytest.param(
+            {"user/other/category/news", "feed/x"},
+            {"feed/b", "feed/c", "feed/x"},
+            id="category_and_feed",
+        ),
+        pytest.param(
+            {"user/-/category/global.all"},
+            {"feed/a", "feed/b", "feed/c", "feed/d"},
+            id="global_all",
+        ),
+        pytest.param(
+            {"user/-/category/global.uncategorized"},
+            {"feed/d"},
+            id="global_uncategorized",
+        ),
+        pytest.param({"user/-/category/Unknown"}, set(), id="unknown_category"),
+        pytest.param({"user/-/tag/later"}, {"user/-/tag/later"}, id="tag"),
+    ],
+)
+def test_expand(stream_ids: set[str], expected: set[str]):
+    """Test category stream IDs are replaced with the feeds in them."""
+    expansion = StreamExpansion(SUBSCRIPTIONS)
+    assert expansion.expand(frozenset(stream_ids)) == expected
+
+
+def test_expand_without_subscriptions():
+    """Test categories are kept as they are without subscriptions."""
+    stream_ids = frozenset({"user/-/category/Tech", "feed/a"})
+    assert StreamExpansion().expand(stream_ids) == stream_ids
+
+
+def test_expand_warns_once(mocker: MockerFixture):
+    """Test a category matching nothing is only reported once."""
+    warning = mocker.patch("feedly_regexp_marker.subscriptions.logger.warning")
+    expansion = StreamExpansion(SUBSCRIPTIONS)
+    for _ in range(3):
+        expansion.expand(frozenset({"user/-/category/Unknown"}))
+    warning.assert_called_once()
+
+
+# --- Test SubscriptionStore ---
+
+
+class TestSubscriptionStore:
+    def test_round_trip(self, tmp_path: Path):
+        """Test saved subscriptions load back while fresh."""
+        store = SubscriptionStore.in_dir(tmp_path)
+        assert store.load() is None
+        store.save(SUBSCRIPTIONS)
+        assert store.load() == SUBSCRIPTIONS
+
+    def test_expired(self, tmp_path: Path, mocker: MockerFixture):
+        """Test subscriptions older than the TTL are not loaded."""
+        store = SubscriptionStore.in_dir(tmp_path, ttl=timedelta(hours=1))
+        store.save(SUBSCRIPTIONS)
+        now = os.path.getmtime(tmp_path / SUBSCRIPTIONS_FILE_NAME)
+        mocker.patch("time.time", return_value=now + 2 * 3600)
+        assert store.load() is None
+
+    def test_corrupt_file(self, tmp_path: Path):
+        """Test an unreadable file is ignored."""
+        (tmp_path / SUBSCRIPTIONS_FILE_NAME).write_text("{")
+        assert SubscriptionStore.in_dir(tmp_path).load() is None
+
+    def test_get_fetches_once(self, tmp_path: Path):
+        """Test subscriptions are fetched when missing and reused afterwards."""
+        client = AsyncMock()
+        client.fetch_subscriptions.return_value = SUBSCRIPTIONS
+        store = SubscriptionStore.in_dir(tmp_path)
+
+        assert asyncio.run(store.get(client)) == SUBSCRIPTIONS
+        assert asyncio.run(store.get(client)) == SUBSCRIPTIONS
+        client.fetch_subscriptions.assert_awaited_once()
+
+
+# --- Test Classifier.from_yaml_paths with subscriptions ---
+
+
+class TestFromYamlPathsWithSubscriptions:
+    @pytest.fixture
+    def rules_path(self, tmp_path: Path) -> Path:
+        path = tmp_path / "rules.yaml"
+        path.write_text(RULES_YAML)
+        return path
+
+    def test_categories_expand_into_feeds(self, rules_path: Path):
+        """Test a rule for a category matches entries of its feeds."""
+        clf = Classifier.from_yaml_paths([rules_path], subscriptions=SUBSCRIPTIONS)
+
+        assert clf.stream_ids() == {"feed/a", "feed/b", "feed/d"}
+        for stream_id, expected in [("feed/b", {"markAsRead"}), ("feed/c", set())]:
+            entry = Entry(id="e", title="foo", origin=EntryOrigin(streamId=stream_id))
+            assert clf.classify(entry) == expected
+        assert clf.rule_names[("markAsRead", "feed/a", "title")] == {
+            "foo": frozenset({"<unnamed>"})
+        }
+
+    def test_cache_key_depends_on_subscriptions(self, rules_path: Path):
+        """Test changed subscriptions miss the classifier cache."""
+        moved = Subscriptions(
+            [Subscription(id="feed/c", categories=[TECH]), *SUBSCRIPTIONS.root[3:]]
+        )
+        keys = {
+            ClassifierCache.key([rules_path], "re", subscriptions)
+            for subscriptions in (None, SUBSCRIPTIONS, moved)
+        }
+        assert len(keys) == 3
@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import pytest
+
+from feedly_regexp_marker.models import Entry
+from feedly_regexp_marker.watermark import (
+    STATE_FILE_NAME,
+    Watermark,
+    WatermarkStore,
+)
+
+# --- Test Watermark ---
+
+
+class TestWatermark:
+    @pytest.mark.parametrize(
+        "fingerprint, overlap_ms, expected",
+        [
+            pytest.param("fp", 0, 10_000, id="same_rules"),
+            pytest.param("fp", 1_000, 9_000, id="with_overlap"),
+            pytest.param("fp", 20_000, 0, id="overlap_clamped"),
+            pytest.param("other", 0, None, id="rules_changed"),
+        ],
+    )
+    def test_newer_than_for(self, fingerprint: str, overlap_ms: int, expected):
+        """Tests the resume point honours the overlap and the rules fingerprint."""
+        watermark = Watermark(newer_than=10_000, rules_fingerprint="fp")
+        assert watermark.newer_than_for(fingerprint, overlap_ms) == expected
+
+    def test_advanced_takes_newest_crawled(self):
+        """Test advancing keeps the newest crawled timestamp seen."""
+        watermark = Watermark(newer_than=100, rules_fingerprint="fp")
+        advanced = watermark.advanced(
+            [Entry(id="e1", crawled=50), Entry(id="e2", crawled=300), Entry(id="e3")]
+        )
+        assert advanced == Watermark(newer_than=300, rules_fingerprint="fp")
+
+    def test_advanced_never_goes_back(self):
+        """Test older or missing timestamps leave the watermark unchanged."""
+        watermark = Watermark(newer_than=100, rules_fingerprint="fp")
+        assert watermark.advanced([Entry(id="e1", crawled=50)]) is watermark
+        assert watermark.advanced([]) is watermark
+
+
+# --- Test WatermarkStore ---
+
+
+class TestWatermarkStore:
+    def test_load_missing_file(self, tmp_path: Path):
+        """Test loading from a missing state file returns None."""
+        assert WatermarkStore.in_dir(tmp_path).load("user") is None
+
+    def test_save_and_load_per_user(self, tmp_path: Path):
+        """Test watermarks round-trip and are kept per user."""
+        store = WatermarkStore.in_dir(tmp_path)
+        wm1 = Watermark(newer_than=1, rules_fingerprint="a")
+        wm2 = Watermark(newer_than=2, rules_fingerprint="b")
+
+        store.save("user1", wm1)
+        store.save("user2", wm2)
+
+        assert (tmp_path / STATE_FILE_NAME).is_file()
+        assert store.load("user1") == wm1
+        assert store.load("user2") == wm2
+        assert list(tmp_path.iterdir()) == [tmp_path / STATE_FILE_NAME]
+
+    def test_load_corrupt_file(self, tmp_path: Path):
+        """Test an unreadable state file is ignored."""
+        (tmp_path / STATE_FILE_NAME).write_text("not json")
+        assert WatermarkStore.in_dir(tmp_path).load("user") is None